@@ -3,23 +3,69 @@ Agent responsible for character animations
 """
 
 from queue import Queue, Empty  # Import Empty exception directly
+from typing import Callable, Optional
+import threading
+import numpy as np
 from agents.base_agent import BaseAgent
 from modules.emotion_manager import EmotionManager
+from modules.animation_library import AnimationLibrary
+from modules.lip_sync import MouthTrack
+from utils.frame_scheduler import FrameScheduler
 import config
 
 class AnimationAgent(BaseAgent):
     """Agent managing emotion-based animations"""
     
-    def __init__(self, input_queue: Queue = None):
+    def __init__(self, input_queue: Queue = None, on_frame: Optional[Callable[[np.ndarray], None]] = None,
+                 lip_sync_queue: Optional[Queue] = None):
         """
         Initialize animation agent
         
         Args:
-            input_queue: Queue for incoming emotions
+            input_queue: Queue for incoming emotions (latest-value channel by default)
+            on_frame: Renderer callback receiving the blended pose of each frame (optional)
+            lip_sync_queue: Queue of mouth-open points published by the speech agent (optional)
         """
-        super().__init__("Animation", input_queue)
+        super().__init__("Animation", input_queue, channel="latest")
         self.emotion_manager = EmotionManager()
         self.current_emotion = config.DEFAULT_EMOTION
+        self.on_frame = on_frame
+        
+        # Decode all animations up front so emotion changes never touch the disk
+        self.library = AnimationLibrary()
+        self.library.preload()
+        
+        # Playback state, shared with the frame scheduler thread
+        self.state_lock = threading.Lock()
+        self.current_clip = self.library.get_clip(self.emotion_manager.get_animation_file(self.current_emotion))
+        self.clip_start_frame = 0
+        self.previous_clip = None
+        self.previous_start_frame = 0
+        self.fade_start_frame = 0
+        self.fade_frames = max(1, int(config.ANIMATION_CROSSFADE * self.library.fps))
+        self.last_frame_index = 0
+        self.current_pose = self.current_clip.sample(0).copy()
+        
+        # Lip-sync drives the mouth channel on top of the emotion clip
+        self.mouth_track = MouthTrack(lip_sync_queue) if lip_sync_queue is not None else None
+        self.mouth_channel = (self.library.channels.index("mouth_open")
+                              if "mouth_open" in self.library.channels else None)
+        
+        self.scheduler = FrameScheduler(self.library.fps, self._render_frame, name=f"{self.name}/frames")
+    
+    def start(self) -> None:
+        """
+        Start the agent and its frame scheduler
+        """
+        super().start()
+        self.scheduler.start()
+    
+    def stop(self) -> None:
+        """
+        Stop the frame scheduler and the agent
+        """
+        self.scheduler.stop()
+        super().stop()
     
     def process(self, emotion: str) -> None:
         """
@@ -27,51 +73,84 @@ class AnimationAgent(BaseAgent):
         
         Args:
             emotion: Emotion to animate
-            
+        
         Returns:
             None
         """
-        # Check that emotion is valid
-        if emotion not in config.VALID_EMOTIONS:
-            print(f"WARNING - Animation received invalid emotion: {emotion}")
+        # Check that emotion is valid (the filler's thinking state also has an animation)
+        if emotion not in config.VALID_EMOTIONS and emotion != config.FILLER_ANIMATION:
+            self.logger.warning("Animation received invalid emotion: %s", emotion)
             return None
-            
+        
         # If emotion has changed, update and animate
         if emotion != self.current_emotion:
-            print(f"DEBUG - Emotion change: {self.current_emotion} -> {emotion}")
+            self.logger.debug("Emotion change: %s -> %s", self.current_emotion, emotion)
             self.current_emotion = emotion
             
-            # Get animation file
+            # Get preloaded animation
             animation_file = self.emotion_manager.get_animation_file(emotion)
+            clip = self.library.get_clip(animation_file)
             
-            # Here, you would start the actual animation
-            # animate(animation_file)
-            print(f"DEBUG - Playing animation: {animation_file}")
+            # Crossfade from the current clip, starting at the next frame
+            with self.state_lock:
+                start_frame = self.last_frame_index + 1
+                self.previous_clip = self.current_clip
+                self.previous_start_frame = self.clip_start_frame
+                self.current_clip = clip
+                self.clip_start_frame = start_frame
+                self.fade_start_frame = start_frame
             
-            return None
+            self.logger.debug("Playing animation: %s", animation_file)
             
+            return None
+        
         # Same emotion, nothing to do
         return None
     
+    def _render_frame(self, frame_index: int, frame_time: float) -> None:
+        """
+        Compute the pose for one frame, called by the frame scheduler
+        
+        Args:
+            frame_index: Scheduler frame index
+            frame_time: Scheduler time of the frame
+        """
+        with self.state_lock:
+            self.last_frame_index = frame_index
+            pose = self.current_clip.sample(max(0, frame_index - self.clip_start_frame))
+            
+            # Blend with the previous clip while the crossfade lasts
+            if self.previous_clip is not None:
+                progress = (frame_index - self.fade_start_frame + 1) / self.fade_frames
+                if progress >= 1.0:
+                    self.previous_clip = None
+                else:
+                    previous = self.previous_clip.sample(frame_index - self.previous_start_frame)
+                    pose = previous + (pose - previous) * max(0.0, progress)
+            
+            self.current_pose = np.array(pose, dtype=np.float32)
+        
+        if self.mouth_track and self.mouth_channel is not None:
+            mouth_open = self.mouth_track.sample(frame_time)
+            self.current_pose[self.mouth_channel] = max(self.current_pose[self.mouth_channel], mouth_open)
+        
+        if self.on_frame:
+            self.on_frame(self.current_pose)
+    
     def _run(self) -> None:
         """
         Main loop for animation agent
-        Override to add continuous animation logic
+        Only handles emotion changes, frames are driven by the scheduler
         """
         while self.running:
             try:
                 # Get new emotion with timeout
                 emotion = self.input_queue.get(timeout=0.1)
                 self.process(emotion)
-                
+            
             except Empty:
                 # This is a normal queue timeout, just continue
                 pass
             except Exception as e:
                 # Log other exceptions
-                print(f"ERROR - Animation agent error: {str(e)}")
-            
-            # Here, you could have continuous animation logic
-            # based on current emotion, even without new emotion
-            # For example, to make character breathe, blink, etc.
-            # continuous_animation(self.current_emotion)
\ No newline at end of file
+                self.logger.error("Animation agent error: %s", e)
\ No newline at end of file
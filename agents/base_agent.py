@@ -2,15 +2,61 @@
 Base class for all system agents
 """
 
+import multiprocessing
+import signal
 import threading
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
 from queue import Queue, Empty  # Import Empty exception directly
-from typing import Any, Optional
+from typing import Any, Callable, Dict, Optional
+from utils.channels import OVERFLOW_BLOCK, PriorityChannel, create_channel
+from utils.log import get_logger
+import config
+
+# Agent instance living in a worker process (one per worker)
+_worker_agent = None
+
+def _init_worker(agent_class: type, worker_args: tuple) -> None:
+    """
+    Build the worker-side agent when a worker process starts
+    
+    Args:
+        agent_class: Agent class to instantiate
+        worker_args: Arguments given to agent_class.create_worker
+    """
+    global _worker_agent
+    # Ctrl+C is handled by the main process, which shuts the pool down cleanly
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_agent = agent_class.create_worker(*worker_args)
+
+def _process_in_worker(data: Any) -> Any:
+    """
+    Run the worker-side agent's process method
+    
+    Args:
+        data: Picklable input
+        
+    Returns:
+        Any: Picklable result
+    """
+    return _worker_agent.process(data)
+
+def _worker_ready() -> bool:
+    """
+    Return once a worker process has run its initializer
+    
+    Returns:
+        bool: True if the worker-side agent was built
+    """
+    return _worker_agent is not None
 
 class BaseAgent:
     """Base class for all agents"""
     
-    def __init__(self, name: str, input_queue: Optional[Queue] = None, output_queue: Optional[Queue] = None):
+    def __init__(self, name: str, input_queue: Optional[Queue] = None, output_queue: Optional[Queue] = None,
+                 channel: str = "fifo", execution: str = "thread", workers: int = 1,
+                 capacity: int = 0, overflow: str = OVERFLOW_BLOCK, merge: Optional[Callable[[Any, Any], Any]] = None):
         """
         Initialize a base agent
         
@@ -18,25 +64,79 @@ class BaseAgent:
             name: Agent name
             input_queue: Queue for inputs (optional)
             output_queue: Queue for outputs (optional)
+            channel: Kind of input queue created when none is given ("fifo", "latest" or "priority")
+            execution: Where process() runs: "thread" (agent thread) or "process" (worker process pool)
+            workers: Number of worker processes when execution is "process"
+            capacity: Capacity of the created input queue (0 = unbounded)
+            overflow: Overflow policy of the created input queue (see utils.channels)
+            merge: Function combining (pending, new) inputs for the merge policy
         """
+        if execution not in ("thread", "process"):
+            raise ValueError(f"Unknown execution mode: {execution}")
+        
         self.name = name
-        self.input_queue = input_queue or Queue()
+        self.logger = get_logger(name)
+        if input_queue is None:
+            input_queue = create_channel(channel, capacity, overflow, merge)
+        self.input_queue = input_queue
+        
+        # Bounded channels report shed inputs to the agent consuming them
+        if hasattr(self.input_queue, "shedding"):
+            self.input_queue.shedding.on_shed = self._on_shed
         self.output_queue = output_queue
         self.running = False
         self.thread = None
+        self.execution = execution
+        self.workers = workers
+        self.executor = None
+    
+    @classmethod
+    def create_worker(cls, *args) -> "BaseAgent":
+        """
+        Build the agent instance used inside a worker process
+        Override if the worker side needs a different setup
+        
+        Args:
+            *args: Values returned by worker_args()
+            
+        Returns:
+            BaseAgent: Worker-side agent
+        """
+        return cls(*args)
+    
+    def worker_args(self) -> tuple:
+        """
+        Return picklable arguments to rebuild this agent in a worker process
+        
+        Returns:
+            tuple: Arguments for create_worker
+        """
+        return ()
     
     def start(self) -> None:
         """
         Start the agent in a separate thread
         """
         if self.running:
-            print(f"WARNING - Agent {self.name} already running")
+            self.logger.warning("Agent %s already running", self.name)
             return
+        
+        if self.execution == "process":
+            # Spawned workers don't inherit threads, locks or audio devices from this process
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(config.WORKER_START_METHOD),
+                initializer=_init_worker,
+                initargs=(type(self), self.worker_args())
+            )
+            # Workers spawn and run create_worker on the first submit; do it now, not on the first real item
+            self.executor.submit(_worker_ready).result()
             
         self.running = True
-        self.thread = threading.Thread(target=self._run, daemon=True)
+        # Helper threads are named "<agent>/<role>" so profiles group them under their agent
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
         self.thread.start()
-        print(f"INFO - Agent {self.name} started")
+        self.logger.info("Agent %s started (%s)", self.name, self.execution)
     
     def stop(self) -> None:
         """
@@ -45,13 +145,38 @@ class BaseAgent:
         self.running = False
         if self.thread:
             self.thread.join(timeout=1.0)
-            print(f"INFO - Agent {self.name} stopped")
+        
+        if self.executor:
+            # Drop queued work, let running calls finish, then reap the workers
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+        
+        if self.thread:
+            self.logger.info("Agent %s stopped", self.name)
+    
+    def dispatch(self, data: Any) -> Any:
+        """
+        Run process() where the execution mode says, and wait for its result
+        
+        Args:
+            data: Data to process (must be picklable in process mode)
+            
+        Returns:
+            Any: Processing result or None
+        """
+        if self.executor is None:
+            return self.process(data)
+        return self.executor.submit(_process_in_worker, data).result()
     
     def _run(self) -> None:
         """
         Main method executed in the thread
         To be overridden in derived classes
         """
+        if self.executor is not None:
+            self._run_pool()
+            return
+        
         while self.running:
             try:
                 # Get an item from the input queue with timeout
@@ -69,11 +194,40 @@ class BaseAgent:
                 pass
             except Exception as e:
                 # Log other types of exceptions
-                print(f"ERROR - Agent {self.name} encountered an error: {str(e)}")
+                self.logger.error("Agent %s encountered an error: %s", self.name, e)
                     
             # Small pause to avoid CPU saturation
             time.sleep(0.01)
     
+    def _run_pool(self) -> None:
+        """
+        Main loop in process mode
+        Keeps up to one item per worker in flight and emits results in input order
+        """
+        in_flight = deque()
+        
+        while self.running:
+            try:
+                # Emit finished results, oldest first
+                while in_flight and in_flight[0].done():
+                    result = in_flight.popleft().result()
+                    if self.output_queue is not None and result is not None:
+                        self.output_queue.put(result)
+                
+                # All workers busy: wait for the oldest item
+                if len(in_flight) >= self.workers:
+                    wait([in_flight[0]], timeout=0.1)
+                    continue
+                
+                # Poll quickly while results are pending so they're emitted promptly
+                data = self.input_queue.get(timeout=0.005 if in_flight else 0.1)
+                in_flight.append(self.executor.submit(_process_in_worker, data))
+                
+            except Empty:
+                pass
+            except Exception as e:
+                self.logger.error("Agent %s encountered an error: %s", self.name, e)
+    
     def process(self, data: Any) -> Any:
         """
         Process an input and produce an output
@@ -87,11 +241,41 @@ class BaseAgent:
         """
         raise NotImplementedError("The process method must be implemented in subclasses")
     
-    def send(self, data: Any) -> None:
+    def send(self, data: Any, priority: Optional[int] = None) -> bool:
         """
         Send data to the agent via its input queue
         
         Args:
             data: Data to send
+            priority: Priority for priority channels, lower is served first (optional)
+        
+        Returns:
+            bool: False if a full input queue rejected or dropped the data
+        """
+        if priority is not None and isinstance(self.input_queue, PriorityChannel):
+            accepted = self.input_queue.put(data, priority=priority)
+        else:
+            accepted = self.input_queue.put(data)
+        return accepted is not False
+    
+    def _on_shed(self, event: str, item: Any) -> None:
+        """
+        Report an input shed by a full input queue
+        Override to react to saturation (e.g. tell the user)
+        
+        Args:
+            event: "dropped_oldest", "dropped_newest", "rejected" or "merged"
+            item: Input affected
+        """
+        self.logger.warning("Input queue of %s full, %s: %.60r", self.name, event, item)
+    
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """
+        Return input queue depth and shedding counters
+        
+        Returns:
+            Dict[str, Any]: Channel statistics ({"depth"} only for plain queues)
         """
-        self.input_queue.put(data)
\ No newline at end of file
+        if hasattr(self.input_queue, "stats"):
+            return self.input_queue.stats()
+        return {"depth": self.input_queue.qsize()}
\ No newline at end of file
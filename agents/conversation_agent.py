@@ -2,18 +2,25 @@
 Agent responsible for LLM interactions and conversation management
 """
 
+import sys
+import threading
 from queue import Queue, Empty
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from agents.base_agent import BaseAgent
 from modules.llm_interface import LLMInterface
 from modules.context_manager import ContextManager
 from modules.emotion_manager import EmotionManager
+from modules.response_cache import ResponseCache, context_fingerprint
+from modules.input_coalescer import InputCoalescer
+from modules.filler_stage import FillerStage
+from utils.channels import INTERRUPT_COMMAND, PRIORITY_HIGH, PRIORITY_NORMAL, PriorityChannel
 import config
 
 class ConversationAgent(BaseAgent):
     """Agent managing conversation with the LLM"""
     
-    def __init__(self, input_queue: Queue = None, emotion_queue: Queue = None, speech_queue: Queue = None):
+    def __init__(self, input_queue: Queue = None, emotion_queue: Queue = None, speech_queue: Queue = None,
+                 response_cache: Optional[ResponseCache] = None, llm: Optional[LLMInterface] = None):
         """
         Initialize conversation agent
         
@@ -21,49 +28,160 @@ class ConversationAgent(BaseAgent):
             input_queue: Queue for incoming user inputs
             emotion_queue: Queue to send emotions
             speech_queue: Queue to send speech text
+            response_cache: Shared response cache (default: own cache if config.RESPONSE_CACHE_ENABLED)
+            llm: LLM interface (default: own instance on the configured backend)
         """
-        super().__init__("Conversation", input_queue)
-        self.llm = LLMInterface()
-        self.context = ContextManager()
+        super().__init__("Conversation", input_queue, capacity=config.INPUT_QUEUE_CAPACITY,
+                         overflow=config.INPUT_QUEUE_OVERFLOW, merge=self.merge_inputs)
+        self.llm = llm or LLMInterface()
+        self.context = ContextManager(self.llm)
         self.emotion_manager = EmotionManager()
         self.emotion_queue = emotion_queue
         self.speech_queue = speech_queue
         
+        # Opt-in cache for short, repeated utterances (an own cache counts towards the session's memory)
+        self.owns_cache = response_cache is None and config.RESPONSE_CACHE_ENABLED
+        if self.owns_cache:
+            response_cache = ResponseCache()
+        self.response_cache = response_cache
+        
+        # Context is shared with idle-time jobs
+        self.context_lock = threading.Lock()
+        self.turn_active = False
+        self.idle_cancel = threading.Event()
+        
+        # Filler and thinking animation when a reply is late
+        self.filler = FillerStage(speech_queue, emotion_queue) if config.FILLER_ENABLED and speech_queue else None
+        
+        # Bursts of queued messages become one turn; a reply is dropped once the user adds to it
+        self.coalescer = InputCoalescer(self.input_queue, self.merge_inputs) if config.COALESCE_ENABLED else None
+        self.superseded_input = None
+        
         # Add system message to define personality
         self.context.add_system_message(config.SYSTEM_PROMPT)
     
-    def process(self, user_input: str) -> Dict[str, Any]:
+    def _run(self) -> None:
+        """
+        Main loop: coalesces bursts of queued input into one turn and retries superseded turns merged with newer input
+        """
+        if self.coalescer is None:
+            super()._run()
+            return
+        
+        while self.running:
+            try:
+                user_input = self.coalescer.collect(self.input_queue.get(timeout=0.1))
+            except Empty:
+                continue
+            
+            try:
+                # An abandoned turn is answered together with what followed it
+                if self.superseded_input is not None:
+                    user_input = self.merge_inputs(self.superseded_input, user_input)
+                    self.superseded_input = None
+                
+                cancel = self.coalescer.pending if config.COALESCE_CANCEL_SUPERSEDED else None
+                result = self.process(user_input, cancel)
+                if result is None:
+                    self.superseded_input = user_input
+                    self.coalescer.record_superseded()
+                elif self.output_queue is not None:
+                    self.output_queue.put(result)
+            except Exception as e:
+                self.logger.error("Agent %s encountered an error: %s", self.name, e)
+    
+    def process(self, user_input: str, cancel: Optional[threading.Event] = None) -> Optional[Dict[str, Any]]:
         """
         Process a user input and generate a response
         
         Args:
             user_input: User's message
+            cancel: Event abandoning the turn when set during generation (optional)
+            
+        Returns:
+            Optional[Dict[str, Any]]: Response information, None if the turn was cancelled
+        """
+        self.turn_active = True
+        try:
+            # A running idle summary would compete with this turn for the model
+            self.idle_cancel.set()
+        
+            # A new turn makes pending and ongoing speech stale
+            if isinstance(self.speech_queue, PriorityChannel):
+                dropped = self.speech_queue.clear(PRIORITY_NORMAL)
+                if dropped:
+                    self.logger.debug("Dropped %s stale speech item(s)", dropped)
+                self.speech_queue.put(INTERRUPT_COMMAND, priority=PRIORITY_HIGH)
             
+            with self.context_lock:
+                if self.filler:
+                    self.filler.arm(self.emotion_manager.current_emotion)
+                return self._respond(user_input, cancel)
+        finally:
+            if self.filler:
+                self.filler.disarm()
+            self.turn_active = False
+    
+    def _respond(self, user_input: str, cancel: Optional[threading.Event] = None) -> Optional[Dict[str, Any]]:
+        """
+        Add a user input to the context and produce the reply
+        
+        Args:
+            user_input: User's message
+            cancel: Event abandoning generation when set
+        
         Returns:
-            Dict[str, Any]: Response information
+            Optional[Dict[str, Any]]: Response information, None if cancelled
         """
         # Add user message to context
         self.context.add_user_message(user_input)
         
         # Check if summary is needed
         if self.context.should_summarize():
-            print("DEBUG - Creating summary to optimize context...")
+            self.logger.debug("Creating summary to optimize context...")
             self.context.create_summary()
         
-        # Get messages in Ollama format
-        ollama_messages = self.context.get_ollama_messages()
-        
-        # Generate response
-        response = self.llm.generate_response(ollama_messages)
-        response_content = self.llm.extract_content(response)
+        # Serve short, repeated utterances from cache when possible
+        cache_key = self._get_cache_key(user_input)
+        cached = self.response_cache.get(cache_key) if cache_key else None
         
-        # Extract text and emotion
-        clean_text, emotion = self.emotion_manager.extract_emotion(response_content)
+        llm_ms = 0.0
+        eval_count = 0
+        tokens_saved = 0
+        if cached:
+            clean_text, emotion = cached
+            response_content = self.emotion_manager.add_emotion_tag(clean_text, emotion)
+            self.logger.debug("Response served from cache: '%s'", clean_text)
+        else:
+            # Get messages in Ollama format
+            ollama_messages = self.context.get_ollama_messages()
+            tokens_saved = self.context.last_tokens_saved
+            if tokens_saved:
+                self.logger.debug("History compaction saved %s prompt tokens", tokens_saved)
+            
+            # Generate response
+            response = self.llm.generate_response(ollama_messages, cancel=cancel)
+            if response.get("done_reason") == "cancelled":
+                # The input will come back merged with the newer one, as a single message
+                self.context.remove_last_message()
+                self.logger.debug("Reply to '%s' superseded by newer input", user_input)
+                return None
+            response_content = self.llm.extract_content(response)
+            llm_ms = self.llm.last_response_time * 1000
+            eval_count = response.get("eval_count", 0)
+            
+            # Extract text and emotion
+            clean_text, emotion = self.emotion_manager.extract_emotion(response_content)
+            
+            if cache_key:
+                self.response_cache.put(cache_key, clean_text, emotion)
         
         # Add response to context
         self.context.add_ai_message(response_content, {"emotion": emotion})
         
-        # Send emotion and text to appropriate agents
+        # Send emotion and text to appropriate agents, never followed by a late filler
+        if self.filler:
+            self.filler.disarm()
         if self.emotion_queue:
             self.emotion_queue.put(emotion)
         
@@ -71,12 +189,109 @@ class ConversationAgent(BaseAgent):
             self.speech_queue.put(clean_text)
         
         # Display context statistics
-        print(f"DEBUG - Context: {self.context.token_count} tokens (~{self.context.token_count/config.MAX_CONTEXT_TOKENS*100:.1f}%)")
+        self.logger.debug("Context: %s tokens (~%.1f%%)", self.context.token_count, self.context.token_count/config.MAX_CONTEXT_TOKENS*100)
         if self.context.summary:
-            print(f"DEBUG - Using summary: {self.context.summary[:50]}...")
+            self.logger.debug("Using summary: %s...", self.context.summary[:50])
         
         return {
             "text": clean_text,
             "emotion": emotion,
-            "token_count": self.context.token_count
-        }
\ No newline at end of file
+            "token_count": self.context.token_count,
+            "llm_ms": llm_ms,
+            "eval_count": eval_count,
+            "tokens_saved": tokens_saved
+        }
+    
+    @staticmethod
+    def merge_inputs(pending: str, new: str) -> str:
+        """
+        Combine an input waiting in a full queue with a newer one, so both are answered in one turn
+        
+        Args:
+            pending: Newest input still waiting
+            new: Input that didn't fit
+        
+        Returns:
+            str: Combined input
+        """
+        return f"{pending} {new}"
+    
+    def _get_cache_key(self, user_input: str) -> Optional[str]:
+        """
+        Build the response cache key for an input
+        
+        Args:
+            user_input: User's message
+            
+        Returns:
+            Optional[str]: Cache key, or None if the input can't be cached
+        """
+        if self.response_cache is None or not self.response_cache.is_cacheable(user_input):
+            return None
+        
+        # The input is already in the context; what came just before it gives it its meaning
+        recent = self.context.get_recent_messages(config.RESPONSE_CACHE_CONTEXT_MESSAGES, skip=1)
+        fingerprint = context_fingerprint(self.llm.model_name, config.SYSTEM_PROMPT, self.context.summary, recent)
+        return self.response_cache.make_key(user_input, fingerprint)
+    
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        Return the approximate memory held by this session
+        
+        Returns:
+            Dict[str, int]: Bytes by component (context, own response cache, superseded input)
+        """
+        usage = self.context.memory_usage()
+        if self.owns_cache:
+            usage["response_cache"] = self.response_cache.nbytes()
+        if self.superseded_input is not None:
+            usage["pending_input"] = sys.getsizeof(self.superseded_input)
+        return usage
+    
+    def export_session(self) -> Dict[str, Any]:
+        """
+        Return the session's context, waiting for a running turn to finish
+        
+        Returns:
+            Dict[str, Any]: State for import_session
+        """
+        with self.context_lock:
+            return self.context.export_state()
+    
+    def import_session(self, state: Dict[str, Any]) -> None:
+        """
+        Continue a session exported by another agent
+        
+        Args:
+            state: Output of export_session
+        """
+        with self.context_lock:
+            self.context.import_state(state)
+    
+    def is_busy(self) -> bool:
+        """
+        Indicates if agent is handling a turn
+        
+        Returns:
+            bool: True while a user input is being processed
+        """
+        return self.turn_active
+    
+    def summarize_when_idle(self) -> None:
+        """
+        Idle job: summarize early, at config.IDLE_SUMMARY_THRESHOLD, so turns rarely pay for it
+        The summary is dropped if a turn starts meanwhile
+        """
+        with self.context_lock:
+            if self.turn_active or not self.context.should_summarize(config.IDLE_SUMMARY_THRESHOLD):
+                return
+            # Cleared with the lock held: a turn starting from here on sets it again and is seen
+            self.idle_cancel.clear()
+            revision = self.context.revision
+        summary = self.context.build_summary(self.idle_cancel)
+        
+        with self.context_lock:
+            if summary is None or self.context.revision != revision:
+                self.logger.debug("Idle summary abandoned, the conversation moved on")
+                return
+            self.context.apply_summary(summary)
\ No newline at end of file
@@ -0,0 +1,300 @@
+"""
+Agent responsible for speech input
+Captures audio, detects end of speech and commits transcripts to the conversation
+"""
+
+import threading
+import time
+import wave
+from queue import Queue
+from typing import Optional
+import numpy as np
+import sounddevice
+from faster_whisper import WhisperModel
+from agents.base_agent import BaseAgent
+from modules.voice_activity import VoiceActivityDetector
+from utils.ring_buffer import AudioRingBuffer
+from utils.messages import TranscriptionRequest, TranscriptionResult
+import config
+
+class ListeningAgent(BaseAgent):
+    """Agent turning microphone (or WAV file) audio into user messages"""
+    
+    def __init__(self, output_queue: Queue = None, partial_queue: Optional[Queue] = None, wav_path: str = None):
+        """
+        Initialize listening agent
+        
+        Args:
+            output_queue: Queue receiving final utterances (the conversation agent's input queue)
+            partial_queue: Queue receiving partial transcripts while the user speaks (optional)
+            wav_path: WAV file to read instead of the microphone (default: config.ASR_INPUT_WAV)
+        """
+        # Decoding can run in a worker process so it never holds the GIL against audio playback
+        super().__init__("Listening", output_queue=output_queue, execution=config.ASR_EXECUTION)
+        self.partial_queue = partial_queue
+        self.wav_path = wav_path or config.ASR_INPUT_WAV
+        
+        self.sample_rate = config.ASR_SAMPLE_RATE
+        self.frame_samples = self.sample_rate * config.ASR_FRAME_MS // 1000
+        self.ring = AudioRingBuffer(self.sample_rate * config.ASR_RING_SECONDS)
+        self.vad = VoiceActivityDetector()
+        
+        self.model = None  # Loaded by start or create_worker, only where decoding runs
+        
+        self.stream = None
+        self.source_thread = None
+        
+        # Current utterance, as absolute ring buffer positions
+        self.utterance_start = None
+        self.partial_text = ""
+        self.partial_end = 0
+        self.last_partial_time = 0.0
+    
+    @classmethod
+    def create_worker(cls, *args) -> "ListeningAgent":
+        """
+        Build the worker-side agent with its model loaded and warmed
+        
+        Args:
+            *args: Values returned by worker_args()
+        
+        Returns:
+            ListeningAgent: Worker-side agent
+        """
+        agent = cls(*args)
+        agent._load_model()
+        return agent
+    
+    def start(self) -> None:
+        """
+        Load the model where decoding runs, then start audio capture and the agent thread
+        """
+        if self.running:
+            self.logger.warning("Agent %s already running", self.name)
+            return
+        
+        if self.execution != "process":
+            self._load_model()
+        super().start()
+        
+        if self.wav_path:
+            self.source_thread = threading.Thread(target=self._read_wav, name=f"{self.name}/source", daemon=True)
+            self.source_thread.start()
+        else:
+            self.stream = sounddevice.InputStream(
+                samplerate=self.sample_rate,
+                channels=1,
+                dtype="float32",
+                blocksize=self.frame_samples,
+                callback=self._on_audio
+            )
+            self.stream.start()
+    
+    def stop(self) -> None:
+        """
+        Stop audio capture and the agent thread
+        """
+        if self.stream:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+        super().stop()
+    
+    def _on_audio(self, indata: np.ndarray, frames: int, time_info, status) -> None:
+        """
+        Microphone callback, runs on the audio thread
+        
+        Args:
+            indata: Captured samples, shape (frames, channels)
+            frames: Number of frames
+            time_info: Stream timing information
+            status: Stream status flags
+        """
+        if status:
+            self.logger.warning("Audio input status: %s", status)
+        self.ring.write(indata[:, 0].copy())
+    
+    def _read_wav(self) -> None:
+        """
+        Feed a WAV file into the ring buffer at real-time pace
+        """
+        with wave.open(self.wav_path, "rb") as wav:
+            channels = wav.getnchannels()
+            rate = wav.getframerate()
+            raw = wav.readframes(wav.getnframes())
+        
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1)
+        if rate != self.sample_rate:
+            positions = np.arange(0, samples.size, rate / self.sample_rate)
+            samples = np.interp(positions, np.arange(samples.size), samples).astype(np.float32)
+        
+        # Trailing silence lets the VAD close the last utterance
+        samples = np.concatenate((samples, np.zeros(self.sample_rate, dtype=np.float32)))
+        
+        frame_duration = self.frame_samples / self.sample_rate
+        next_time = time.perf_counter()
+        for start in range(0, samples.size, self.frame_samples):
+            if not self.running:
+                break
+            self.ring.write(samples[start:start + self.frame_samples])
+            next_time += frame_duration
+            time.sleep(max(0.0, next_time - time.perf_counter()))
+    
+    def _run(self) -> None:
+        """
+        Main loop for listening agent
+        Runs VAD frame by frame and transcribes utterances
+        """
+        read_pos = self.ring.write_pos
+        preroll = self.sample_rate * config.ASR_PREROLL_MS // 1000
+        max_samples = self.sample_rate * config.ASR_MAX_UTTERANCE_SECONDS
+        
+        while self.running:
+            try:
+                if not self.ring.wait_for(read_pos + self.frame_samples, timeout=0.1):
+                    continue
+                
+                # Skip audio that was overwritten if we fell behind
+                read_pos = max(read_pos, self.ring.oldest_pos)
+                frame = self.ring.read(read_pos, read_pos + self.frame_samples)
+                read_pos += self.frame_samples
+                
+                event = self.vad.process_frame(frame)
+                
+                if event == "start":
+                    onset = read_pos - self.vad.start_frames * self.frame_samples
+                    self.utterance_start = max(self.ring.oldest_pos, onset - preroll)
+                    self.partial_text = ""
+                    self.partial_end = 0
+                    self.last_partial_time = time.perf_counter()
+                
+                elif event == "end":
+                    speech_end = read_pos - self.vad.end_frames * self.frame_samples
+                    self._commit(speech_end)
+                
+                elif self.vad.in_speech:
+                    if read_pos - self.utterance_start >= max_samples:
+                        # Very long utterance, commit what we have
+                        self.vad.reset()
+                        self._commit(read_pos)
+                    elif self.vad.silent_run == 1:
+                        # Possible end of speech: decode now, during the VAD hangover
+                        self._update_partial(read_pos)
+                    elif (self.vad.silent_run == 0 and
+                          time.perf_counter() - self.last_partial_time >= config.ASR_PARTIAL_INTERVAL_MS / 1000):
+                        self._update_partial(read_pos)
+            
+            except Exception as e:
+                self.logger.error("Agent %s encountered an error: %s", self.name, e)
+    
+    def _transcribe(self, start: int, end: int) -> str:
+        """
+        Transcribe audio between two ring buffer positions
+        
+        Args:
+            start: First sample position
+            end: Position after the last sample
+        
+        Returns:
+            str: Transcribed text
+        """
+        audio = self.ring.read(start, end)
+        if audio.size == 0:
+            return ""
+        
+        result = self.dispatch(TranscriptionRequest(audio, self.sample_rate))
+        return result.text
+    
+    def _load_model(self) -> None:
+        """
+        Load the Whisper model and run a short silent decode, so the first utterance only pays for inference
+        """
+        if self.model is not None:
+            return
+        
+        start_time = time.perf_counter()
+        self.model = WhisperModel(
+            config.ASR_MODEL,
+            device=config.ASR_DEVICE,
+            compute_type=config.ASR_COMPUTE_TYPE
+        )
+        # Kernels, caches and lazily built decoder state are set up by the first transcription
+        self.process(TranscriptionRequest(np.zeros(self.sample_rate // 2, dtype=np.float32), self.sample_rate))
+        self.logger.info("ASR model %s loaded and warmed in %.0f ms", config.ASR_MODEL,
+                         (time.perf_counter() - start_time) * 1000)
+    
+    def process(self, request: TranscriptionRequest) -> TranscriptionResult:
+        """
+        Decode audio with faster-whisper
+        Runs in the agent thread or in a worker process depending on config.ASR_EXECUTION
+        
+        Args:
+            request: Audio to transcribe
+            
+        Returns:
+            TranscriptionResult: Transcript and timing
+        """
+        if self.model is None:
+            self._load_model()
+        
+        start_time = time.perf_counter()
+        segments, _ = self.model.transcribe(
+            request.audio,
+            language=config.ASR_LANGUAGE,
+            beam_size=config.ASR_BEAM_SIZE,
+            vad_filter=False,
+            without_timestamps=True,
+            condition_on_previous_text=False
+        )
+        text = "".join(segment.text for segment in segments).strip()
+        
+        return TranscriptionResult(
+            text=text,
+            audio_seconds=request.audio.size / request.sample_rate,
+            decode_ms=(time.perf_counter() - start_time) * 1000
+        )
+    
+    def _update_partial(self, end: int) -> None:
+        """
+        Transcribe the utterance so far and publish it as a partial result
+        
+        Args:
+            end: Current read position
+        """
+        self.last_partial_time = time.perf_counter()
+        self.partial_text = self._transcribe(self.utterance_start, end)
+        self.partial_end = end
+        
+        if self.partial_text:
+            self.logger.debug("Partial transcript: '%s'", self.partial_text)
+            if self.partial_queue is not None:
+                self.partial_queue.put(self.partial_text)
+    
+    def _commit(self, speech_end: int) -> None:
+        """
+        Send the final transcript of the current utterance to the conversation
+        
+        Args:
+            speech_end: Position where speech ended
+        """
+        endpoint_time = time.perf_counter()
+        
+        # Reuse the decode made during the hangover when it covers all speech
+        if self.partial_end >= speech_end:
+            text = self.partial_text
+        else:
+            text = self._transcribe(self.utterance_start, speech_end)
+        
+        self.utterance_start = None
+        self.partial_text = ""
+        self.partial_end = 0
+        
+        if not text:
+            return
+        
+        latency = (time.perf_counter() - endpoint_time) * 1000
+        self.logger.debug("Final transcript (%.0f ms after endpoint): '%s'", latency, text)
+        if self.output_queue is not None and self.output_queue.put(text) is False:
+            self.logger.info("Utterance not accepted, the conversation is saturated: '%s'", text)
\ No newline at end of file
@@ -0,0 +1,560 @@
+"""
+Session sharding across worker processes
+Routes each session to a worker process hosting its ConversationAgent
+"""
+
+import itertools
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from agents.conversation_agent import ConversationAgent
+from modules.llm_backends import LLMBackend
+from modules.llm_interface import LLMInterface
+from utils.log import get_logger
+from utils.memory_monitor import MemoryMonitor
+import config
+
+logger = get_logger("session_router")
+
+def _worker_main(index: int, requests, responses, llm_factory: Optional[Callable[[], LLMBackend]]) -> None:
+    """
+    Worker process: hosts sessions and runs their turns in a thread pool
+    
+    Args:
+        index: Worker index
+        requests: Queue of (kind, request_id, session_id, payload) tuples, None to stop
+        responses: Queue receiving results, errors and heartbeats
+        llm_factory: Callable building the LLM backend (None: configured backend)
+    """
+    # Ctrl+C is handled by the front process, which stops the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    
+    llm = LLMInterface(backend=llm_factory() if llm_factory else None)
+    sessions: Dict[str, ConversationAgent] = {}
+    lock = threading.Lock()
+    stats = {"active": 0, "turns": 0, "errors": 0, "turn_ms": 0.0}
+    stopped = threading.Event()
+    # Sessions are sized where they live; heartbeats carry the totals
+    memory = MemoryMonitor() if config.MEMORY_MONITOR_ENABLED else None
+    if memory:
+        memory.start()
+    
+    def snapshot() -> Dict[str, Any]:
+        with lock:
+            agents = list(sessions.values())
+            result = dict(stats, sessions=len(agents))
+        result["context_tokens"] = sum(agent.context.token_count for agent in agents)
+        result["mean_turn_ms"] = result["turn_ms"] / result["turns"] if result["turns"] else 0.0
+        if memory:
+            memory_stats = memory.get_stats()
+            result["session_bytes"] = memory_stats["session_bytes"]
+            result["largest_session_bytes"] = memory_stats["largest_session_bytes"]
+            result["traced_growth_bytes"] = memory_stats.get("traced_growth_bytes", 0)
+        return result
+    
+    def heartbeat() -> None:
+        # The first heartbeat tells the front the worker is ready
+        while True:
+            responses.put(("heartbeat", index, None, snapshot()))
+            if stopped.wait(config.SESSION_HEARTBEAT_INTERVAL):
+                break
+    
+    def get_agent(session_id: str) -> ConversationAgent:
+        with lock:
+            agent = sessions.get(session_id)
+            if agent is None:
+                agent = sessions[session_id] = ConversationAgent(llm=llm)
+                if memory:
+                    memory.track(session_id, agent.memory_usage)
+            return agent
+    
+    def handle(kind: str, request_id: int, session_id: str, payload: Any) -> None:
+        try:
+            if kind == "turn":
+                agent = get_agent(session_id)
+                with lock:
+                    stats["active"] += 1
+                start = time.perf_counter()
+                try:
+                    result = agent.process(payload)
+                finally:
+                    with lock:
+                        stats["active"] -= 1
+                        stats["turns"] += 1
+                        stats["turn_ms"] += (time.perf_counter() - start) * 1000
+            elif kind == "export":
+                # The session stays until the router closes it, once imported elsewhere
+                with lock:
+                    agent = sessions.get(session_id)
+                result = agent.export_session() if agent else None
+            elif kind == "import":
+                agent = ConversationAgent(llm=llm)
+                if payload is not None:
+                    agent.import_session(payload)
+                with lock:
+                    sessions[session_id] = agent
+                if memory:
+                    memory.track(session_id, agent.memory_usage)
+                result = None
+            elif kind == "close":
+                with lock:
+                    result = sessions.pop(session_id, None) is not None
+                if memory:
+                    memory.untrack(session_id)
+            else:
+                raise ValueError(f"Unknown request: {kind}")
+            responses.put(("result", index, request_id, result))
+        except Exception as e:
+            with lock:
+                stats["errors"] += 1
+            responses.put(("error", index, request_id, f"{type(e).__name__}: {e}"))
+    
+    threading.Thread(target=heartbeat, name="Heartbeat", daemon=True).start()
+    pool = ThreadPoolExecutor(max_workers=config.SESSION_WORKER_THREADS, thread_name_prefix="Session")
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        pool.submit(handle, *request)
+    
+    pool.shutdown(wait=True)
+    stopped.set()
+    if memory:
+        memory.stop()
+
+class _Worker:
+    """Front-side handle of a worker process"""
+    
+    def __init__(self, index: int, process, requests):
+        """
+        Initialize worker handle
+        
+        Args:
+            index: Worker index
+            process: Worker process
+            requests: Request queue of the worker
+        """
+        self.index = index
+        self.process = process
+        self.requests = requests
+        self.draining = False
+        self.last_heartbeat = None  # Set by the first heartbeat, once the worker is ready
+        self.stats: Dict[str, Any] = {}
+    
+    @property
+    def healthy(self) -> bool:
+        """True if the process is alive and its heartbeat is recent"""
+        return (self.process.is_alive() and self.last_heartbeat is not None
+                and time.monotonic() - self.last_heartbeat < config.SESSION_HEARTBEAT_TIMEOUT)
+
+class SessionRouter:
+    """
+    Front for sessions hosted by worker processes
+    
+    A session is assigned to the least-loaded worker on its first turn and
+    stays there (sticky routing), so its ContextManager lives in a single
+    process. Draining a worker moves its sessions to the other workers by
+    exporting and importing their context and summary; turns of a session
+    being moved wait until it has arrived.
+    
+    A worker whose process died or whose heartbeat is older than
+    config.SESSION_HEARTBEAT_TIMEOUT is restarted: its pending requests
+    fail and its sessions are routed anew, starting from an empty context.
+    """
+    
+    def __init__(self, workers: int = None, llm_factory: Optional[Callable[[], LLMBackend]] = None):
+        """
+        Initialize session router
+        
+        Args:
+            workers: Number of worker processes (default: config.SESSION_WORKERS)
+            llm_factory: Picklable callable building each worker's LLM backend (default: configured backend)
+        """
+        self.worker_count = workers or config.SESSION_WORKERS
+        self.llm_factory = llm_factory
+        self.workers: List[_Worker] = []
+        self.routes: Dict[str, int] = {}
+        self.in_flight: Dict[str, int] = defaultdict(int)
+        self.migrating = set()
+        self.pending: Dict[int, Any] = {}  # Request ID -> (future, session ID, worker index)
+        self.request_ids = itertools.count()
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.running = False
+        self.stopping = False
+        self.reader = None
+        self.migrations = 0
+        self.restarts = 0
+        
+        context = multiprocessing.get_context(config.WORKER_START_METHOD)
+        self.responses = context.Queue()
+        self._context = context
+    
+    def start(self, timeout: float = 60.0) -> None:
+        """
+        Start the worker processes and the response reader, and wait until the workers are ready
+        
+        Args:
+            timeout: Seconds to wait for the workers' first heartbeat
+        """
+        if self.running:
+            return
+        
+        self.stopping = False
+        self.workers = [self._spawn(index) for index in range(self.worker_count)]
+        
+        self.running = True
+        self.reader = threading.Thread(target=self._read_responses, name="SessionRouter", daemon=True)
+        self.reader.start()
+        
+        with self.changed:
+            ready = self.changed.wait_for(
+                lambda: all(worker.last_heartbeat is not None for worker in self.workers), timeout)
+        if not ready:
+            logger.warning("Not all session workers were ready after %.0f s", timeout)
+        logger.info("Started %s session workers", self.worker_count)
+    
+    def stop(self) -> None:
+        """
+        Stop the workers after their running turns and fail pending requests
+        """
+        # Workers exiting from here on aren't restarted
+        self.stopping = True
+        for worker in self.workers:
+            worker.requests.put(None)
+        for worker in self.workers:
+            worker.process.join(timeout=5.0)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        
+        self.running = False
+        if self.reader:
+            self.reader.join(timeout=1.0)
+        
+        with self.lock:
+            pending = list(self.pending.values())
+            self.pending.clear()
+        for future, _, _ in pending:
+            future.set_exception(RuntimeError("Session router stopped"))
+    
+    def submit(self, session_id: str, user_input: str) -> Future:
+        """
+        Send a user input to the session's worker
+        
+        Args:
+            session_id: Session ID
+            user_input: User's message
+        
+        Returns:
+            Future: Resolves to the response of ConversationAgent.process
+        """
+        with self.changed:
+            self.changed.wait_for(lambda: session_id not in self.migrating)
+            index = self.routes.get(session_id)
+            if index is None:
+                index = self.routes[session_id] = self._pick_worker()
+            return self._send(index, "turn", session_id, user_input)
+    
+    def process(self, session_id: str, user_input: str, timeout: float = None) -> Dict[str, Any]:
+        """
+        Run a turn and wait for the response
+        
+        Args:
+            session_id: Session ID
+            user_input: User's message
+            timeout: Seconds to wait (None waits indefinitely)
+        
+        Returns:
+            Dict[str, Any]: Response information
+        """
+        return self.submit(session_id, user_input).result(timeout)
+    
+    def close_session(self, session_id: str) -> None:
+        """
+        Forget a session and free its context in the worker
+        
+        Args:
+            session_id: Session ID
+        """
+        with self.changed:
+            self.changed.wait_for(lambda: session_id not in self.migrating)
+            index = self.routes.pop(session_id, None)
+            if index is not None:
+                self._send(index, "close", session_id, None)
+    
+    def drain(self, index: int, timeout: float = 30.0) -> int:
+        """
+        Stop routing new sessions to a worker and move its sessions elsewhere
+        
+        Args:
+            index: Worker index
+            timeout: Seconds allowed per export and import
+        
+        Returns:
+            int: Number of sessions moved
+        """
+        with self.lock:
+            self.workers[index].draining = True
+            sessions = [session_id for session_id, worker in self.routes.items() if worker == index]
+        
+        for session_id in sessions:
+            self._migrate(session_id, timeout)
+        logger.info("Drained worker %s, moved %s session(s)", index, len(sessions))
+        return len(sessions)
+    
+    def undrain(self, index: int) -> None:
+        """
+        Route new sessions to a drained worker again
+        
+        Args:
+            index: Worker index
+        """
+        with self.lock:
+            self.workers[index].draining = False
+    
+    def _migrate(self, session_id: str, timeout: float) -> None:
+        """
+        Move a session to the least-loaded other worker
+        
+        The source keeps its copy until the target has imported it, and only
+        then is told to drop it; on any failure the route stays on the source,
+        which still holds the session.
+        
+        Args:
+            session_id: Session ID
+            timeout: Seconds allowed per export and import
+        """
+        with self.changed:
+            self.migrating.add(session_id)
+            # Running turns finish where they started
+            self.changed.wait_for(lambda: not self.in_flight.get(session_id))
+            source = self.routes.get(session_id)
+        
+        try:
+            if source is None:
+                # Closed, or lost with a failed worker, while waiting
+                return
+            with self.lock:
+                target = self._pick_worker()
+                exported = self._send(source, "export", session_id, None)
+            state = exported.result(timeout)
+            
+            with self.lock:
+                imported = self._send(target, "import", session_id, state)
+            try:
+                imported.result(timeout)
+            except Exception:
+                # A late import would leave an unused copy on the target
+                with self.lock:
+                    if self.workers[target].process.is_alive():
+                        self._send(target, "close", session_id, None)
+                raise
+            
+            with self.lock:
+                # The route may have been dropped if the source failed meanwhile
+                if self.routes.get(session_id) == source:
+                    self._send(source, "close", session_id, None)
+                self.routes[session_id] = target
+                self.migrations += 1
+        finally:
+            with self.changed:
+                self.migrating.discard(session_id)
+                self.changed.notify_all()
+    
+    def _pick_worker(self) -> int:
+        """
+        Choose the healthy, non-draining worker with the fewest sessions (lock held)
+        
+        Returns:
+            int: Worker index
+        """
+        load = defaultdict(int)
+        for index in self.routes.values():
+            load[index] += 1
+        
+        candidates = [worker.index for worker in self.workers if worker.healthy and not worker.draining]
+        if not candidates:
+            raise RuntimeError("No healthy session worker available")
+        return min(candidates, key=lambda index: load[index])
+    
+    def _send(self, index: int, kind: str, session_id: str, payload: Any) -> Future:
+        """
+        Queue a request to a worker (lock held)
+        
+        Args:
+            index: Worker index
+            kind: "turn", "export", "import" or "close"
+            session_id: Session ID
+            payload: Request data
+        
+        Returns:
+            Future: Resolves to the worker's result
+        """
+        request_id = next(self.request_ids)
+        future = Future()
+        self.pending[request_id] = (future, session_id, index)
+        self.in_flight[session_id] += 1
+        self.workers[index].requests.put((kind, request_id, session_id, payload))
+        return future
+    
+    def _spawn(self, index: int) -> _Worker:
+        """
+        Start a worker process
+        
+        Args:
+            index: Worker index
+        
+        Returns:
+            _Worker: Handle of the new worker, healthy once it sends its first heartbeat
+        """
+        requests = self._context.Queue()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(index, requests, self.responses, self.llm_factory),
+            name=f"SessionWorker-{index}",
+            daemon=True
+        )
+        process.start()
+        return _Worker(index, process, requests)
+    
+    def _check_workers(self) -> None:
+        """
+        Restart workers that died or stopped sending heartbeats, failing their pending requests
+        """
+        if self.stopping:
+            return
+        
+        failed = []
+        with self.changed:
+            for worker in self.workers:
+                stale = (worker.last_heartbeat is not None
+                         and time.monotonic() - worker.last_heartbeat > config.SESSION_HEARTBEAT_TIMEOUT)
+                if not worker.process.is_alive() or stale:
+                    failed.extend(self._restart(worker))
+            if failed:
+                self.changed.notify_all()
+        
+        for future in failed:
+            future.set_exception(RuntimeError("Session worker failed"))
+    
+    def _restart(self, worker: _Worker) -> List[Future]:
+        """
+        Replace a failed worker and forget what it held (lock held)
+        
+        Args:
+            worker: Failed worker
+        
+        Returns:
+            List[Future]: Pending requests of the worker, to be failed outside the lock
+        """
+        if worker.process.is_alive():
+            worker.process.terminate()
+        
+        futures = []
+        for request_id, (future, session_id, index) in list(self.pending.items()):
+            if index == worker.index:
+                del self.pending[request_id]
+                futures.append(future)
+                self.in_flight[session_id] -= 1
+                if not self.in_flight[session_id]:
+                    del self.in_flight[session_id]
+        
+        # Sessions lived in the worker, their next turn is routed anew
+        lost = [session_id for session_id, index in self.routes.items() if index == worker.index]
+        for session_id in lost:
+            del self.routes[session_id]
+        
+        logger.error("Session worker %s failed (exit code %s), restarting it: %s pending request(s) failed, "
+                     "%s session(s) lost", worker.index, worker.process.exitcode, len(futures), len(lost))
+        replacement = self._spawn(worker.index)
+        replacement.draining = worker.draining
+        self.workers[worker.index] = replacement
+        self.restarts += 1
+        return futures
+    
+    def _read_responses(self) -> None:
+        """
+        Resolve futures and record heartbeats from the shared response queue, and watch worker health
+        """
+        last_check = time.monotonic()
+        while self.running:
+            # Heartbeats of the other workers may keep the queue busy, so checks don't wait for a lull
+            if time.monotonic() - last_check >= config.SESSION_HEARTBEAT_INTERVAL:
+                last_check = time.monotonic()
+                try:
+                    self._check_workers()
+                except Exception as e:
+                    logger.error("Session worker check failed: %s", e)
+            
+            try:
+                kind, index, request_id, payload = self.responses.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            
+            if kind == "heartbeat":
+                with self.changed:
+                    worker = self.workers[index]
+                    worker.stats = payload
+                    worker.last_heartbeat = time.monotonic()
+                    self.changed.notify_all()
+                continue
+            
+            with self.changed:
+                entry = self.pending.pop(request_id, None)
+                if entry is None:
+                    continue
+                future, session_id, _ = entry
+                self.in_flight[session_id] -= 1
+                if not self.in_flight[session_id]:
+                    del self.in_flight[session_id]
+                self.changed.notify_all()
+            
+            if kind == "result":
+                future.set_result(payload)
+            else:
+                logger.warning("Worker %s failed a request for session %s: %s", index, session_id, payload)
+                future.set_exception(RuntimeError(payload))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return health and load of every worker and their totals
+        
+        Returns:
+            Dict[str, Any]: Per-worker stats and aggregate sessions, active turns and turns
+        """
+        with self.lock:
+            routed = defaultdict(int)
+            for index in self.routes.values():
+                routed[index] += 1
+            workers = [
+                dict(
+                    worker.stats,
+                    index=worker.index,
+                    pid=worker.process.pid,
+                    alive=worker.process.is_alive(),
+                    healthy=worker.healthy,
+                    draining=worker.draining,
+                    routed_sessions=routed[worker.index],
+                    heartbeat_age=time.monotonic() - worker.last_heartbeat if worker.last_heartbeat else None
+                )
+                for worker in self.workers
+            ]
+            migrations = self.migrations
+            restarts = self.restarts
+            pending = len(self.pending)
+        
+        return {
+            "workers": workers,
+            "healthy_workers": sum(1 for worker in workers if worker["healthy"]),
+            "sessions": sum(worker["routed_sessions"] for worker in workers),
+            "active_turns": sum(worker.get("active", 0) for worker in workers),
+            "turns": sum(worker.get("turns", 0) for worker in workers),
+            "pending_requests": pending,
+            "migrations": migrations,
+            "restarts": restarts
+        }
\ No newline at end of file
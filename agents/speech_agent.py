@@ -3,72 +3,117 @@ Agent responsible for speech synthesis
 """
 
 from queue import Queue, Empty  # Import Empty exception directly
-from typing import Optional
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+import itertools
 import time
 from agents.base_agent import BaseAgent
 from modules.emotion_manager import EmotionManager
-from openai import OpenAI
-import pyaudio
+from modules.response_cache import ResponseCache
+from modules.lip_sync import LipSyncAnalyzer
+from modules.tts_backend import TTSBackend, create_tts_backend
+from modules.audio_sink import AudioSink, create_audio_sink
+from utils.channels import FILLER_COMMAND, INTERRUPT_COMMAND, PRIORITY_HIGH
 import threading
+import config
 
 class SpeechAgent(BaseAgent):
     """Agent managing speech synthesis"""
     
-    def __init__(self, input_queue: Queue = None):
+    def __init__(self, input_queue: Queue = None, response_cache: Optional[ResponseCache] = None,
+                 lip_sync_queue: Optional[Queue] = None, backend: Optional[TTSBackend] = None,
+                 sink: Optional[AudioSink] = None):
         """
         Initialize speech synthesis agent
         
         Args:
-            input_queue: Queue for texts to synthesize
+            input_queue: Queue for texts to synthesize (priority channel by default)
+            response_cache: Response cache holding pre-rendered audio (optional)
+            lip_sync_queue: Queue receiving the mouth-open track of played audio (optional)
+            backend: TTS backend (default: backend named by config.TTS_BACKEND)
+            sink: Audio output (default: sink named by config.AUDIO_SINK)
         """
-        super().__init__("Speech", input_queue)
+        super().__init__("Speech", input_queue, channel="priority", capacity=config.SPEECH_QUEUE_CAPACITY,
+                         overflow=config.SPEECH_QUEUE_OVERFLOW)
         self.emotion_manager = EmotionManager()
+        self.response_cache = response_cache
         self.is_speaking = False
         self.current_text = ""
         
-        # Initialize Kokoro TTS client
-        self.client = OpenAI(
-            base_url="http://localhost:8880/v1", 
-            api_key="not-needed"
-        )
+        # Initialize TTS backend (remote server or in-process engine)
+        self.backend = backend or create_tts_backend()
+        self.chunk_size = self.backend.chunk_size
+        self.prerendered = {}  # Clean text -> PCM, filled by warm_audio
         
-        # Initialize PyAudio player
-        self.pyaudio_instance = pyaudio.PyAudio()
-        self.player = None
+        # Audio output (sound card, WAV files or remote listeners)
+        self.sink = sink or create_audio_sink(self.backend.sample_rate)
+        self.sink_open = False  # True while a reply holds the sink
         self.stop_requested = False
         self.tts_thread = None
+        self.first_audio_at = None
+        self.on_timing = None  # Callback (text, first_audio_ms, total_ms, interrupted) after each utterance
+        
+        # Fillers play from pre-rendered audio, on their own thread, until a reply has audio
+        self.filler_thread = None
+        self.filler_stop = threading.Event()
+        self.filler_released = threading.Event()  # Set once no filler holds the sink
+        self.filler_released.set()
+        
+        # Mouth-open track computed from the audio as it is played
+        self.lip_sync = None
+        if lip_sync_queue is not None and config.LIP_SYNC_ENABLED:
+            self.lip_sync = LipSyncAnalyzer(lip_sync_queue, sample_rate=self.backend.sample_rate)
+    
+    def stop(self) -> None:
+        """
+        Stop the agent and release the TTS backend
+        """
+        self.interrupt()
+        super().stop()
+        self.backend.close()
+        self.sink.close()
     
-    def process(self, text: str) -> None:
+    def process(self, text: Union[str, Tuple[str, str]]) -> None:
         """
         Process new text to synthesize
         
         Args:
-            text: Text to synthesize
+            text: Text to synthesize, or (FILLER_COMMAND, text) for a filler
             
         Returns:
             None
         """
+        # Interrupt command served ahead of pending speech
+        if text == INTERRUPT_COMMAND:
+            self.interrupt()
+            return None
+        
+        # Fillers are tagged by the filler stage, a reply with the same words is still spoken
+        if isinstance(text, tuple) and text[0] == FILLER_COMMAND:
+            self._start_filler(self.emotion_manager.strip_emotions(text[1]))
+            return None
+        
         # Clean text of emotion tags
         clean_text = self.emotion_manager.strip_emotions(text)
         
         if not clean_text.strip():
-            print("WARNING - Empty text received for speech synthesis")
+            self.logger.warning("Empty text received for speech synthesis")
             return None
         
-        # Interrupt any ongoing speech
-        self.interrupt()
+        # Interrupt any ongoing speech (a filler plays on until the reply's first audio is ready)
+        self.interrupt(keep_filler=True)
         
         # Mark as speaking
         self.is_speaking = True
         self.current_text = clean_text
         self.stop_requested = False
         
-        print(f"DEBUG - Speech synthesis: '{clean_text}'")
+        self.logger.debug("Speech synthesis: '%s'", clean_text)
         
         # Start synthesis in a separate thread
         self.tts_thread = threading.Thread(
             target=self._synthesize_and_play,
-            args=(clean_text,)
+            args=(clean_text,),
+            name=f"{self.name}/tts"
         )
         self.tts_thread.start()
         
@@ -81,54 +126,208 @@ class SpeechAgent(BaseAgent):
         Args:
             text: Text to synthesize
         """
+        start = time.perf_counter()
+        self.first_audio_at = None
+        stream = None
+        rendered = None
         try:
-            # Initialize player for this session
-            self.player = self.pyaudio_instance.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=24000,
-                output=True
-            )
+            # Play pre-rendered audio directly when the response was cached or warmed
+            cached_audio = self.prerendered.get(text)
+            if cached_audio is None and self.response_cache:
+                cached_audio = self.response_cache.get_audio(text)
+            if cached_audio:
+                self.logger.debug("Playing pre-rendered audio from cache")
+                chunks = (cached_audio[offset:offset + self.chunk_size]
+                          for offset in range(0, len(cached_audio), self.chunk_size))
+            else:
+                # Keep the audio if a cached response is waiting for it
+                rendered = [] if self.response_cache and self.response_cache.wants_audio(text) else None
+                stream = self.backend.stream(text)
+                chunks = stream
+            
+            # Synthesize the first chunk while a filler may still be playing, then take over
+            first_chunk = next(chunks, None)
+            self._end_filler()
+            if first_chunk is None or self.stop_requested:
+                return
+            
+            # Start the utterance on the sink
+            self.sink.begin()
+            self.sink_open = True
+            if self.lip_sync:
+                self.lip_sync.begin(self.sink.output_latency)
             
             # Stream synthesis to speakers
-            with self.client.audio.speech.with_streaming_response.create(
-                model="kokoro",
-                voice="af_bella",  # You may want to make this configurable
-                response_format="pcm",
-                input=text
-            ) as response:
-                for chunk in response.iter_bytes(chunk_size=1024):
-                    if self.stop_requested:
-                        break
-                    self.player.write(chunk)
+            for chunk in itertools.chain([first_chunk], chunks):
+                if self.stop_requested:
+                    break
+                self._play_chunk(chunk)
+                if rendered is not None:
+                    rendered.append(chunk)
+            
+            # Only complete renderings are reused
+            if rendered and not self.stop_requested:
+                self.response_cache.attach_audio(text, b"".join(rendered))
                     
         except Exception as e:
-            print(f"ERROR - Speech synthesis failed: {e}")
+            self.logger.error("Speech synthesis failed: %s", e)
         finally:
+            # Release the backend stream (and its pooled connection) right away
+            if stream is not None:
+                stream.close()
+            self._end_filler()
+            
+            if self.lip_sync:
+                self.lip_sync.end(interrupted=self.stop_requested)
+            
             # Clean up resources
-            if self.player:
-                self.player.stop_stream()
-                self.player.close()
-                self.player = None
+            if self.sink_open:
+                self.sink.end(interrupted=self.stop_requested)
+                self.sink_open = False
+            
+            if self.on_timing and self.first_audio_at is not None:
+                self.on_timing(text, (self.first_audio_at - start) * 1000,
+                               (time.perf_counter() - start) * 1000, self.stop_requested)
             
             # Mark as finished speaking
             self.is_speaking = False
     
+    def _play_chunk(self, chunk: bytes) -> None:
+        """
+        Write a PCM chunk to the speakers, then analyze it for lip-sync
+        
+        Args:
+            chunk: 16-bit mono PCM
+        """
+        if self.first_audio_at is None:
+            self.first_audio_at = time.perf_counter()
+        self.sink.write(chunk)
+        
+        # Analysis runs after the write so it never delays playback
+        if self.lip_sync:
+            self.lip_sync.feed(chunk)
+    
+    def _start_filler(self, text: str) -> None:
+        """
+        Play a pre-rendered filler unless something is already being said
+        
+        Args:
+            text: Clean filler text
+        """
+        audio = self.prerendered.get(text)
+        if audio is None or self.is_speaking or (self.filler_thread and self.filler_thread.is_alive()):
+            self.logger.debug("Filler '%s' skipped (%s)", text, "not rendered yet" if audio is None else "busy")
+            return
+        
+        self.filler_stop.clear()
+        self.filler_released.clear()
+        self.filler_thread = threading.Thread(target=self._play_filler, args=(audio,), name=f"{self.name}/filler")
+        self.filler_thread.start()
+    
+    def _play_filler(self, audio: bytes) -> None:
+        """
+        Play filler audio until it ends or a reply takes over
+        
+        Args:
+            audio: 16-bit mono PCM
+        """
+        opened = False
+        try:
+            self.sink.begin()
+            opened = True
+            if self.lip_sync:
+                self.lip_sync.begin(self.sink.output_latency)
+            
+            for offset in range(0, len(audio), self.chunk_size):
+                if self.filler_stop.is_set():
+                    break
+                chunk = audio[offset:offset + self.chunk_size]
+                self.sink.write(chunk)
+                if self.lip_sync:
+                    self.lip_sync.feed(chunk)
+        
+        except Exception as e:
+            self.logger.error("Filler playback failed: %s", e)
+        finally:
+            if self.lip_sync:
+                self.lip_sync.end(interrupted=self.filler_stop.is_set())
+            if opened:
+                self.sink.end(interrupted=self.filler_stop.is_set())
+            self.filler_released.set()
+    
+    def _end_filler(self) -> None:
+        """
+        Stop the filler, if one is playing, and wait for it to release the sink
+        """
+        self.filler_stop.set()
+        if self.filler_thread is threading.current_thread():
+            return
+        # A reply beginning on the sink before the filler ended it would have its stream closed by the filler
+        while not self.filler_released.wait(1.0):
+            self.logger.warning("Still waiting for the filler to release the audio sink")
+    
+    def warm_audio(self, texts: Iterable[str]) -> Iterator[None]:
+        """
+        Idle job: pre-render audio for texts, one text per step
+        
+        Args:
+            texts: Texts to render (e.g. config.DEFAULT_RESPONSES values)
+        
+        Returns:
+            Iterator[None]: Generator yielding after each rendered text
+        """
+        for text in texts:
+            clean_text = self.emotion_manager.strip_emotions(text)
+            if not clean_text.strip() or clean_text in self.prerendered:
+                continue
+            
+            stream = self.backend.stream(clean_text)
+            try:
+                self.prerendered[clean_text] = b"".join(stream)
+            finally:
+                stream.close()
+            yield
+    
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        Return the approximate memory held by audio buffers
+        
+        Returns:
+            Dict[str, int]: Bytes of pre-rendered audio and buffered lip-sync samples
+        """
+        prerendered = dict(self.prerendered)
+        return {
+            "prerendered_audio": sum(len(audio) for audio in prerendered.values()),
+            "lip_sync": self.lip_sync.pending.nbytes if self.lip_sync else 0
+        }
+    
     def is_busy(self) -> bool:
         """
         Indicates if agent is busy speaking
         
         Returns:
-            bool: True if agent is speaking
+            bool: True if agent is speaking (a filler included)
+        """
+        return self.is_speaking or bool(self.filler_thread and self.filler_thread.is_alive())
+    
+    def request_interrupt(self) -> None:
+        """
+        Queue an interrupt ahead of any pending speech
         """
-        return self.is_speaking
+        self.send(INTERRUPT_COMMAND, priority=PRIORITY_HIGH)
     
-    def interrupt(self) -> None:
+    def interrupt(self, keep_filler: bool = False) -> None:
         """
         Interrupts ongoing speech synthesis
+        
+        Args:
+            keep_filler: Leave a playing filler to be pre-empted by the next reply's audio
         """
+        if not keep_filler:
+            self._end_filler()
+        
         if self.is_speaking:
-            print("DEBUG - Speech interrupted")
+            self.logger.debug("Speech interrupted")
             self.stop_requested = True
             
             # Wait for thread to finish
@@ -136,9 +335,8 @@ class SpeechAgent(BaseAgent):
                 self.tts_thread.join(timeout=1.0)
                 
             # Clean up if thread didn't exit properly
-            if self.player:
-                self.player.stop_stream()
-                self.player.close()
-                self.player = None
+            if self.sink_open:
+                self.sink.end(interrupted=True)
+                self.sink_open = False
                 
             self.is_speaking = False
\ No newline at end of file
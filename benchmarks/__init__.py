@@ -0,0 +1,4 @@
+"""
+Benchmarks for AIRA4 AI Companion
+Run from the repository root, e.g. python -m benchmarks.tts_benchmark
+"""
\ No newline at end of file
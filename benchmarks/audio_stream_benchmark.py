@@ -0,0 +1,94 @@
+"""
+Audio streaming benchmark
+Measures encode cost and bandwidth per stream of the WebSocket audio sink's codecs
+
+Usage:
+    python -m benchmarks.audio_stream_benchmark --codecs opus pcm --seconds 30 --bitrates 16000 24000 32000
+"""
+
+import argparse
+import time
+from typing import Dict
+import numpy as np
+from modules.audio_sink import ENCODERS
+import config
+
+def speech_like_pcm(seconds: float, sample_rate: int) -> bytes:
+    """
+    Generate a voice-like test signal: a gliding harmonic tone with syllable-rate amplitude
+    
+    Args:
+        seconds: Duration
+        sample_rate: Sample rate in Hz
+    
+    Returns:
+        bytes: 16-bit mono PCM
+    """
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 180 + 40 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voice = sum(np.sin(phase * harmonic) / harmonic for harmonic in range(1, 8))
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t).clip(0)
+    noise = np.random.default_rng(0).normal(0, 0.02, t.size)
+    signal = (voice * envelope / 2 + noise).clip(-1, 1)
+    return (signal * 32767 * 0.5).astype("<i2").tobytes()
+
+def run(codec: str, pcm: bytes, sample_rate: int, frame_ms: int, bitrate: int) -> Dict[str, float]:
+    """
+    Encode a signal frame by frame as the sink does
+    
+    Args:
+        codec: Encoder name
+        pcm: 16-bit mono PCM
+        sample_rate: Sample rate in Hz
+        frame_ms: Frame duration in ms
+        bitrate: Target bits per second
+    
+    Returns:
+        Dict[str, float]: Encode time per frame, share of one core per stream, streams per core and kbit/s
+    """
+    frame_samples = sample_rate * frame_ms // 1000
+    frame_bytes = frame_samples * 2
+    encoder = ENCODERS[codec](sample_rate, frame_samples, bitrate)
+    frames = [pcm[start:start + frame_bytes] for start in range(0, len(pcm) - frame_bytes + 1, frame_bytes)]
+    
+    output_bytes = 0
+    start = time.process_time()
+    for frame in frames:
+        output_bytes += len(encoder.encode(frame))
+    cpu = time.process_time() - start
+    
+    audio_seconds = len(frames) * frame_ms / 1000
+    return {
+        "us_per_frame": cpu / len(frames) * 1e6,
+        "core_share": cpu / audio_seconds,
+        "streams_per_core": audio_seconds / cpu if cpu else float("inf"),
+        "kbit_per_s": output_bytes * 8 / 1000 / audio_seconds
+    }
+
+def main() -> None:
+    """Run the benchmark and print results"""
+    parser = argparse.ArgumentParser(description="Benchmark audio stream encoding")
+    parser.add_argument("--codecs", nargs="+", default=list(ENCODERS))
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--bitrates", nargs="+", type=int, default=[config.AUDIO_SINK_OPUS_BITRATE])
+    parser.add_argument("--frame-ms", type=int, default=config.AUDIO_SINK_FRAME_MS)
+    parser.add_argument("--sample-rate", type=int, default=config.TTS_SAMPLE_RATE)
+    args = parser.parse_args()
+    
+    pcm = speech_like_pcm(args.seconds, args.sample_rate)
+    print(f"{args.seconds:.0f} s of {args.sample_rate} Hz audio, {args.frame_ms} ms frames")
+    print(f"{'codec':<6} {'bitrate':>8} {'us/frame':>9} {'core %':>7} {'streams/core':>13} {'kbit/s':>8}")
+    for codec in args.codecs:
+        # The bitrate only applies to compressed codecs
+        for bitrate in args.bitrates if codec != "pcm" else [0]:
+            try:
+                result = run(codec, pcm, args.sample_rate, args.frame_ms, bitrate or None)
+            except (ImportError, OSError) as e:
+                print(f"{codec:<6} skipped: {e}")
+                break
+            print(f"{codec:<6} {bitrate or '-':>8} {result['us_per_frame']:>9.1f} {result['core_share'] * 100:>7.2f} "
+                  f"{result['streams_per_core']:>13.0f} {result['kbit_per_s']:>8.1f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+LLM backend benchmark
+Compares Ollama with in-process llama.cpp on a scripted conversation
+
+Usage:
+    python -m benchmarks.llm_backend_benchmark --gguf models/gemma-3-1b-it-q4_0.gguf \
+        --ollama-model gemma3:1b --turns 6
+"""
+
+import argparse
+import os
+import statistics
+import time
+from typing import Dict, List
+from modules.llm_backends import LLMBackend, OllamaBackend, LlamaCppBackend
+import config
+
+USER_TURNS = [
+    "Hi! Who are you?",
+    "What's your plan for today?",
+    "Do you like cookies?",
+    "Can I join your army?",
+    "What would you do with the world once you rule it?",
+    "Tell me a secret.",
+    "Are you really that evil?",
+    "Goodnight, little demon."
+]
+
+def run_conversation(backend: LLMBackend, model: str, turns: int, max_tokens: int) -> Dict[str, float]:
+    """
+    Run a scripted conversation and time each turn
+    
+    Args:
+        backend: Backend to benchmark
+        model: Model name passed to the backend
+        turns: Number of user turns
+        max_tokens: Generation cap per turn
+    
+    Returns:
+        Dict[str, float]: Median first-token latency, median turn time and generation rate
+    """
+    messages = [{"role": "system", "content": config.SYSTEM_PROMPT}]
+    options = {"temperature": 0.0, "num_ctx": config.MAX_CONTEXT_TOKENS, "num_predict": max_tokens}
+    first_token_times: List[float] = []
+    turn_times: List[float] = []
+    tokens = 0
+    generation_seconds = 0.0
+    
+    for i in range(turns):
+        messages.append({"role": "user", "content": USER_TURNS[i % len(USER_TURNS)]})
+        
+        start = time.perf_counter()
+        first_token = None
+        parts = []
+        for chunk in backend.stream_chat(model, messages, options):
+            content = chunk["message"]["content"]
+            if content:
+                if first_token is None:
+                    first_token = time.perf_counter()
+                parts.append(content)
+        end = time.perf_counter()
+        
+        first_token = first_token or end
+        first_token_times.append(first_token - start)
+        turn_times.append(end - start)
+        tokens += len(parts)
+        generation_seconds += end - first_token
+        messages.append({"role": "assistant", "content": "".join(parts)})
+    
+    return {
+        "first_token_ms": statistics.median(first_token_times) * 1000,
+        "turn_ms": statistics.median(turn_times) * 1000,
+        "tokens_per_s": tokens / generation_seconds if generation_seconds else 0.0
+    }
+
+def time_llama_startup(gguf: str) -> Dict[str, float]:
+    """
+    Measure llama.cpp startup without and with a saved prompt state
+    
+    Args:
+        gguf: Path to the GGUF model
+    
+    Returns:
+        Dict[str, float]: Cold and restored startup times in milliseconds
+    """
+    probe = LlamaCppBackend(model_path=gguf)
+    state_path = probe._state_path()
+    del probe
+    if os.path.exists(state_path):
+        os.remove(state_path)
+    
+    start = time.perf_counter()
+    LlamaCppBackend(model_path=gguf)
+    cold = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    LlamaCppBackend(model_path=gguf)
+    restored = time.perf_counter() - start
+    
+    return {"cold_start_ms": cold * 1000, "restored_start_ms": restored * 1000}
+
+def main() -> None:
+    """Run the benchmark and print results"""
+    parser = argparse.ArgumentParser(description="Benchmark Ollama against in-process llama.cpp")
+    parser.add_argument("--gguf", required=True, help="Small local GGUF model for llama.cpp")
+    parser.add_argument("--ollama-model", required=True, help="The same model as served by Ollama")
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--max-tokens", type=int, default=64)
+    args = parser.parse_args()
+    
+    startup = time_llama_startup(args.gguf)
+    print(f"llama.cpp startup: {startup['cold_start_ms']:.0f} ms cold, "
+          f"{startup['restored_start_ms']:.0f} ms with saved prompt state")
+    
+    backends = [
+        ("ollama", OllamaBackend(), args.ollama_model),
+        ("llama_cpp", LlamaCppBackend(model_path=args.gguf), args.gguf)
+    ]
+    
+    print(f"{'backend':<10} {'first token (ms)':>17} {'turn (ms)':>10} {'tok/s':>7}")
+    for name, backend, model in backends:
+        # One warm-up turn so model loading isn't measured
+        run_conversation(backend, model, 1, 4)
+        result = run_conversation(backend, model, args.turns, args.max_tokens)
+        print(f"{name:<10} {result['first_token_ms']:>17.1f} {result['turn_ms']:>10.1f} {result['tokens_per_s']:>7.1f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
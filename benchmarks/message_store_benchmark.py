@@ -0,0 +1,161 @@
+"""
+Message store memory benchmark
+Compares LangChain message objects with the column-oriented MessageStore
+
+Usage:
+    python -m benchmarks.message_store_benchmark --sessions 10000 --messages 50
+"""
+
+import argparse
+import gc
+import re
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Any
+from langchain_core.messages import AIMessage, HumanMessage
+from modules.message_store import MessageStore, ROLE_USER, ROLE_ASSISTANT
+from utils.token_counter import count_tokens
+import config
+
+FILLER = "so tell me more about your evil plans for the cookie kingdom, little demon, and what happens to me then"
+EMOTION_PATTERN = re.compile(r"\[(excited|evil|embarrassed|annoyed|curious|triumphant|sad|neutral)\]")
+
+def make_content(session: int, index: int) -> str:
+    """
+    Build a message of realistic length (new string per call)
+    
+    Args:
+        session: Session number
+        index: Message number in the session
+    
+    Returns:
+        str: Message content, assistant messages ending with an emotion tag
+    """
+    text = f"Message {index} of session {session}: {FILLER[:(session * 7 + index * 37) % len(FILLER)]}"
+    if index % 2:
+        text += f" [{config.VALID_EMOTIONS[(session + index) % len(config.VALID_EMOTIONS)]}]"
+    return text
+
+def build_langchain(sessions: int, messages: int) -> List[List[Any]]:
+    """
+    Build histories the way ContextManager used to store them
+    
+    Args:
+        sessions: Number of sessions
+        messages: Messages per session
+    
+    Returns:
+        List[List[Any]]: LangChain messages per session
+    """
+    histories = []
+    for session in range(sessions):
+        history = []
+        for index in range(messages):
+            content = make_content(session, index)
+            if index % 2:
+                emotion = EMOTION_PATTERN.findall(content)[-1]
+                history.append(AIMessage(content=content, metadata={"emotion": emotion}))
+            else:
+                history.append(HumanMessage(content=content))
+        histories.append(history)
+    return histories
+
+def build_store(sessions: int, messages: int) -> List[MessageStore]:
+    """
+    Build histories as MessageStores
+    
+    Args:
+        sessions: Number of sessions
+        messages: Messages per session
+    
+    Returns:
+        List[MessageStore]: Store per session
+    """
+    histories = []
+    for session in range(sessions):
+        store = MessageStore()
+        for index in range(messages):
+            content = make_content(session, index)
+            tokens = count_tokens(content)
+            if index % 2:
+                emotion = EMOTION_PATTERN.findall(content)[-1]
+                store.append(ROLE_ASSISTANT, EMOTION_PATTERN.sub("", content).strip(), tokens, emotion)
+            else:
+                store.append(ROLE_USER, content, tokens)
+        histories.append(store)
+    return histories
+
+def langchain_to_dicts(history: List[Any]) -> List[Dict[str, str]]:
+    """Per-turn conversion previously done by ContextManager.get_ollama_messages"""
+    result = []
+    for msg in history:
+        if isinstance(msg, HumanMessage):
+            result.append({"role": "user", "content": msg.content})
+        elif isinstance(msg, AIMessage):
+            result.append({"role": "assistant", "content": EMOTION_PATTERN.sub("", msg.content).strip()})
+    return result
+
+def measure(build: Callable[[int, int], List[Any]], sessions: int, messages: int) -> Dict[str, Any]:
+    """
+    Measure memory and build time of a representation
+    
+    Args:
+        build: Builder function
+        sessions: Number of sessions
+        messages: Messages per session
+    
+    Returns:
+        Dict[str, Any]: Histories, traced bytes and build time
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    histories = build(sessions, messages)
+    build_seconds = time.perf_counter() - start
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"histories": histories, "bytes": traced, "build_seconds": build_seconds}
+
+def time_conversion(convert: Callable[[Any], Any], histories: List[Any], rounds: int = 5) -> float:
+    """
+    Return the mean time to convert one history to Ollama format
+    
+    Args:
+        convert: Conversion function
+        histories: Histories to convert
+        rounds: Passes over the histories
+    
+    Returns:
+        float: Microseconds per conversion
+    """
+    sample = histories[:1000]
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for history in sample:
+            convert(history)
+    return (time.perf_counter() - start) / (rounds * len(sample)) * 1e6
+
+def main() -> None:
+    """Run the benchmark and print results"""
+    parser = argparse.ArgumentParser(description="Benchmark message history memory")
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--messages", type=int, default=50)
+    args = parser.parse_args()
+    
+    total = args.sessions * args.messages
+    print(f"{args.sessions} sessions x {args.messages} messages ({total} messages)")
+    print(f"{'representation':<15} {'memory (MB)':>12} {'bytes/msg':>10} {'build (s)':>10} {'to dicts (us)':>14}")
+    
+    rows = [
+        ("langchain", build_langchain, langchain_to_dicts),
+        ("message_store", build_store, MessageStore.to_dicts)
+    ]
+    for name, build, convert in rows:
+        result = measure(build, args.sessions, args.messages)
+        convert_us = time_conversion(convert, result["histories"])
+        print(f"{name:<15} {result['bytes'] / 1e6:>12.1f} {result['bytes'] / total:>10.0f} "
+              f"{result['build_seconds']:>10.2f} {convert_us:>14.1f}")
+        del result
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
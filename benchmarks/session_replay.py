@@ -0,0 +1,234 @@
+"""
+Session replay load generator
+Drives recorded sessions against ConversationAgent at increasing concurrency
+
+Usage:
+    python -m benchmarks.session_replay logs/sessions.jsonl --speed 4 --sessions 1,2,4,8,16
+    python -m benchmarks.session_replay logs/sessions.jsonl --stub --stub-parallel 4
+"""
+
+import argparse
+import functools
+import statistics
+import threading
+import time
+from typing import Callable, Dict, Any, Iterator, List, Optional
+from agents.conversation_agent import ConversationAgent
+from agents.session_router import SessionRouter
+from modules.llm_backends import LLMBackend
+from modules.llm_interface import LLMInterface
+from modules.session_recorder import load_sessions
+import config
+
+STUB_REPLY_WORD = "cookie "
+
+class StubBackend(LLMBackend):
+    """
+    Backend that streams canned tokens at recorded speed
+    
+    Up to `parallel` requests generate at once, like an Ollama server with
+    OLLAMA_NUM_PARALLEL slots; further requests wait for a slot, which is
+    where latency breaks down as sessions are added. With session workers,
+    each worker process gets its own slots.
+    """
+    
+    def __init__(self, first_token_ms: float, token_ms: float, tokens: int, parallel: int):
+        """
+        Initialize stub backend
+        
+        Args:
+            first_token_ms: Delay before the first token (prompt processing)
+            token_ms: Delay between tokens
+            tokens: Tokens per reply
+            parallel: Requests served concurrently
+        """
+        self.first_token_ms = first_token_ms
+        self.token_ms = token_ms
+        self.tokens = max(1, tokens)
+        self.slots = threading.Semaphore(parallel)
+    
+    def stream_chat(self, model: str, messages: List[Dict[str, str]], options: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a canned reply ending with an emotion tag
+        
+        Args:
+            model: Ignored
+            messages: Ignored
+            options: Ignored
+        
+        Returns:
+            Iterator[Dict[str, Any]]: Ollama-style chat chunks
+        """
+        with self.slots:
+            time.sleep(self.first_token_ms / 1000)
+            for _ in range(self.tokens - 1):
+                yield {"message": {"content": STUB_REPLY_WORD}, "done": False}
+                time.sleep(self.token_ms / 1000)
+            yield {"message": {"content": f"[{config.DEFAULT_EMOTION}]"}, "done": True,
+                   "done_reason": "stop", "eval_count": self.tokens}
+
+def build_stub(sessions: List[Dict[str, Any]], parallel: int) -> StubBackend:
+    """
+    Derive stub timings from the median recorded turn
+    
+    Args:
+        sessions: Recorded sessions
+        parallel: Requests the stub serves concurrently
+    
+    Returns:
+        StubBackend: Backend reproducing the recorded LLM speed
+    """
+    turns = [turn for session in sessions for turn in session["turns"] if turn.get("tok")]
+    if not turns:
+        # Recordings without LLM turns (cache hits only): a typical local 27B model
+        return StubBackend(400.0, 40.0, 60, parallel)
+    
+    tokens = int(statistics.median(turn["tok"] for turn in turns))
+    llm_ms = statistics.median(turn["llm"] for turn in turns)
+    # Split the turn into prompt processing and generation at a 1:4 ratio
+    first_token_ms = llm_ms * 0.2
+    return StubBackend(first_token_ms, (llm_ms - first_token_ms) / tokens, tokens, parallel)
+
+def percentile(values: List[float], p: float) -> float:
+    """
+    Return a percentile of sorted values
+    
+    Args:
+        values: Sorted values
+        p: Percentile as a fraction
+    
+    Returns:
+        float: Value at the percentile, 0.0 if there are none
+    """
+    return values[min(len(values) - 1, int(p * len(values)))] if values else 0.0
+
+def replay_session(session: Dict[str, Any], speed: float, run_turn: Callable[[str], Any],
+                   latencies: List[float], lock: threading.Lock) -> None:
+    """
+    Replay one session's inputs with its think times divided by speed
+    
+    Args:
+        session: Recorded session
+        speed: Replay speed factor for the gaps between turns
+        run_turn: Runs a turn of this session (ConversationAgent.process or a routed call)
+        latencies: List receiving turn times in ms
+        lock: Guards latencies
+    """
+    for turn in session["turns"]:
+        time.sleep(turn["gap"] / speed)
+        start = time.perf_counter()
+        run_turn(turn["in"])
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+
+def run_level(sessions: List[Dict[str, Any]], concurrency: int, speed: float,
+              backend: Optional[LLMBackend], router: Optional[SessionRouter] = None) -> Dict[str, float]:
+    """
+    Replay `concurrency` sessions at once and measure turn latency
+    
+    Args:
+        sessions: Recorded sessions, assigned round-robin
+        concurrency: Concurrent sessions
+        speed: Replay speed factor
+        backend: LLM backend shared by in-process sessions (None: the configured backend)
+        router: Session router hosting the sessions in worker processes (None: in-process agents)
+    
+    Returns:
+        Dict[str, float]: Turns, throughput and latency percentiles
+    """
+    latencies: List[float] = []
+    lock = threading.Lock()
+    threads = []
+    for i in range(concurrency):
+        if router:
+            run_turn = functools.partial(router.process, f"replay-{concurrency}-{i}")
+        else:
+            run_turn = ConversationAgent(llm=LLMInterface(backend=backend) if backend else None).process
+        threads.append(threading.Thread(
+            target=replay_session,
+            args=(sessions[i % len(sessions)], speed, run_turn, latencies, lock),
+            name=f"Replay-{i}",
+            daemon=True
+        ))
+    
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    
+    if router:
+        for i in range(concurrency):
+            router.close_session(f"replay-{concurrency}-{i}")
+    
+    latencies.sort()
+    return {
+        "sessions": concurrency,
+        "turns": len(latencies),
+        "turns_per_s": len(latencies) / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99)
+    }
+
+def main() -> None:
+    """Run the replay at each concurrency level and print the latency curve"""
+    parser = argparse.ArgumentParser(description="Replay recorded sessions as load")
+    parser.add_argument("log", help="Session log written with SESSION_RECORDING_ENABLED")
+    parser.add_argument("--speed", type=float, default=1.0, help="Divide recorded think times by this factor")
+    parser.add_argument("--sessions", default="1,2,4,8,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--stub", action="store_true", help="Use a stub LLM backend instead of the configured one")
+    parser.add_argument("--stub-parallel", type=int, default=1, help="Requests the stub backend serves at once")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Host sessions in this many worker processes behind a SessionRouter (0: in-process)")
+    parser.add_argument("--knee-factor", type=float, default=2.0,
+                        help="p95 growth over the lowest level that counts as breaking down")
+    args = parser.parse_args()
+    
+    sessions = load_sessions(args.log)
+    if not sessions:
+        raise SystemExit(f"No recorded turns in {args.log}")
+    levels = sorted(int(level) for level in args.sessions.split(","))
+    
+    backend = None
+    if args.stub:
+        backend = build_stub(sessions, args.stub_parallel)
+        print(f"Stub backend: {backend.first_token_ms:.0f} ms to first token, "
+              f"{backend.token_ms:.1f} ms/token, {backend.tokens} tokens, {args.stub_parallel} slot(s)")
+    
+    router = None
+    if args.workers:
+        llm_factory = None
+        if backend:
+            llm_factory = functools.partial(StubBackend, backend.first_token_ms, backend.token_ms,
+                                            backend.tokens, args.stub_parallel)
+        router = SessionRouter(args.workers, llm_factory)
+        router.start()
+    
+    turns = sum(len(session["turns"]) for session in sessions)
+    print(f"{len(sessions)} recorded sessions, {turns} turns, speed {args.speed}x")
+    print(f"{'sessions':>8} {'turns':>6} {'turns/s':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9}")
+    
+    baseline = None
+    knee = None
+    try:
+        for level in levels:
+            result = run_level(sessions, level, args.speed, backend, router)
+            print(f"{result['sessions']:>8} {result['turns']:>6} {result['turns_per_s']:>8.2f} "
+                  f"{result['p50_ms']:>9.0f} {result['p95_ms']:>9.0f} {result['p99_ms']:>9.0f}")
+            baseline = baseline or result["p95_ms"]
+            if knee is None and baseline and result["p95_ms"] > baseline * args.knee_factor:
+                knee = level
+    finally:
+        if router:
+            router.stop()
+    
+    if knee is None:
+        print(f"p95 stayed within {args.knee_factor}x of {levels[0]} session(s) up to {levels[-1]} sessions")
+    else:
+        print(f"Latency breaks down at {knee} sessions (p95 over {args.knee_factor}x the {levels[0]}-session level)")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
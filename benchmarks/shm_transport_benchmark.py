@@ -0,0 +1,110 @@
+"""
+Shared-memory transport benchmark
+Compares SharedFrameRing with a pickling multiprocessing.Queue between two processes
+
+Usage:
+    python -m benchmarks.shm_transport_benchmark --frames 20000 --sizes 16,2048,8192
+"""
+
+import argparse
+import multiprocessing
+import time
+from typing import Dict, List
+from utils.shm_ring import SharedFrameRing
+import config
+
+def queue_consumer(frames: int, transport, done) -> None:
+    """
+    Receive frames from a multiprocessing.Queue
+    
+    Args:
+        frames: Number of frames to receive
+        transport: multiprocessing.Queue
+        done: Queue receiving the time the last frame arrived
+    """
+    for _ in range(frames):
+        transport.get()
+    done.put(time.perf_counter())
+
+def ring_consumer(frames: int, transport: SharedFrameRing, done) -> None:
+    """
+    Receive frames from a SharedFrameRing
+    
+    Args:
+        frames: Number of frames to receive
+        transport: Ring attached in this process
+        done: Queue receiving the time the last frame arrived
+    """
+    for _ in range(frames):
+        transport.get_frame(timeout=None)
+    done.put(time.perf_counter())
+    transport.close()
+
+def run(kind: str, frames: int, size: int, slots: int) -> Dict[str, float]:
+    """
+    Send frames to a consumer process and time the transfer
+    
+    Args:
+        kind: "queue" or "ring"
+        frames: Number of frames
+        size: Frame size in bytes
+        slots: Ring slots (and queue capacity, for equal buffering)
+    
+    Returns:
+        Dict[str, float]: Frames per second, MB per second and producer CPU time per frame
+    """
+    context = multiprocessing.get_context(config.WORKER_START_METHOD)
+    done = context.Queue()
+    if kind == "ring":
+        transport = SharedFrameRing(slots, size)
+        consumer = context.Process(target=ring_consumer, args=(frames, transport, done))
+    else:
+        transport = context.Queue(maxsize=slots)
+        consumer = context.Process(target=queue_consumer, args=(frames, transport, done))
+    consumer.start()
+    
+    frame = bytes(range(256)) * (size // 256) + bytes(size % 256)
+    # Let the consumer attach before the clock starts
+    time.sleep(0.5)
+    
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    for _ in range(frames):
+        if kind == "ring":
+            transport.put_frame(frame, timeout=None)
+        else:
+            transport.put(frame)
+    cpu = time.process_time() - cpu_start
+    end = done.get()
+    consumer.join()
+    
+    if kind == "ring":
+        transport.close()
+    
+    seconds = end - start
+    return {
+        "frames_per_s": frames / seconds,
+        "mb_per_s": frames * size / seconds / 1e6,
+        "producer_us": cpu / frames * 1e6
+    }
+
+def main() -> None:
+    """Run the benchmark and print results"""
+    parser = argparse.ArgumentParser(description="Benchmark frame transport between processes")
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--sizes", default="16,2048,8192",
+                        help="Comma-separated frame sizes in bytes (16 is a lip-sync point)")
+    parser.add_argument("--slots", type=int, default=config.SHM_RING_SLOTS)
+    args = parser.parse_args()
+    
+    sizes: List[int] = [int(size) for size in args.sizes.split(",")]
+    print(f"{args.frames} frames per run, {args.slots} slots")
+    print(f"{'transport':<10} {'frame (B)':>10} {'frames/s':>12} {'MB/s':>9} {'producer (us)':>14}")
+    for size in sizes:
+        for kind in ("queue", "ring"):
+            result = run(kind, args.frames, size, args.slots)
+            print(f"{kind:<10} {size:>10} {result['frames_per_s']:>12.0f} {result['mb_per_s']:>9.1f} "
+                  f"{result['producer_us']:>14.1f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
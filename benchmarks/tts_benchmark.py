@@ -0,0 +1,90 @@
+"""
+TTS backend benchmark
+Compares time-to-first-chunk and real-time factor of the configured TTS backends
+
+Usage:
+    python -m benchmarks.tts_benchmark --backends kokoro piper --runs 5 --chunk-sizes 512 1024 4096
+"""
+
+import argparse
+import statistics
+import time
+from typing import Dict, List
+from modules.tts_backend import create_tts_backend, TTS_BACKENDS
+import config
+
+SENTENCES = [
+    "Hello!",
+    "I am Lilith, future ruler of this world!",
+    config.DEFAULT_RESPONSES["evil"],
+    "One day, every cookie in this kingdom will belong to me, and you will all bow before my mighty tiny throne."
+]
+
+def run_backend(name: str, chunk_size: int, runs: int) -> Dict[str, float]:
+    """
+    Benchmark one backend
+    
+    Args:
+        name: Backend name
+        chunk_size: Bytes per chunk
+        runs: Repetitions per sentence
+    
+    Returns:
+        Dict[str, float]: Median first-chunk latency, median total time and real-time factor
+    """
+    backend = create_tts_backend(name, chunk_size=chunk_size)
+    first_chunk_times: List[float] = []
+    total_times: List[float] = []
+    audio_seconds = 0.0
+    synth_seconds = 0.0
+    
+    try:
+        # Warm-up run so connection setup / model load isn't measured
+        for _ in backend.stream(SENTENCES[0]):
+            pass
+        
+        for _ in range(runs):
+            for sentence in SENTENCES:
+                start = time.perf_counter()
+                first_chunk = None
+                audio_bytes = 0
+                for chunk in backend.stream(sentence):
+                    if first_chunk is None:
+                        first_chunk = time.perf_counter() - start
+                    audio_bytes += len(chunk)
+                elapsed = time.perf_counter() - start
+                
+                first_chunk_times.append(first_chunk or elapsed)
+                total_times.append(elapsed)
+                synth_seconds += elapsed
+                audio_seconds += audio_bytes / 2 / backend.sample_rate
+    finally:
+        backend.close()
+    
+    return {
+        "first_chunk_ms": statistics.median(first_chunk_times) * 1000,
+        "total_ms": statistics.median(total_times) * 1000,
+        "rtf": synth_seconds / audio_seconds if audio_seconds else float("inf")
+    }
+
+def main() -> None:
+    """Run the benchmark and print a result table"""
+    parser = argparse.ArgumentParser(description="Benchmark TTS backends")
+    parser.add_argument("--backends", nargs="+", default=[config.TTS_BACKEND], choices=list(TTS_BACKENDS))
+    parser.add_argument("--chunk-sizes", nargs="+", type=int, default=[config.TTS_CHUNK_SIZE])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    
+    print(f"{'backend':<10} {'chunk':>6} {'first chunk (ms)':>17} {'total (ms)':>11} {'RTF':>6}")
+    for name in args.backends:
+        for chunk_size in args.chunk_sizes:
+            try:
+                result = run_backend(name, chunk_size, args.runs)
+            except Exception as e:
+                print(f"{name:<10} {chunk_size:>6} failed: {e}")
+                continue
+            print(f"{name:<10} {chunk_size:>6} {result['first_chunk_ms']:>17.1f} "
+                  f"{result['total_ms']:>11.1f} {result['rtf']:>6.3f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -3,16 +3,77 @@ Global configuration for all application modules
 """
 
 # LLM Configuration
+LLM_BACKEND = "ollama"  # "ollama" (HTTP server) or "llama_cpp" (in-process)
 LLM_MODEL = "gemma3:27b-it-q8_0"
 MAX_CONTEXT_TOKENS = 10000
 SUMMARY_THRESHOLD = 0.7  # Summarize at 70% of max context
 DEFAULT_TEMPERATURE = 0.7
 SUMMARY_TEMPERATURE = 0.3
 
+# Model Residency Configuration (Ollama)
+RESIDENCY_ENABLED = True  # Preload models and keep them loaded while the session is active
+RESIDENCY_MODELS = [LLM_MODEL]  # Models kept loaded
+OLLAMA_KEEP_ALIVE = "10m"  # Keep-alive sent with every chat request
+RESIDENCY_KEEP_ALIVE = "10m"  # Keep-alive set by preload and keep-alive requests
+RESIDENCY_KEEPALIVE_INTERVAL = 120.0  # Seconds between keep-alive requests (well under the keep-alive)
+RESIDENCY_RELEASE_AFTER = 1800.0  # Seconds without chat requests before models are unloaded
+RESIDENCY_LOAD_THRESHOLD = 0.5  # Reported load_duration (seconds) counted as a real load
+RESIDENCY_EVENT_HISTORY = 100  # Load events kept for metrics
+
+# Model Routing Configuration
+# Auxiliary tasks run on their own model only if it is loaded or fits next to the chat model
+LLM_TASKS = {
+    "chat": {"model": LLM_MODEL, "num_ctx": MAX_CONTEXT_TOKENS, "temperature": DEFAULT_TEMPERATURE},
+    "summary": {"model": "gemma3:4b-it-q8_0", "num_ctx": MAX_CONTEXT_TOKENS, "temperature": SUMMARY_TEMPERATURE},
+    "classify": {"model": "gemma3:1b-it-q8_0", "num_ctx": 2048, "temperature": 0.0}
+}
+LLM_VRAM_BUDGET = 48 * 1024 ** 3  # Bytes of GPU memory Ollama may fill with models
+LLM_MODEL_MEMORY_OVERHEAD = 1.2  # Loaded size over weights size (KV cache, buffers)
+LLM_MAX_LOADED_MODELS = 3  # Keep in line with OLLAMA_MAX_LOADED_MODELS
+LLM_RESIDENCY_REFRESH = 5.0  # Seconds between checks of the loaded models
+
+# llama.cpp Backend Configuration
+LLAMA_CPP_MODEL_PATH = "models/gemma-3-27b-it-q8_0.gguf"
+LLAMA_CPP_N_GPU_LAYERS = -1  # -1 offloads all layers
+LLAMA_CPP_N_BATCH = 512
+LLAMA_CPP_STATE_DIR = "cache/llama_state"  # Saved system-prompt state, reused across restarts
+
 # Response Configuration
 MAX_RESPONSE_LENGTH = 250
 DEFAULT_EMOTION = "neutral"
 
+# Generation Budget Configuration
+GENERATION_BUDGET_ENABLED = True  # Bound chat replies with num_predict, stop sequences and tag cut-off
+GENERATION_CHARS_PER_TOKEN = 4  # Same estimate as utils.token_counter
+GENERATION_BUDGET_SLACK = 1.2  # Extra room over MAX_RESPONSE_LENGTH before the hard cap
+GENERATION_TAG_TOKENS = 8  # Room for the closing emotion tag
+GENERATION_STOP_SEQUENCES = ["User:", "\nYou:"]  # The model starting to write the user's turn
+
+# Hedged Generation Configuration
+HEDGE_ENABLED = True  # Race a smaller model when the chat model is slow to answer
+HEDGE_FALLBACK_MODEL = "gemma3:4b-it-q8_0"  # Must fit in memory next to LLM_MODEL (OLLAMA_MAX_LOADED_MODELS >= 2)
+HEDGE_FIRST_TOKEN_DEADLINE_MS = 2000  # Hedge if the chat model hasn't produced a token by then
+HEDGE_GIVE_UP_MS = 20000  # Answer with LLM_ERROR_RESPONSE if no model produced a token by then
+HEDGE_HISTORY = 500  # Turn outcomes kept in memory
+HEDGE_LOG_PATH = "cache/hedge_outcomes.jsonl"  # Turn outcomes for deadline tuning (None disables)
+HEDGE_TARGET_RATE = 0.1  # Share of turns the suggested deadline would hedge
+LLM_ERROR_RESPONSE = "I'm having trouble thinking right now. [embarrassed]"
+
+# History Compaction Configuration (prompt only, the stored history stays verbatim)
+HISTORY_COMPACTION_ENABLED = True
+HISTORY_VERBATIM_MESSAGES = 4  # Latest messages sent unchanged
+HISTORY_STAGE_DIRECTION_WORDS = 1  # Words kept of an older *stage direction* (0 removes them)
+HISTORY_DEDUPE_MIN_CHARS = 12  # Older sentences this long that repeat an earlier one are dropped
+HISTORY_SUMMARY_PREFIX = "Summary of our previous conversation:"  # Summary goes in the system message
+
+# Response Cache Configuration (opt-in, for crowd-style traffic)
+RESPONSE_CACHE_ENABLED = False
+RESPONSE_CACHE_MAX_ENTRIES = 256
+RESPONSE_CACHE_TTL = 600  # Seconds before a cached response is regenerated
+RESPONSE_CACHE_MAX_REUSE = 20  # Times an entry is served before it is regenerated
+RESPONSE_CACHE_MAX_INPUT_CHARS = 40  # Only short utterances are cached
+RESPONSE_CACHE_CONTEXT_MESSAGES = 2  # Latest messages before the input that must match too ("why?" depends on them)
+
 # Prompts
 SYSTEM_PROMPT = f"""You are a demon girl who dreams of conquering the world, but deep down you're just a cute child.
 
@@ -50,6 +111,154 @@ DEFAULT_RESPONSES = {
     "neutral": "I see. Interesting."
 }
 
+# Agent Execution Configuration
+WORKER_START_METHOD = "spawn"  # Start method for agents running in worker processes
+SESSION_WORKERS = 4  # Worker processes hosting sessions behind a SessionRouter
+SESSION_WORKER_THREADS = 8  # Turns run concurrently in each session worker
+SESSION_HEARTBEAT_INTERVAL = 1.0  # Seconds between worker load reports
+SESSION_HEARTBEAT_TIMEOUT = 5.0  # A worker silent for this long gets no new sessions
+
+# Filler Configuration (masks slow replies, fillers play only once pre-rendered while idle)
+FILLER_ENABLED = True
+FILLER_DELAY_MS = 1200  # Silence after the user's input before a filler is played
+FILLER_ANIMATION = "thinking"  # Animation state shown while the reply is pending (key of ANIMATIONS)
+FILLER_UTTERANCES = {
+    "excited": ["Ooh!", "Ooh, wait..."],
+    "evil": ["Heh heh...", "Hmm, let me see..."],
+    "embarrassed": ["Um...", "Uh, well..."],
+    "annoyed": ["Hmph.", "Ugh, fine..."],
+    "curious": ["Hmm...", "Oh?"],
+    "triumphant": ["Heh!", "Ha..."],
+    "sad": ["Hmm...", "Well..."],
+    "neutral": ["Hmm...", "Let's see..."]
+}
+
+# Input Coalescing Configuration (inputs arriving through the conversation agent's queue)
+COALESCE_ENABLED = True
+COALESCE_INITIAL_WINDOW = 0.8  # Seconds to wait for a follow-up message before the user's pace is known
+COALESCE_MIN_WINDOW = 0.3
+COALESCE_MAX_WINDOW = 2.0
+COALESCE_GAP_FACTOR = 1.5  # Window = average gap between a user's burst messages x factor
+COALESCE_MAX_WAIT = 4.0  # A burst is answered after this long even if messages keep coming
+COALESCE_CANCEL_SUPERSEDED = True  # New input abandons the reply being generated
+
+# Queue Capacity Configuration (0 = unbounded)
+# Overflow policies: "block", "drop_oldest", "drop_newest", "reject", "merge" (user input only)
+INPUT_QUEUE_CAPACITY = 2  # Pending user inputs
+INPUT_QUEUE_OVERFLOW = "merge"  # Extra inputs are appended to the newest pending one
+SPEECH_QUEUE_CAPACITY = 4  # Pending replies to speak (interrupts are always accepted)
+SPEECH_QUEUE_OVERFLOW = "drop_oldest"  # Stale replies are skipped
+LIP_SYNC_QUEUE_CAPACITY = 512  # Pending mouth-open points (queue transport)
+
+# Logging Configuration
+LOG_LEVEL = "INFO"  # Level written to LOG_FILE ("DEBUG" for timings and transcripts)
+LOG_CONSOLE_LEVEL = "WARNING"  # Level written to the console, kept above INFO to spare the prompt
+LOG_FILE = "logs/companion.log"  # None logs to the console only
+
+# Profiler Configuration (sampling only runs between two toggles)
+PROFILER_ENABLED = True  # Allow toggling the sampling profiler at runtime
+PROFILER_INTERVAL = 0.01  # Seconds between stack samples
+PROFILER_MAX_DEPTH = 64  # Innermost frames kept per sampled stack
+PROFILER_OUTPUT_DIR = "profiles"  # Collapsed-stack files, one per profiling run
+PROFILER_SIGNAL = "SIGUSR2"  # kill -USR2 <pid> toggles sampling (POSIX only)
+PROFILER_COMMAND = "/profile"  # Console command toggling sampling
+
+# Memory Monitor Configuration (instrumentation mode for long uptimes)
+MEMORY_MONITOR_ENABLED = False
+MEMORY_MONITOR_INTERVAL = 60.0  # Seconds between session sizings and snapshots
+MEMORY_SESSION_WARN_BYTES = 50 * 1024 * 1024  # Warn when a session's approximate size crosses this
+MEMORY_TRACEMALLOC = True  # Snapshot allocations and log the top growth between checks (slows allocations)
+MEMORY_TRACEMALLOC_FRAMES = 1  # Frames kept per allocation (more frames, more overhead)
+MEMORY_TOP_GROWTH = 5  # Source lines listed per growth report
+
+# Session Recording Configuration (opt-in, logs what users type)
+SESSION_RECORDING_ENABLED = False
+SESSION_RECORD_PATH = "logs/sessions.jsonl"  # Replayed by benchmarks/session_replay.py
+
+# Idle Scheduler Configuration
+IDLE_SCHEDULER_ENABLED = True  # Run housekeeping while nobody is talking
+IDLE_GRACE_SECONDS = 2.0  # Quiet time before idle jobs start
+IDLE_POLL_INTERVAL = 0.1  # Seconds between idleness checks
+IDLE_SUMMARY_THRESHOLD = 0.5  # Summarize while idle above this share of MAX_CONTEXT_TOKENS
+IDLE_SUMMARY_INTERVAL = 30.0  # Seconds between idle summary checks
+IDLE_TTS_WARMUP_ENABLED = True  # Pre-render DEFAULT_RESPONSES audio
+IDLE_TTS_WARMUP_BUDGET_MS = 500  # Rendering time per idle window before other jobs get a turn
+
+# Speech Input Configuration
+ASR_ENABLED = False  # Listen to the microphone in addition to typed input
+ASR_INPUT_WAV = None  # Path to a WAV file to use instead of the microphone
+ASR_MODEL = "small.en"  # faster-whisper model size or path
+ASR_DEVICE = "cuda"
+ASR_COMPUTE_TYPE = "float16"
+ASR_EXECUTION = "process"  # "process" decodes in a worker process, "thread" in the agent thread
+ASR_LANGUAGE = "en"
+ASR_BEAM_SIZE = 1  # Greedy decoding keeps endpoint latency low
+ASR_SAMPLE_RATE = 16000
+ASR_FRAME_MS = 30
+ASR_RING_SECONDS = 60  # Audio history kept in the ring buffer
+ASR_PREROLL_MS = 200  # Audio kept before the detected speech onset
+ASR_PARTIAL_INTERVAL_MS = 500
+ASR_MAX_UTTERANCE_SECONDS = 20
+VAD_MIN_LEVEL = 0.01  # Minimum RMS considered as speech
+VAD_START_RATIO = 3.0  # Speech must be this many times above the noise floor
+VAD_MIN_SPEECH_MS = 90  # Voiced audio needed to start an utterance
+VAD_END_SILENCE_MS = 300  # Silence that ends an utterance (final decode runs during it)
+
+# TTS Configuration
+TTS_BACKEND = "kokoro"  # "kokoro" (OpenAI-compatible HTTP server) or "piper" (in-process)
+TTS_CHUNK_SIZE = 1024  # Bytes of PCM per playback write
+TTS_BASE_URL = "http://localhost:8880/v1"
+TTS_MODEL = "kokoro"
+TTS_VOICE = "af_bella"
+TTS_SAMPLE_RATE = 24000  # Sample rate of the server's PCM output
+TTS_TIMEOUT = 30.0  # Seconds
+TTS_MAX_CONNECTIONS = 4  # Pooled connections to the TTS server
+TTS_KEEPALIVE_EXPIRY = 120.0  # Seconds an idle pooled connection stays open
+PIPER_MODEL_PATH = "models/piper/en_US-amy-medium.onnx"  # Config read from <model>.json
+PIPER_USE_CUDA = False
+PIPER_LENGTH_SCALE = None  # Speaking rate override (None keeps the voice default)
+
+# Audio Output Configuration
+AUDIO_SINK = "pyaudio"  # "pyaudio" (local sound card), "websocket" (remote listeners) or "wav" (files, for tests)
+AUDIO_SINK_WAV_DIR = "logs/audio"  # One WAV file per utterance
+AUDIO_SINK_HOST = "127.0.0.1"  # Interface the WebSocket sink listens on
+AUDIO_SINK_PORT = 8765
+AUDIO_SINK_CODEC = "opus"  # "opus" (needs opuslib and libopus) or "pcm" (uncompressed, 384 kbit/s at 24 kHz)
+AUDIO_SINK_OPUS_BITRATE = 24000  # Bits per second, plenty for a single voice
+AUDIO_SINK_OPUS_APPLICATION = "voip"  # Opus speech mode ("restricted_lowdelay" trades quality for ~20 ms)
+AUDIO_SINK_FRAME_MS = 20  # Audio per WebSocket message
+AUDIO_SINK_LEAD_MS = 200  # How far ahead of real time audio is sent (bounds the delay of an interruption)
+AUDIO_SINK_CLIENT_QUEUE = 50  # Messages buffered per listener before its oldest frames are dropped
+
+# Animation Configuration
+ANIMATION_DIR = "assets/animations"
+ANIMATION_CACHE_DIR = "assets/animations/.cache"  # Decoded buffers for memory-mapping
+ANIMATION_MMAP_THRESHOLD = 4 * 1024 * 1024  # Decoded clips above this size (bytes) are memory-mapped
+ANIMATION_FPS = 30
+ANIMATION_CROSSFADE = 0.3  # Seconds of blending between emotions
+ANIMATION_CHANNELS = [
+    "head_tilt",
+    "head_nod",
+    "body_bounce",
+    "eye_open",
+    "brow_raise",
+    "blush",
+    "mouth_smile",
+    "mouth_open"
+]
+
+# Lip-sync Configuration
+LIP_SYNC_ENABLED = True
+LIP_SYNC_NOISE_FLOOR = 0.01  # RMS below this keeps the mouth closed
+LIP_SYNC_GAIN = 4.0  # RMS to mouth-open scale
+LIP_SYNC_SMOOTHING = 0.5  # Per-frame smoothing factor (1.0 = no smoothing)
+LIP_SYNC_TRANSPORT = "queue"  # "queue" (same process) or "shm" (shared-memory ring, works across processes)
+
+# Shared-Memory Transport Configuration
+SHM_RING_SLOTS = 1024  # Frames held by a ring
+SHM_RING_FRAME_BYTES = 8192  # Largest frame (4096 16-bit samples)
+SHM_POLL_INTERVAL = 0.0005  # Seconds between polls of a blocking put or get
+
 # Animations
 ANIMATIONS = {
     "excited": "bouncing_excited.anim",
@@ -59,5 +268,6 @@ ANIMATIONS = {
     "curious": "head_tilt.anim",
     "triumphant": "victory_pose.anim",
     "sad": "sad_eyes.anim",
-    "neutral": "idle.anim"
+    "neutral": "idle.anim",
+    "thinking": "thinking.anim"  # FILLER_ANIMATION, not an emotion the model can use
 }
\ No newline at end of file
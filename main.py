@@ -4,8 +4,8 @@ Coordinates all agents and manages the main loop using LangGraph
 """
 
 import asyncio
-from queue import Queue
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, List, Optional
 import config
 
 # LangGraph imports
@@ -16,6 +16,16 @@ from pydantic import BaseModel, Field
 from modules.emotion_manager import EmotionManager
 from modules.llm_interface import LLMInterface
 from modules.context_manager import ContextManager
+from modules.response_cache import ResponseCache
+from modules.llm_backends import get_llm_backend
+from modules.model_residency import ResidencyManager
+from modules.session_recorder import SessionRecorder
+from utils.channels import LatestValueChannel, PriorityChannel, BoundedChannel, OVERFLOW_DROP_OLDEST
+from utils.shm_ring import LipSyncRing
+from utils.idle_scheduler import IdleScheduler, IdleJob
+from utils.log import setup_logging, shutdown_logging, get_logger
+from utils.sampling_profiler import SamplingProfiler
+from utils.memory_monitor import MemoryMonitor
 
 # Import agents
 from agents.animation_agent import AnimationAgent
@@ -56,13 +66,15 @@ def process_user_input(state: AppState) -> AppState:
         quit_requested=False
     )
 
-def handle_conversation(state: AppState, conversation_agent: ConversationAgent) -> AppState:
+def handle_conversation(state: AppState, conversation_agent: ConversationAgent,
+                        recorder: Optional[SessionRecorder] = None) -> AppState:
     """
     Handle conversation with LLM
     
     Args:
         state: Current application state
         conversation_agent: Conversation agent instance
+        recorder: Session recorder logging the turn (optional)
         
     Returns:
         AppState: Updated state with response
@@ -72,7 +84,10 @@ def handle_conversation(state: AppState, conversation_agent: ConversationAgent)
         return state
     
     # Process the input and generate response
+    started_at = time.monotonic()
     response = conversation_agent.process(state.user_input)
+    if recorder:
+        recorder.record_turn(state.user_input, started_at, response)
     
     # Create a new state with the response
     return AppState(
@@ -102,28 +117,113 @@ def display_output(state: AppState) -> AppState:
     
     return state
 
+logger = get_logger("main")
+
 async def main():
     """Main function executed at startup"""
+    setup_logging()
     print("Starting AI Companion...")
     
     # Create queues for inter-agent communication
-    emotion_queue = Queue()
-    speech_queue = Queue()
-    user_input_queue = Queue()
+    emotion_queue = LatestValueChannel()  # Only the newest emotion matters
+    # Interrupts are served ahead of speech
+    speech_queue = PriorityChannel(capacity=config.SPEECH_QUEUE_CAPACITY, overflow=config.SPEECH_QUEUE_OVERFLOW)
+    # Mouth-open track from speech to animation
+    if config.LIP_SYNC_TRANSPORT == "shm":
+        lip_sync_queue = LipSyncRing()
+    else:
+        lip_sync_queue = BoundedChannel(config.LIP_SYNC_QUEUE_CAPACITY, OVERFLOW_DROP_OLDEST)
+    
+    # Load the chat model now rather than on the first turn, and keep it loaded while in use
+    residency_manager = None
+    if config.RESIDENCY_ENABLED and config.LLM_BACKEND == "ollama":
+        residency_manager = ResidencyManager(get_llm_backend())
+        residency_manager.start()
+    
+    # Shared cache so repeated responses also reuse their rendered audio
+    response_cache = ResponseCache() if config.RESPONSE_CACHE_ENABLED else None
     
     # Initialize and start agents
-    animation_agent = AnimationAgent(input_queue=emotion_queue)
+    animation_agent = AnimationAgent(input_queue=emotion_queue, lip_sync_queue=lip_sync_queue)
     animation_agent.start()
     
-    speech_agent = SpeechAgent(input_queue=speech_queue)
+    speech_agent = SpeechAgent(
+        input_queue=speech_queue,
+        response_cache=response_cache,
+        lip_sync_queue=lip_sync_queue
+    )
     speech_agent.start()
     
+    # The conversation agent's bounded input queue merges or rejects inputs once full
     conversation_agent = ConversationAgent(
-        input_queue=user_input_queue,
         emotion_queue=emotion_queue,
-        speech_queue=speech_queue
+        speech_queue=speech_queue,
+        response_cache=response_cache
     )
     conversation_agent.start()
+    user_input_queue = conversation_agent.input_queue
+    
+    # Opt-in traffic log for load replay
+    recorder = None
+    if config.SESSION_RECORDING_ENABLED:
+        recorder = SessionRecorder(model=conversation_agent.llm.model_name)
+        speech_agent.on_timing = recorder.record_tts
+    
+    # Spoken input goes straight to the conversation agent's queue
+    listening_agent = None
+    if config.ASR_ENABLED:
+        from agents.listening_agent import ListeningAgent
+        listening_agent = ListeningAgent(output_queue=user_input_queue)
+        listening_agent.start()
+    
+    # Housekeeping runs only while no input is pending, no turn is running and nothing is being said
+    idle_scheduler = None
+    if config.IDLE_SCHEDULER_ENABLED:
+        idle_scheduler = IdleScheduler(busy_checks=[
+            lambda: not user_input_queue.empty(),
+            conversation_agent.is_busy,
+            speech_agent.is_busy
+        ])
+        idle_scheduler.add_job(IdleJob(
+            "summary",
+            conversation_agent.summarize_when_idle,
+            interval=config.IDLE_SUMMARY_INTERVAL
+        ))
+        if conversation_agent.filler:
+            # Fillers are only played once rendered, so they come first
+            idle_scheduler.add_job(IdleJob(
+                "filler_warmup",
+                lambda: speech_agent.warm_audio(conversation_agent.filler.texts()),
+                budget_ms=config.IDLE_TTS_WARMUP_BUDGET_MS
+            ))
+        if config.IDLE_TTS_WARMUP_ENABLED:
+            idle_scheduler.add_job(IdleJob(
+                "tts_warmup",
+                lambda: speech_agent.warm_audio(config.DEFAULT_RESPONSES.values()),
+                budget_ms=config.IDLE_TTS_WARMUP_BUDGET_MS
+            ))
+        idle_scheduler.start()
+    elif conversation_agent.filler:
+        # Fillers are only played once rendered, and there's no idle time to render them in
+        for _ in speech_agent.warm_audio(conversation_agent.filler.texts()):
+            pass
+        logger.info("Rendered %s filler(s)", len(speech_agent.prerendered))
+    
+    # Memory accounting and growth reports
+    memory_monitor = None
+    if config.MEMORY_MONITOR_ENABLED:
+        memory_monitor = MemoryMonitor()
+        memory_monitor.track("conversation", conversation_agent.memory_usage)
+        memory_monitor.track("speech", speech_agent.memory_usage)
+        if response_cache:
+            memory_monitor.track("response_cache", lambda: {"entries": response_cache.nbytes()})
+        memory_monitor.start()
+
+    # Sampling profiler, off until toggled by signal or console command
+    profiler = None
+    if config.PROFILER_ENABLED:
+        profiler = SamplingProfiler()
+        profiler.install_signal()
     
     # Build LangGraph workflow
     workflow = StateGraph(AppState)
@@ -134,7 +234,7 @@ async def main():
     # For the conversation node, we need to pass the agent
     # Using a closure to pass the agent to the function
     workflow.add_node("conversation", 
-                     lambda state: handle_conversation(state, conversation_agent))
+                     lambda state: handle_conversation(state, conversation_agent, recorder))
     
     workflow.add_node("display_output", display_output)
     
@@ -157,6 +257,10 @@ async def main():
             # Get user input
             user_input = input("You: ")
             
+            if profiler and user_input.strip() == config.PROFILER_COMMAND:
+                print(profiler.toggle(wait=True))
+                continue
+            
             # Initialize state
             state = AppState(user_input=user_input)
             
@@ -183,10 +287,36 @@ async def main():
         print("\nInterrupted by user. Shutting down...")
     finally:
         # Properly stop all agents
+        if profiler and profiler.running:
+            logger.info("Profile written to %s", profiler.stop(wait=True))
+        if memory_monitor:
+            # Traced memory is only reported while tracemalloc runs, so stats come first
+            logger.info("Memory: %s", memory_monitor.get_stats())
+            memory_monitor.stop()
+        if residency_manager:
+            residency_manager.stop()
+            logger.info("Model residency: %s", residency_manager.get_stats())
+        if idle_scheduler:
+            idle_scheduler.stop()
+            logger.info("Idle jobs: %s", idle_scheduler.get_stats())
+        if listening_agent:
+            listening_agent.stop()
+        for agent in (animation_agent, speech_agent, conversation_agent):
+            logger.info("%s queue: %s", agent.name, agent.get_queue_stats())
+        if conversation_agent.filler:
+            logger.info("Fillers: %s", conversation_agent.filler.get_stats())
+        if conversation_agent.context.compactor:
+            logger.info("History compaction: %s", conversation_agent.context.compactor.get_stats())
+        logger.info("Audio sink (%s): %s", speech_agent.sink.name, speech_agent.sink.get_stats())
         animation_agent.stop()
         speech_agent.stop()
         conversation_agent.stop()
+        if isinstance(lip_sync_queue, LipSyncRing):
+            lip_sync_queue.close()
+        if recorder:
+            recorder.close()
         print("All agents stopped. Goodbye!")
+        shutdown_logging()
 
 # Program entry point
 if __name__ == "__main__":
@@ -0,0 +1,197 @@
+"""
+Animation asset library
+Preloads .anim files into compact, array-backed keyframe buffers
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List
+import numpy as np
+import config
+from utils.log import get_logger
+
+logger = get_logger("animation_library")
+
+class AnimationClip:
+    """Decoded animation resampled to the playback frame rate"""
+    
+    __slots__ = ("name", "frames", "loop")
+    
+    def __init__(self, name: str, frames: np.ndarray, loop: bool = True):
+        """
+        Initialize an animation clip
+        
+        Args:
+            name: Clip name (usually the .anim filename)
+            frames: Float32 buffer of shape (frame_count, channel_count)
+            loop: Whether the clip loops when it reaches its end
+        """
+        self.name = name
+        self.frames = frames
+        self.loop = loop
+    
+    @property
+    def frame_count(self) -> int:
+        """Number of frames in the clip"""
+        return self.frames.shape[0]
+    
+    def sample(self, frame_index: int) -> np.ndarray:
+        """
+        Return the pose at a given frame
+        
+        Args:
+            frame_index: Frame index since the clip started
+        
+        Returns:
+            np.ndarray: Channel values for this frame
+        """
+        if self.loop:
+            return self.frames[frame_index % self.frame_count]
+        return self.frames[min(frame_index, self.frame_count - 1)]
+
+class AnimationLibrary:
+    """
+    Library of preloaded animation clips
+    
+    A .anim file is JSON of the form:
+        {"fps": 30, "loop": true, "channels": ["head_tilt", ...],
+         "keyframes": [[time, value, ...], ...]}
+    Keyframes are linearly interpolated and resampled to config.ANIMATION_FPS
+    over config.ANIMATION_CHANNELS, so playback is a plain index lookup.
+    """
+    
+    def __init__(self, animation_dir: str = None, fps: int = None, channels: List[str] = None):
+        """
+        Initialize animation library
+        
+        Args:
+            animation_dir: Folder holding .anim files (default: config.ANIMATION_DIR)
+            fps: Playback frame rate (default: config.ANIMATION_FPS)
+            channels: Animated channels (default: config.ANIMATION_CHANNELS)
+        """
+        self.animation_dir = animation_dir or config.ANIMATION_DIR
+        self.fps = fps or config.ANIMATION_FPS
+        self.channels = channels or config.ANIMATION_CHANNELS
+        self.clips: Dict[str, AnimationClip] = {}
+    
+    def preload(self, filenames: List[str] = None) -> None:
+        """
+        Load and decode all animation files
+        
+        Args:
+            filenames: Files to load (default: every file in config.ANIMATIONS)
+        """
+        if filenames is None:
+            filenames = list(dict.fromkeys(config.ANIMATIONS.values()))
+        
+        for filename in filenames:
+            self.clips[filename] = self.load_clip(filename)
+        
+        total_bytes = sum(clip.frames.nbytes for clip in self.clips.values())
+        logger.debug("Preloaded %s animations (%.1f KB)", len(self.clips), total_bytes / 1024)
+    
+    def get_clip(self, filename: str) -> AnimationClip:
+        """
+        Return a preloaded clip, loading it on demand if needed
+        
+        Args:
+            filename: Animation filename
+        
+        Returns:
+            AnimationClip: Decoded clip
+        """
+        clip = self.clips.get(filename)
+        if clip is None:
+            clip = self.load_clip(filename)
+            self.clips[filename] = clip
+        return clip
+    
+    def load_clip(self, filename: str) -> AnimationClip:
+        """
+        Decode an animation file into a frame buffer
+        
+        Args:
+            filename: Animation filename
+        
+        Returns:
+            AnimationClip: Decoded clip (rest pose if the file is missing or invalid)
+        """
+        path = os.path.join(self.animation_dir, filename)
+        
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            frames = self._resample(data)
+        except FileNotFoundError:
+            logger.warning("Animation file not found: %s, using rest pose", path)
+            return AnimationClip(filename, self._rest_pose())
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("Invalid animation file %s: %s, using rest pose", path, e)
+            return AnimationClip(filename, self._rest_pose())
+        
+        # Large clips are served from a memory-mapped copy of the decoded buffer
+        if frames.nbytes > config.ANIMATION_MMAP_THRESHOLD:
+            frames = self._memory_map(filename, frames)
+        
+        return AnimationClip(filename, frames, loop=bool(data.get("loop", True)))
+    
+    def _resample(self, data: Dict) -> np.ndarray:
+        """
+        Resample keyframes to the playback frame rate
+        
+        Args:
+            data: Parsed .anim content
+        
+        Returns:
+            np.ndarray: Float32 buffer of shape (frame_count, channel_count)
+        """
+        keyframes = np.asarray(data["keyframes"], dtype=np.float32)
+        if keyframes.ndim != 2 or keyframes.shape[0] == 0:
+            raise ValueError("keyframes must be a non-empty list of [time, value, ...] rows")
+        
+        times = keyframes[:, 0]
+        values = keyframes[:, 1:]
+        file_channels = data["channels"]
+        if values.shape[1] != len(file_channels):
+            raise ValueError("keyframe width does not match channel count")
+        
+        duration = float(times[-1])
+        frame_count = max(1, int(round(duration * self.fps)) + 1)
+        frame_times = np.arange(frame_count, dtype=np.float32) / self.fps
+        
+        # Channels absent from the file stay at rest (0.0)
+        frames = np.zeros((frame_count, len(self.channels)), dtype=np.float32)
+        for column, channel in enumerate(file_channels):
+            if channel in self.channels:
+                frames[:, self.channels.index(channel)] = np.interp(frame_times, times, values[:, column])
+        
+        return frames
+    
+    def _rest_pose(self) -> np.ndarray:
+        """
+        Return a single-frame neutral pose
+        
+        Returns:
+            np.ndarray: Float32 buffer of shape (1, channel_count)
+        """
+        return np.zeros((1, len(self.channels)), dtype=np.float32)
+    
+    def _memory_map(self, filename: str, frames: np.ndarray) -> np.ndarray:
+        """
+        Store a decoded buffer on disk and map it back read-only
+        
+        Args:
+            filename: Animation filename
+            frames: Decoded frame buffer
+        
+        Returns:
+            np.ndarray: Memory-mapped frame buffer
+        """
+        os.makedirs(config.ANIMATION_CACHE_DIR, exist_ok=True)
+        key = hashlib.blake2b(f"{filename}:{self.fps}:{','.join(self.channels)}".encode("utf-8"),
+                              digest_size=8).hexdigest()
+        cache_path = os.path.join(config.ANIMATION_CACHE_DIR, f"{key}.npy")
+        
+        np.save(cache_path, frames)
+        return np.load(cache_path, mmap_mode="r")
\ No newline at end of file
@@ -0,0 +1,505 @@
+"""
+Audio sinks
+Destinations for synthesized speech: local sound card, WAV files or remote listeners over WebSocket
+"""
+
+import json
+import os
+import struct
+import threading
+import time
+import wave
+from typing import Any, Dict
+from utils.channels import BoundedChannel, OVERFLOW_DROP_OLDEST
+from utils.log import get_logger
+import config
+
+logger = get_logger("audio_sink")
+
+FRAME_HEADER = struct.Struct("<I")  # Sequence number prefixed to every encoded frame
+
+class AudioSink:
+    """Base class for sinks receiving 16-bit mono PCM, one utterance at a time"""
+    
+    name = "base"
+    
+    def __init__(self, sample_rate: int):
+        """
+        Initialize an audio sink
+        
+        Args:
+            sample_rate: Sample rate of the PCM in Hz
+        """
+        self.sample_rate = sample_rate
+    
+    @property
+    def output_latency(self) -> float:
+        """Seconds between a write and the sound being heard, as far as the sink knows"""
+        return 0.0
+    
+    def begin(self) -> None:
+        """
+        Start an utterance
+        """
+        raise NotImplementedError("The begin method must be implemented in subclasses")
+    
+    def write(self, chunk: bytes) -> None:
+        """
+        Output a PCM chunk, blocking about as long as it takes to play
+        
+        Args:
+            chunk: 16-bit mono PCM
+        """
+        raise NotImplementedError("The write method must be implemented in subclasses")
+    
+    def end(self, interrupted: bool = False) -> None:
+        """
+        Finish the current utterance, safe to call more than once
+        
+        Args:
+            interrupted: True if the utterance was cut short
+        """
+        raise NotImplementedError("The end method must be implemented in subclasses")
+    
+    def close(self) -> None:
+        """
+        Release sink resources
+        """
+        pass
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return sink statistics
+        
+        Returns:
+            Dict[str, Any]: Sink-specific counters
+        """
+        return {}
+
+class PyAudioSink(AudioSink):
+    """Local playback on the default sound card"""
+    
+    name = "pyaudio"
+    
+    def __init__(self, sample_rate: int):
+        """
+        Initialize local playback
+        
+        Args:
+            sample_rate: Sample rate of the PCM in Hz
+        """
+        # Optional dependency, only needed for local playback
+        import pyaudio
+        
+        super().__init__(sample_rate)
+        self.pyaudio = pyaudio
+        self.pyaudio_instance = pyaudio.PyAudio()
+        self.player = None
+        self.lock = threading.Lock()
+    
+    @property
+    def output_latency(self) -> float:
+        """Output latency reported by the open stream"""
+        player = self.player
+        return player.get_output_latency() if player else 0.0
+    
+    def begin(self) -> None:
+        """
+        Open an output stream for the utterance
+        """
+        with self.lock:
+            self.player = self.pyaudio_instance.open(
+                format=self.pyaudio.paInt16,
+                channels=1,
+                rate=self.sample_rate,
+                output=True
+            )
+    
+    def write(self, chunk: bytes) -> None:
+        """
+        Write a PCM chunk to the sound card (blocks while the device buffer is full)
+        
+        Args:
+            chunk: 16-bit mono PCM
+        """
+        player = self.player
+        if player is not None:
+            player.write(chunk)
+    
+    def end(self, interrupted: bool = False) -> None:
+        """
+        Close the utterance's output stream
+        
+        Args:
+            interrupted: True if the utterance was cut short
+        """
+        with self.lock:
+            player, self.player = self.player, None
+        if player is not None:
+            player.stop_stream()
+            player.close()
+    
+    def close(self) -> None:
+        """
+        Release PortAudio
+        """
+        self.end(interrupted=True)
+        self.pyaudio_instance.terminate()
+
+class WavFileSink(AudioSink):
+    """Writes each utterance to its own WAV file, without real-time pacing (for tests)"""
+    
+    name = "wav"
+    
+    def __init__(self, sample_rate: int, output_dir: str = None):
+        """
+        Initialize WAV output
+        
+        Args:
+            sample_rate: Sample rate of the PCM in Hz
+            output_dir: Folder receiving utterance-NNNN.wav files (default: config.AUDIO_SINK_WAV_DIR)
+        """
+        super().__init__(sample_rate)
+        self.output_dir = output_dir or config.AUDIO_SINK_WAV_DIR
+        self.file = None
+        self.count = 0
+        self.paths = []  # Files written, in order
+        self.lock = threading.Lock()
+    
+    def begin(self) -> None:
+        """
+        Open the utterance's WAV file
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        with self.lock:
+            self.count += 1
+            path = os.path.join(self.output_dir, f"utterance-{self.count:04d}.wav")
+            self.file = wave.open(path, "wb")
+            self.file.setnchannels(1)
+            self.file.setsampwidth(2)
+            self.file.setframerate(self.sample_rate)
+            self.paths.append(path)
+    
+    def write(self, chunk: bytes) -> None:
+        """
+        Append a PCM chunk to the file
+        
+        Args:
+            chunk: 16-bit mono PCM
+        """
+        with self.lock:
+            if self.file is not None:
+                self.file.writeframes(chunk)
+    
+    def end(self, interrupted: bool = False) -> None:
+        """
+        Close the utterance's file (an interrupted utterance is kept as far as it was played)
+        
+        Args:
+            interrupted: True if the utterance was cut short
+        """
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+class PCMEncoder:
+    """Passes frames through uncompressed (LAN listeners, debugging)"""
+    
+    codec = "pcm"
+    
+    def __init__(self, sample_rate: int, frame_samples: int, bitrate: int = None):
+        """
+        Initialize pass-through encoder
+        
+        Args:
+            sample_rate: Sample rate in Hz
+            frame_samples: Samples per frame
+            bitrate: Unused
+        """
+        self.frame_samples = frame_samples
+    
+    def encode(self, pcm: bytes) -> bytes:
+        """
+        Encode one frame
+        
+        Args:
+            pcm: frame_samples of 16-bit mono PCM
+        
+        Returns:
+            bytes: The same PCM
+        """
+        return pcm
+
+class OpusEncoder:
+    """Opus encoder for one stream"""
+    
+    codec = "opus"
+    
+    def __init__(self, sample_rate: int, frame_samples: int, bitrate: int = None):
+        """
+        Initialize Opus encoder
+        
+        Args:
+            sample_rate: Sample rate in Hz (8, 12, 16, 24 or 48 kHz)
+            frame_samples: Samples per frame (2.5 to 60 ms)
+            bitrate: Target bits per second (default: config.AUDIO_SINK_OPUS_BITRATE)
+        """
+        # Optional dependency (needs the libopus system library), only needed for compressed streaming
+        import opuslib
+        
+        self.frame_samples = frame_samples
+        self.encoder = opuslib.Encoder(sample_rate, 1, config.AUDIO_SINK_OPUS_APPLICATION)
+        self.encoder.bitrate = bitrate or config.AUDIO_SINK_OPUS_BITRATE
+    
+    def encode(self, pcm: bytes) -> bytes:
+        """
+        Encode one frame
+        
+        Args:
+            pcm: frame_samples of 16-bit mono PCM
+        
+        Returns:
+            bytes: Opus packet
+        """
+        return self.encoder.encode(pcm, self.frame_samples)
+
+ENCODERS = {
+    PCMEncoder.codec: PCMEncoder,
+    OpusEncoder.codec: OpusEncoder
+}
+
+class WebSocketSink(AudioSink):
+    """
+    Streams speech to remote listeners over WebSocket
+    
+    The sink serves ws://<host>:<port>; every connected client receives:
+        text   {"type": "start", "codec", "sample_rate", "frame_ms"} when an utterance begins
+               (also sent on connect if one is playing)
+        binary 4-byte little-endian sequence number + one encoded frame of frame_ms
+        text   {"type": "end", "interrupted"} when it ends; clients drop buffered audio
+               of an interrupted utterance
+    
+    PCM is cut into fixed frames and each frame is encoded once and sent to
+    all clients as soon as it is complete, so latency is one frame plus the
+    network. Writes are paced to real time with config.AUDIO_SINK_LEAD_MS of
+    lead, so an interruption stops the audio within that lead. Each client
+    has its own bounded queue: a slow client loses its oldest frames
+    (concealed by the decoder) instead of holding back speech.
+    """
+    
+    name = "websocket"
+    
+    def __init__(self, sample_rate: int, host: str = None, port: int = None, codec: str = None,
+                 bitrate: int = None, frame_ms: int = None):
+        """
+        Initialize and start the WebSocket server
+        
+        Args:
+            sample_rate: Sample rate of the PCM in Hz
+            host: Interface to listen on (default: config.AUDIO_SINK_HOST)
+            port: Port to listen on, 0 picks a free one (default: config.AUDIO_SINK_PORT)
+            codec: "opus" or "pcm" (default: config.AUDIO_SINK_CODEC)
+            bitrate: Opus bits per second (default: config.AUDIO_SINK_OPUS_BITRATE)
+            frame_ms: Frame duration in ms (default: config.AUDIO_SINK_FRAME_MS)
+        """
+        # Optional dependency, only needed for remote listeners
+        from websockets.sync.server import serve
+        
+        super().__init__(sample_rate)
+        codec = codec or config.AUDIO_SINK_CODEC
+        if codec not in ENCODERS:
+            raise ValueError(f"Unknown codec: {codec} (available: {', '.join(ENCODERS)})")
+        self.frame_ms = frame_ms or config.AUDIO_SINK_FRAME_MS
+        self.frame_samples = sample_rate * self.frame_ms // 1000
+        self.frame_bytes = self.frame_samples * 2
+        self.encoder = ENCODERS[codec](sample_rate, self.frame_samples, bitrate)
+        self.start_message = json.dumps({"type": "start", "codec": codec, "sample_rate": sample_rate,
+                                         "frame_ms": self.frame_ms})
+        
+        self.lock = threading.Lock()
+        self.clients: Dict[Any, BoundedChannel] = {}
+        self.playing = False
+        self.pending = b""
+        self.sequence = 0
+        self.started_at = None
+        self.audio_seconds = 0.0  # Audio sent in the current utterance
+        self.encode_seconds = 0.0  # Encoding time spent on it
+        self.stats = {"utterances": 0, "frames": 0, "encode_ms": 0.0, "audio_s": 0.0,
+                      "bytes_in": 0, "bytes_out": 0, "frames_dropped": 0, "connections": 0}
+        
+        self.server = serve(self._serve_client, host or config.AUDIO_SINK_HOST,
+                            config.AUDIO_SINK_PORT if port is None else port)
+        self.port = self.server.socket.getsockname()[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name="AudioSink/server", daemon=True)
+        self.thread.start()
+        logger.info("Streaming %s audio on port %s", codec, self.port)
+    
+    @property
+    def output_latency(self) -> float:
+        """Frame duration plus the pacing lead; the network adds the rest"""
+        return (self.frame_ms + config.AUDIO_SINK_LEAD_MS) / 1000
+    
+    def _serve_client(self, connection) -> None:
+        """
+        Send queued messages to one client until it disconnects (one thread per client)
+        
+        Args:
+            connection: Client connection
+        """
+        channel = BoundedChannel(config.AUDIO_SINK_CLIENT_QUEUE, OVERFLOW_DROP_OLDEST)
+        with self.lock:
+            self.clients[connection] = channel
+            self.stats["connections"] += 1
+            if self.playing:
+                channel.put(self.start_message)
+        logger.info("Audio listener connected: %s", connection.remote_address)
+        
+        try:
+            while True:
+                message = channel.get()
+                if message is None:
+                    break
+                connection.send(message)
+        except Exception as e:
+            logger.debug("Audio listener %s gone: %s", connection.remote_address, e)
+        finally:
+            with self.lock:
+                self.clients.pop(connection, None)
+                self.stats["frames_dropped"] += channel.stats()["dropped_oldest"]
+    
+    def _broadcast(self, message) -> None:
+        """
+        Queue a message for every client
+        
+        Args:
+            message: Text or binary message
+        """
+        with self.lock:
+            channels = list(self.clients.values())
+        for channel in channels:
+            channel.put(message)
+    
+    def begin(self) -> None:
+        """
+        Announce an utterance to the listeners
+        """
+        with self.lock:
+            self.playing = True
+            self.pending = b""
+            self.started_at = time.perf_counter()
+            self.audio_seconds = 0.0
+            self.encode_seconds = 0.0
+            self.stats["utterances"] += 1
+        self._broadcast(self.start_message)
+    
+    def write(self, chunk: bytes) -> None:
+        """
+        Encode and send every complete frame, then wait while ahead of real time
+        
+        Args:
+            chunk: 16-bit mono PCM
+        """
+        if not self.playing:
+            return
+        
+        self.pending += chunk
+        self.stats["bytes_in"] += len(chunk)
+        while len(self.pending) >= self.frame_bytes:
+            frame, self.pending = self.pending[:self.frame_bytes], self.pending[self.frame_bytes:]
+            self._send_frame(frame)
+        
+        ahead = self.audio_seconds - (time.perf_counter() - self.started_at) - config.AUDIO_SINK_LEAD_MS / 1000
+        if ahead > 0:
+            time.sleep(ahead)
+    
+    def _send_frame(self, frame: bytes) -> None:
+        """
+        Encode one frame and queue it for the listeners
+        
+        Args:
+            frame: frame_bytes of PCM
+        """
+        start = time.perf_counter()
+        packet = self.encoder.encode(frame)
+        encode_seconds = time.perf_counter() - start
+        self.encode_seconds += encode_seconds
+        self.stats["encode_ms"] += encode_seconds * 1000
+        
+        message = FRAME_HEADER.pack(self.sequence & 0xFFFFFFFF) + packet
+        self.sequence += 1
+        self.audio_seconds += self.frame_ms / 1000
+        self.stats["frames"] += 1
+        self.stats["audio_s"] += self.frame_ms / 1000
+        self.stats["bytes_out"] += len(message)
+        self._broadcast(message)
+    
+    def end(self, interrupted: bool = False) -> None:
+        """
+        Flush the last frame (padded with silence) and tell listeners the utterance ended
+        
+        Args:
+            interrupted: True if the utterance was cut short (its last partial frame is dropped)
+        """
+        with self.lock:
+            if not self.playing:
+                return
+            self.playing = False
+        
+        if self.pending and not interrupted:
+            self._send_frame(self.pending + bytes(self.frame_bytes - len(self.pending)))
+        self.pending = b""
+        self._broadcast(json.dumps({"type": "end", "interrupted": interrupted}))
+        
+        if self.audio_seconds:
+            logger.debug("Streamed %.2f s of audio, encoding took %.2f ms (%.2f%% of real time)",
+                         self.audio_seconds, self.encode_seconds * 1000, self.encode_seconds / self.audio_seconds * 100)
+    
+    def close(self) -> None:
+        """
+        Disconnect listeners and stop the server
+        """
+        self.end(interrupted=True)
+        self._broadcast(None)
+        self.server.shutdown()
+        self.thread.join(timeout=2.0)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return streaming and encoding statistics
+        
+        Returns:
+            Dict[str, Any]: Frames, encode time per frame and as a share of real time, output
+                bitrate, listeners and frames dropped for slow listeners
+        """
+        with self.lock:
+            stats = dict(self.stats)
+            stats["listeners"] = len(self.clients)
+            stats["frames_dropped"] += sum(channel.stats()["dropped_oldest"] for channel in self.clients.values())
+        stats["encode_us_per_frame"] = stats["encode_ms"] * 1000 / stats["frames"] if stats["frames"] else 0.0
+        stats["encode_share"] = stats["encode_ms"] / 1000 / stats["audio_s"] if stats["audio_s"] else 0.0
+        stats["kbit_per_s"] = stats["bytes_out"] * 8 / 1000 / stats["audio_s"] if stats["audio_s"] else 0.0
+        return stats
+
+AUDIO_SINKS = {
+    PyAudioSink.name: PyAudioSink,
+    WavFileSink.name: WavFileSink,
+    WebSocketSink.name: WebSocketSink
+}
+
+def create_audio_sink(sample_rate: int, name: str = None, **kwargs) -> AudioSink:
+    """
+    Create an audio sink by name
+    
+    Args:
+        sample_rate: Sample rate of the PCM in Hz
+        name: Sink name (default: config.AUDIO_SINK)
+        **kwargs: Sink-specific options
+    
+    Returns:
+        AudioSink: Sink instance
+    """
+    name = name or config.AUDIO_SINK
+    if name not in AUDIO_SINKS:
+        raise ValueError(f"Unknown audio sink: {name} (available: {', '.join(AUDIO_SINKS)})")
+    return AUDIO_SINKS[name](sample_rate, **kwargs)
\ No newline at end of file
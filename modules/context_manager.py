@@ -3,23 +3,39 @@ Context manager for conversations
 Handles history, summaries, and context optimization
 """
 
-from typing import List, Dict, Any, Tuple
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+import sys
+import threading
+from typing import List, Dict, Any, Tuple, Optional
 import config
 from utils.token_counter import count_tokens
 from modules.llm_interface import LLMInterface
 from modules.emotion_manager import EmotionManager
+from modules.message_store import MessageStore, ROLE_SYSTEM, ROLE_USER, ROLE_ASSISTANT
+from modules.history_compactor import HistoryCompactor, summary_exchange
+from utils.log import get_logger
+
+logger = get_logger("context_manager")
 
 class ContextManager:
     """Context manager for conversations"""
     
-    def __init__(self):
-        """Initialize context manager"""
-        self.messages = []  # LangChain messages
+    def __init__(self, llm: Optional[LLMInterface] = None):
+        """
+        Initialize context manager
+        
+        Args:
+            llm: LLM interface used for summaries (default: own instance)
+        """
+        self.messages = MessageStore()
         self.token_count = 0
         self.summary = ""
-        self.llm = LLMInterface()
+        self.revision = 0  # Incremented on every change to messages or summary
+        self.llm = llm or LLMInterface()
         self.emotion_manager = EmotionManager()
+        
+        # Older turns are shortened before they're sent; the stored history stays verbatim
+        self.compactor = HistoryCompactor() if config.HISTORY_COMPACTION_ENABLED else None
+        self.last_tokens_saved = 0  # Prompt tokens saved by compaction in the latest get_ollama_messages
     
     def add_system_message(self, content: str) -> None:
         """
@@ -28,8 +44,10 @@ class ContextManager:
         Args:
             content: System message content
         """
-        self.messages.append(SystemMessage(content=content))
-        self.token_count += count_tokens(content)
+        tokens = count_tokens(content)
+        self.messages.append(ROLE_SYSTEM, content, tokens)
+        self.token_count += tokens
+        self.revision += 1
     
     def add_user_message(self, content: str) -> None:
         """
@@ -38,8 +56,10 @@ class ContextManager:
         Args:
             content: User message content
         """
-        self.messages.append(HumanMessage(content=content))
-        self.token_count += count_tokens(content)
+        tokens = count_tokens(content)
+        self.messages.append(ROLE_USER, content, tokens)
+        self.token_count += tokens
+        self.revision += 1
     
     def add_ai_message(self, content: str, metadata: Dict[str, Any] = None) -> None:
         """
@@ -47,29 +67,40 @@ class ContextManager:
         
         Args:
             content: AI message content
-            metadata: Message metadata (emotion, etc.)
+            metadata: Message metadata (only the emotion is kept)
         """
-        if metadata is None:
-            metadata = {}
-        
         # If content contains an emotion, extract it
-        clean_content, emotion = self.emotion_manager.extract_emotion(content)
+        _, emotion = self.emotion_manager.extract_emotion(content)
         
-        # Add emotion to metadata
-        metadata["emotion"] = emotion
+        # Tags are stored once in the emotion column instead of stripped every turn
+        tokens = count_tokens(content)
+        self.messages.append(ROLE_ASSISTANT, self.emotion_manager.strip_emotions(content), tokens, emotion)
+        self.token_count += tokens
+        self.revision += 1
+    
+    def remove_last_message(self) -> None:
+        """
+        Withdraw the latest message (e.g. an input whose reply was abandoned)
+        """
+        if not self.messages:
+            return
         
-        # Add message to history
-        self.messages.append(AIMessage(content=content, metadata=metadata))
-        self.token_count += count_tokens(content)
+        self.token_count -= self.messages.tokens[-1]
+        self.messages.pop()
+        self.revision += 1
     
-    def should_summarize(self) -> bool:
+    def should_summarize(self, threshold: float = None) -> bool:
         """
         Determine if context should be summarized
         
+        Args:
+            threshold: Share of max context above which to summarize (default: config.SUMMARY_THRESHOLD)
+        
         Returns:
             bool: True if context should be summarized
         """
-        return self.token_count > config.MAX_CONTEXT_TOKENS * config.SUMMARY_THRESHOLD
+        threshold = threshold or config.SUMMARY_THRESHOLD
+        return self.token_count > config.MAX_CONTEXT_TOKENS * threshold
     
     def create_summary(self) -> None:
         """
@@ -78,6 +109,22 @@ class ContextManager:
         if not self.messages:
             return
             
+        summary = self.build_summary()
+        if summary is None:
+            logger.warning("Summary failed, history kept as is")
+            return
+        self.apply_summary(summary)
+    
+    def build_summary(self, cancel: Optional[threading.Event] = None) -> Optional[str]:
+        """
+        Summarize the current conversation without changing the context
+        
+        Args:
+            cancel: Event that abandons the summary when set
+        
+        Returns:
+            Optional[str]: Summary, None if cancelled or failed
+        """
         # Convert LangChain messages to Ollama format
         ollama_messages = []
         
@@ -88,17 +135,21 @@ class ContextManager:
         })
         
         # Add all messages
-        for msg in self.messages:
-            if isinstance(msg, HumanMessage):
-                ollama_messages.append({"role": "user", "content": msg.content})
-            elif isinstance(msg, AIMessage):
-                # Clean emotions
-                clean_content = self.emotion_manager.strip_emotions(msg.content)
-                ollama_messages.append({"role": "assistant", "content": clean_content})
+        ollama_messages.extend(self.messages.to_dicts())
         
         # Generate summary
-        self.summary = self.llm.generate_summary(ollama_messages)
-        print(f"DEBUG - New summary created: {self.summary[:50]}...")
+        return self.llm.generate_summary(ollama_messages, cancel)
+    
+    def apply_summary(self, summary: str) -> None:
+        """
+        Replace older history with a summary
+        
+        Args:
+            summary: Summary from build_summary
+        """
+        self.summary = summary
+        self.revision += 1
+        logger.debug("New summary created: %s...", self.summary[:50])
         
         # Keep only the last 3 exchanges
         self.prune_conversation(3)
@@ -116,9 +167,7 @@ class ContextManager:
         if len(self.messages) <= keep_exchanges * 2:
             return
             
-        # Calculate index from which to keep messages
-        start_idx = max(0, len(self.messages) - (keep_exchanges * 2))
-        self.messages = self.messages[start_idx:]
+        self.messages.keep_last(keep_exchanges * 2)
     
     def recalculate_tokens(self) -> None:
         """
@@ -131,8 +180,44 @@ class ContextManager:
             self.token_count += count_tokens(self.summary)
         
         # Count tokens for all messages
-        for msg in self.messages:
-            self.token_count += count_tokens(msg.content)
+        self.token_count += self.messages.total_tokens()
+    
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        Return the approximate memory held by the conversation
+        
+        Returns:
+            Dict[str, int]: Bytes of messages and summary
+        """
+        return {
+            "messages": self.messages.nbytes(),
+            "summary": sys.getsizeof(self.summary)
+        }
+    
+    def export_state(self) -> Dict[str, Any]:
+        """
+        Return the conversation state for moving it to another process
+        
+        Returns:
+            Dict[str, Any]: Picklable messages, summary and token count
+        """
+        return {
+            "messages": self.messages.to_state(),
+            "summary": self.summary,
+            "token_count": self.token_count
+        }
+    
+    def import_state(self, state: Dict[str, Any]) -> None:
+        """
+        Replace the conversation with an exported state
+        
+        Args:
+            state: Output of export_state
+        """
+        self.messages = MessageStore.from_state(state["messages"])
+        self.summary = state["summary"]
+        self.token_count = state["token_count"]
+        self.revision += 1
     
     def get_ollama_messages(self) -> List[Dict[str, str]]:
         """
@@ -141,6 +226,11 @@ class ContextManager:
         Returns:
             List[Dict[str, str]]: Messages in Ollama format
         """
+        if self.compactor:
+            ollama_messages, self.last_tokens_saved = self.compactor.compact(
+                config.SYSTEM_PROMPT, self.summary, self.messages.to_dicts())
+            return ollama_messages
+        
         ollama_messages = []
         
         # Add system message to define personality
@@ -151,26 +241,37 @@ class ContextManager:
         
         # If we have a summary, add it at the beginning of the context
         if self.summary:
-            ollama_messages.append({
-                "role": "user",
-                "content": f"Here's a summary of our previous conversation: {self.summary}"
-            })
-            ollama_messages.append({
-                "role": "assistant",
-                "content": "I remember our conversation. Let's continue."
-            })
+            ollama_messages.extend(summary_exchange(self.summary))
         
         # Add all messages
-        for msg in self.messages:
-            if isinstance(msg, HumanMessage):
-                ollama_messages.append({"role": "user", "content": msg.content})
-            elif isinstance(msg, AIMessage):
-                # Clean emotions
-                clean_content = self.emotion_manager.strip_emotions(msg.content)
-                ollama_messages.append({"role": "assistant", "content": clean_content})
+        ollama_messages.extend(self.messages.to_dicts())
         
         return ollama_messages
     
+    def get_langchain_messages(self) -> List[Any]:
+        """
+        Build LangChain messages for the conversation, on demand
+        
+        Returns:
+            List[Any]: SystemMessage, HumanMessage and AIMessage objects
+        """
+        return self.messages.to_langchain()
+    
+    def get_recent_messages(self, count: int, skip: int = 0) -> List[Tuple[str, str]]:
+        """
+        Return the latest messages, oldest first
+        
+        Args:
+            count: Number of messages
+            skip: Newest messages to leave out
+        
+        Returns:
+            List[Tuple[str, str]]: (role name, content) pairs
+        """
+        end = len(self.messages) - skip
+        start = max(0, end - count)
+        return [self.messages.get(index)[:2] for index in range(start, end)]
+    
     def get_latest_ai_message(self) -> Tuple[str, str]:
         """
         Return the latest AI message and its emotion
@@ -178,12 +279,9 @@ class ContextManager:
         Returns:
             Tuple[str, str]: (content, emotion)
         """
-        for msg in reversed(self.messages):
-            if isinstance(msg, AIMessage):
-                content = msg.content
-                emotion = msg.metadata.get("emotion", config.DEFAULT_EMOTION)
-                # Clean emotions from content
-                clean_content = self.emotion_manager.strip_emotions(content)
-                return clean_content, emotion
+        index = self.messages.last_index(ROLE_ASSISTANT)
+        if index is not None:
+            _, content, emotion = self.messages.get(index)
+            return content, emotion or config.DEFAULT_EMOTION
         
         return "", config.DEFAULT_EMOTION
\ No newline at end of file
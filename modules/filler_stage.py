@@ -0,0 +1,134 @@
+"""
+Filler stage
+Masks a slow reply with a short filler utterance and a thinking animation
+"""
+
+import random
+import threading
+from typing import Any, Dict, List, Optional
+from utils.channels import FILLER_COMMAND
+from utils.log import get_logger
+import config
+
+logger = get_logger("filler_stage")
+
+class FillerStage:
+    """
+    Plays a filler when a reply is late
+    
+    Armed when a turn starts and disarmed when its reply is handed to the
+    speech agent. If config.FILLER_DELAY_MS passes in between, the thinking
+    animation is sent to the emotion queue and a filler matching the
+    character's current emotion to the speech queue. The speech agent only
+    plays fillers it has pre-rendered, and cuts them off as soon as the
+    reply's first audio is ready.
+    """
+    
+    def __init__(self, speech_queue, emotion_queue=None, delay_ms: float = None,
+                 utterances: Dict[str, List[str]] = None):
+        """
+        Initialize filler stage
+        
+        Args:
+            speech_queue: Queue receiving (FILLER_COMMAND, filler text)
+            emotion_queue: Queue receiving the thinking animation (optional)
+            delay_ms: Silence before a filler is played (default: config.FILLER_DELAY_MS)
+            utterances: Fillers by emotion (default: config.FILLER_UTTERANCES)
+        """
+        self.speech_queue = speech_queue
+        self.emotion_queue = emotion_queue
+        self.delay = (delay_ms if delay_ms is not None else config.FILLER_DELAY_MS) / 1000
+        self.utterances = utterances or config.FILLER_UTTERANCES
+        
+        self.lock = threading.Lock()
+        self.timer = None
+        self.fired = False
+        self.last_filler = None
+        self.stats = {"turns": 0, "fillers": 0}
+    
+    def texts(self) -> List[str]:
+        """
+        Return every filler, for pre-rendering
+        
+        Returns:
+            List[str]: Filler texts without duplicates
+        """
+        return list(dict.fromkeys(text for texts in self.utterances.values() for text in texts))
+    
+    def pick(self, emotion: str) -> Optional[str]:
+        """
+        Choose a filler for an emotion, avoiding the one played last
+        
+        Args:
+            emotion: Character's current emotion
+        
+        Returns:
+            Optional[str]: Filler text, None if there is none to play
+        """
+        texts = self.utterances.get(emotion) or self.utterances.get(config.DEFAULT_EMOTION) or []
+        choices = [text for text in texts if text != self.last_filler] or texts
+        return random.choice(choices) if choices else None
+    
+    def arm(self, emotion: str) -> None:
+        """
+        Start waiting for the reply of a new turn
+        
+        Args:
+            emotion: Character's current emotion, picks the filler
+        """
+        timer = threading.Timer(self.delay, self._fire, args=(emotion,))
+        timer.daemon = True
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+            self.timer = timer
+            self.fired = False
+            self.stats["turns"] += 1
+        timer.start()
+    
+    def disarm(self) -> bool:
+        """
+        Stop waiting, called once the reply is ready or the turn is abandoned
+        
+        Returns:
+            bool: True if a filler was played for this turn
+        """
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            return self.fired
+    
+    def _fire(self, emotion: str) -> None:
+        """
+        Send the thinking animation and a filler, unless the turn has ended
+        
+        Args:
+            emotion: Character's current emotion
+        """
+        with self.lock:
+            # A timer that was cancelled or replaced while starting belongs to an ended turn
+            if self.timer is not threading.current_thread() or self.fired:
+                return
+            self.fired = True
+            filler = self.pick(emotion)
+            self.last_filler = filler
+            self.stats["fillers"] += 1
+        
+        logger.debug("No reply after %.0f ms, playing filler '%s'", self.delay * 1000, filler)
+        if self.emotion_queue is not None:
+            self.emotion_queue.put(config.FILLER_ANIMATION)
+        if filler is not None:
+            self.speech_queue.put((FILLER_COMMAND, filler))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return filler statistics
+        
+        Returns:
+            Dict[str, Any]: Turns armed, fillers played and their share of turns
+        """
+        with self.lock:
+            stats = dict(self.stats)
+        stats["filler_rate"] = stats["fillers"] / stats["turns"] if stats["turns"] else 0.0
+        return stats
\ No newline at end of file
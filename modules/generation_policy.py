@@ -0,0 +1,143 @@
+"""
+Generation budget policy
+Bounds response length with num_predict, stop sequences and early tag cut-off
+"""
+
+import math
+import re
+import threading
+from typing import Dict, Any, List, Optional
+import config
+
+class GenerationPolicy:
+    """
+    Guards applied to chat generation, with per-guard savings
+    
+    Three guards bound a reply:
+    - num_predict: hard token cap derived from config.MAX_RESPONSE_LENGTH
+    - stop_sequence: the stream is closed on a stop string (e.g. the model starting a "User:" turn)
+    - tag_cutoff: the stream is closed as soon as a final emotion tag follows some text
+    
+    Stop strings are matched in the stream rather than by the server, which
+    reports a natural end and a stop string alike as "stop"; a reply ending
+    on its own is counted as unguarded.
+    
+    Savings are measured against the num_predict budget, so they are an
+    upper bound on the tokens the model would otherwise have generated.
+    """
+    
+    GUARDS = ("num_predict", "stop_sequence", "tag_cutoff")
+    
+    def __init__(self, max_chars: int = None, stop_sequences: List[str] = None):
+        """
+        Initialize generation policy
+        
+        Args:
+            max_chars: Character budget of a reply (default: config.MAX_RESPONSE_LENGTH)
+            stop_sequences: Stop strings (default: config.GENERATION_STOP_SEQUENCES)
+        """
+        self.max_chars = max_chars or config.MAX_RESPONSE_LENGTH
+        self.stop_sequences = stop_sequences or config.GENERATION_STOP_SEQUENCES
+        
+        # Budget for the text plus the closing emotion tag, with some slack
+        text_tokens = self.max_chars / config.GENERATION_CHARS_PER_TOKEN
+        self.num_predict = math.ceil(text_tokens * config.GENERATION_BUDGET_SLACK) + config.GENERATION_TAG_TOKENS
+        
+        emotions = "|".join(config.VALID_EMOTIONS)
+        self.tag_pattern = re.compile(rf"\[({emotions})\]", re.IGNORECASE)
+        self.final_tag_pattern = re.compile(rf"\[({emotions})\]\s*$", re.IGNORECASE)
+        
+        self.lock = threading.Lock()
+        self.stats = {guard: {"hits": 0, "tokens_saved": 0} for guard in self.GUARDS}
+        self.stats["unguarded"] = {"hits": 0, "tokens_saved": 0}
+    
+    def apply(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Add budget options to model options
+        
+        Args:
+            options: Model options (temperature, num_ctx, ...)
+        
+        Returns:
+            Dict[str, Any]: Options including num_predict
+        """
+        return dict(options, num_predict=self.num_predict)
+    
+    def is_complete(self, text: str) -> bool:
+        """
+        Check if a partial reply already ends with a valid emotion tag following some text
+        
+        Args:
+            text: Text streamed so far
+        
+        Returns:
+            bool: True if streaming can stop
+        """
+        # A reply may open with its tag ("[happy] Hello..."), which doesn't end it
+        return self.final_tag_pattern.search(text) is not None and bool(self.tag_pattern.sub("", text).strip())
+    
+    def stop_index(self, text: str) -> Optional[int]:
+        """
+        Find the earliest stop string in a partial reply
+        
+        Args:
+            text: Text streamed so far
+        
+        Returns:
+            Optional[int]: Position where the reply ends, None if no stop string was emitted
+        """
+        positions = [position for position in (text.find(stop) for stop in self.stop_sequences) if position >= 0]
+        return min(positions) if positions else None
+    
+    def check(self, text: str) -> Optional[str]:
+        """
+        Return the guard that ends a partial reply now, if any
+        
+        Args:
+            text: Text streamed so far
+        
+        Returns:
+            Optional[str]: "stop_sequence", "tag_cutoff" or None to keep streaming
+        """
+        if self.stop_index(text) is not None:
+            return "stop_sequence"
+        if self.is_complete(text):
+            return "tag_cutoff"
+        return None
+    
+    def record(self, tokens_generated: int, done_reason: str, cut_by: Optional[str]) -> str:
+        """
+        Attribute the end of a generation to a guard and record its savings
+        
+        Args:
+            tokens_generated: Tokens generated (eval_count, or streamed chunks when cut off)
+            done_reason: Server-reported reason ("stop", "length", ...) or "" when cut off
+            cut_by: Guard from check() that closed the stream, None if the server ended it
+        
+        Returns:
+            str: Guard that ended the generation ("unguarded" for a natural end)
+        """
+        remaining = max(0, self.num_predict - tokens_generated)
+        
+        if cut_by:
+            guard = cut_by
+        elif done_reason == "length":
+            # The remainder of an over-long reply can't be measured
+            guard, remaining = "num_predict", 0
+        else:
+            guard, remaining = "unguarded", 0
+        
+        with self.lock:
+            self.stats[guard]["hits"] += 1
+            self.stats[guard]["tokens_saved"] += remaining
+        return guard
+    
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Return per-guard statistics
+        
+        Returns:
+            Dict[str, Dict[str, int]]: Hits and tokens saved per guard
+        """
+        with self.lock:
+            return {guard: dict(values) for guard, values in self.stats.items()}
\ No newline at end of file
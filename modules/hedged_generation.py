@@ -0,0 +1,211 @@
+"""
+Hedged generation
+Races a fallback model against a slow primary and records the outcome of each turn
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from queue import Queue
+from typing import Dict, Any, Iterator, List, Optional
+import numpy as np
+import config
+from modules.llm_backends import LLMBackend
+from utils.log import get_logger
+
+logger = get_logger("hedged_generation")
+
+_END = object()  # Marks the end of a pumped stream
+
+class StreamPump:
+    """
+    Reads a backend stream in a background thread
+    
+    The pump records when the first chunk arrives and signals a shared
+    event, so a caller can wait on several pumps at once. Cancelling a pump
+    closes its stream at the next chunk, which makes the backend stop
+    generating; a request still waiting for its first token is closed as
+    soon as that token arrives.
+    """
+    
+    def __init__(self, backend: LLMBackend, model: str, messages: List[Dict[str, str]],
+                 options: Dict[str, Any], first_chunk_event: threading.Event):
+        """
+        Start reading a stream
+        
+        Args:
+            backend: Inference backend
+            model: Model name
+            messages: List of messages in format [{role, content}, ...]
+            options: Model options
+            first_chunk_event: Set when this pump gets its first chunk or fails
+        """
+        self.model = model
+        self.started_at = time.perf_counter()
+        self.first_chunk_at = None
+        self.error = None
+        self.chunks = Queue()
+        self.cancelled = threading.Event()
+        self.first_chunk_event = first_chunk_event
+        self.thread = threading.Thread(
+            target=self._pump,
+            args=(backend, model, messages, options),
+            name=f"StreamPump-{model}",
+            daemon=True
+        )
+        self.thread.start()
+    
+    @property
+    def ready(self) -> bool:
+        """True once the first chunk arrived or the request failed"""
+        return self.first_chunk_at is not None or self.error is not None
+    
+    @property
+    def first_token_ms(self) -> Optional[float]:
+        """Time to first chunk in milliseconds, None if it hasn't arrived"""
+        if self.first_chunk_at is None:
+            return None
+        return (self.first_chunk_at - self.started_at) * 1000
+    
+    def _pump(self, backend: LLMBackend, model: str, messages: List[Dict[str, str]], options: Dict[str, Any]) -> None:
+        """
+        Thread body: move chunks from the backend stream to the queue
+        """
+        stream = None
+        try:
+            stream = backend.stream_chat(model, messages, options)
+            for chunk in stream:
+                if self.first_chunk_at is None:
+                    self.first_chunk_at = time.perf_counter()
+                    self.first_chunk_event.set()
+                if self.cancelled.is_set():
+                    break
+                self.chunks.put(chunk)
+        except Exception as e:
+            self.error = e
+            self.first_chunk_event.set()
+        finally:
+            if stream is not None:
+                stream.close()
+            self.chunks.put(_END)
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield chunks as they arrive, re-raising a backend error
+        """
+        while True:
+            chunk = self.chunks.get()
+            if chunk is _END:
+                if self.error is not None:
+                    raise self.error
+                return
+            yield chunk
+    
+    def close(self) -> None:
+        """
+        Cancel the stream
+        """
+        self.cancelled.set()
+
+class HedgeRecorder:
+    """
+    Keeps the outcome of recent turns to tune the hedging deadline
+    
+    Outcomes are kept in memory and, if config.HEDGE_LOG_PATH is set,
+    appended to a JSON lines file for offline analysis.
+    """
+    
+    def __init__(self, history: int = None, log_path: str = None):
+        """
+        Initialize recorder
+        
+        Args:
+            history: Number of outcomes kept in memory (default: config.HEDGE_HISTORY)
+            log_path: JSON lines file for outcomes (default: config.HEDGE_LOG_PATH)
+        """
+        self.outcomes = deque(maxlen=history or config.HEDGE_HISTORY)
+        self.log_path = log_path or config.HEDGE_LOG_PATH
+        self.lock = threading.Lock()
+    
+    def record(self, primary: StreamPump, fallback: Optional[StreamPump], winner: Optional[StreamPump],
+               deadline_ms: float, total_ms: float) -> Dict[str, Any]:
+        """
+        Record the outcome of a turn
+        
+        Args:
+            primary: Pump of the primary model
+            fallback: Pump of the fallback model (None if no hedge was issued)
+            winner: Pump whose reply was used (None if both failed or timed out)
+            deadline_ms: First-token deadline in effect
+            total_ms: Time until the reply was complete
+        
+        Returns:
+            Dict[str, Any]: Recorded outcome
+        """
+        if winner is None:
+            result = "none"
+        else:
+            result = "primary" if winner is primary else "fallback"
+        
+        outcome = {
+            "time": time.time(),
+            "primary_model": primary.model,
+            "fallback_model": fallback.model if fallback else None,
+            "deadline_ms": deadline_ms,
+            # None when the primary hadn't answered by the end of the turn
+            "primary_first_token_ms": primary.first_token_ms,
+            "fallback_first_token_ms": fallback.first_token_ms if fallback else None,
+            "primary_failed": primary.error is not None,
+            "hedged": fallback is not None,
+            "winner": result,
+            "total_ms": total_ms
+        }
+        
+        with self.lock:
+            self.outcomes.append(outcome)
+            if self.log_path:
+                try:
+                    os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+                    with open(self.log_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(outcome) + "\n")
+                except OSError as e:
+                    logger.warning("Could not write hedge outcome: %s", e)
+        
+        return outcome
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Summarize recent outcomes
+        
+        Returns:
+            Dict[str, Any]: Hedge and fallback win rates, primary first-token percentiles
+                and the deadline that would have hedged config.HEDGE_TARGET_RATE of turns
+        """
+        with self.lock:
+            outcomes = list(self.outcomes)
+        
+        turns = len(outcomes)
+        hedged = sum(1 for o in outcomes if o["hedged"])
+        stats = {
+            "turns": turns,
+            "hedge_rate": hedged / turns if turns else 0.0,
+            "fallback_wins": sum(1 for o in outcomes if o["winner"] == "fallback"),
+            "failures": sum(1 for o in outcomes if o["winner"] == "none")
+        }
+        
+        # A primary still silent when the turn ended took at least the deadline,
+        # count it there rather than dropping the slowest turns
+        first_tokens = []
+        for o in outcomes:
+            if o["primary_first_token_ms"] is not None:
+                first_tokens.append(o["primary_first_token_ms"])
+            elif o["hedged"] and not o["primary_failed"]:
+                first_tokens.append(o["deadline_ms"])
+        if first_tokens:
+            p50, p90, p99 = np.percentile(first_tokens, [50, 90, 99])
+            stats["primary_first_token_ms"] = {"p50": float(p50), "p90": float(p90), "p99": float(p99)}
+            stats["suggested_deadline_ms"] = float(np.percentile(first_tokens, 100 * (1 - config.HEDGE_TARGET_RATE)))
+        
+        return stats
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""
+History compactor
+Shortens older turns of the prompt to cut prompt evaluation time
+"""
+
+import re
+import threading
+from typing import Any, Dict, List, Set, Tuple
+from utils.token_counter import count_tokens, estimate_message_tokens
+import config
+
+STAGE_DIRECTION_PATTERN = re.compile(r"\*([^*\n]+)\*")
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+REPEATED_MARKER = "(repeated)"
+
+def summary_exchange(summary: str) -> List[Dict[str, str]]:
+    """
+    Return the synthetic exchange carrying a summary in an uncompacted prompt
+    
+    Args:
+        summary: Conversation summary
+    
+    Returns:
+        List[Dict[str, str]]: User and assistant messages
+    """
+    return [
+        {"role": "user", "content": f"Here's a summary of our previous conversation: {summary}"},
+        {"role": "assistant", "content": "I remember our conversation. Let's continue."}
+    ]
+
+class HistoryCompactor:
+    """
+    Rewrites the history part of a prompt into fewer tokens
+    
+    The latest config.HISTORY_VERBATIM_MESSAGES messages are sent as they
+    are. In older ones, stage directions such as "*fidgets nervously*" are
+    cut to their first config.HISTORY_STAGE_DIRECTION_WORDS words (removed
+    at 0), and sentences already said earlier by the same role are dropped.
+    A message that was entirely a repeat becomes REPEATED_MARKER, so turns
+    keep alternating. The summary of earlier conversation is appended to
+    the system message rather than sent as a synthetic exchange.
+    
+    Each message is rewritten from itself and the messages before it only,
+    so the rewritten prefix stays identical from one turn to the next and
+    the backend's prompt cache keeps matching it.
+    """
+    
+    def __init__(self, verbatim_messages: int = None, stage_direction_words: int = None):
+        """
+        Initialize history compactor
+        
+        Args:
+            verbatim_messages: Latest messages left untouched (default: config.HISTORY_VERBATIM_MESSAGES)
+            stage_direction_words: Words kept of an older stage direction (default: config.HISTORY_STAGE_DIRECTION_WORDS)
+        """
+        self.verbatim_messages = (verbatim_messages if verbatim_messages is not None
+                                  else config.HISTORY_VERBATIM_MESSAGES)
+        self.stage_direction_words = (stage_direction_words if stage_direction_words is not None
+                                      else config.HISTORY_STAGE_DIRECTION_WORDS)
+        self.lock = threading.Lock()
+        self.stats = {
+            "prompts": 0,
+            "tokens_before": 0,
+            "tokens_after": 0
+        }
+    
+    def compact(self, system_prompt: str, summary: str,
+                history: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], int]:
+        """
+        Build a compacted prompt
+        
+        Args:
+            system_prompt: Personality prompt
+            summary: Summary of earlier conversation (empty if none)
+            history: User and assistant messages in Ollama format, oldest first
+        
+        Returns:
+            Tuple[List[Dict[str, str]], int]: (messages in Ollama format, estimated tokens saved)
+        """
+        tokens_before = estimate_message_tokens(history) + count_tokens(system_prompt) + 4
+        if summary:
+            # What the summary cost as a synthetic user/assistant exchange
+            tokens_before += estimate_message_tokens(summary_exchange(summary))
+            system_prompt = f"{system_prompt}\n\n{config.HISTORY_SUMMARY_PREFIX} {summary}"
+        messages = [{"role": "system", "content": system_prompt}]
+        
+        older = max(0, len(history) - self.verbatim_messages)
+        seen: Dict[str, Set[str]] = {}
+        for index, message in enumerate(history):
+            said = seen.setdefault(message["role"], set())
+            
+            if index < older:
+                messages.append({"role": message["role"], "content": self._compact_content(message["content"], said)})
+            else:
+                messages.append(message)
+            
+            said.update(self._keys(message["content"]))
+        
+        tokens_after = estimate_message_tokens(messages)
+        with self.lock:
+            self.stats["prompts"] += 1
+            self.stats["tokens_before"] += tokens_before
+            self.stats["tokens_after"] += tokens_after
+        return messages, tokens_before - tokens_after
+    
+    def _compact_content(self, content: str, said: Set[str]) -> str:
+        """
+        Rewrite one older message
+        
+        Args:
+            content: Message content
+            said: Sentence keys of what the same role said before
+        
+        Returns:
+            str: Compacted content
+        """
+        content = STAGE_DIRECTION_PATTERN.sub(self._shorten_direction, content)
+        kept = []
+        for sentence in SENTENCE_PATTERN.split(content.strip()):
+            sentence = " ".join(sentence.split())
+            key = self._key(sentence)
+            if len(key) >= config.HISTORY_DEDUPE_MIN_CHARS and key in said:
+                continue
+            if sentence:
+                kept.append(sentence)
+        
+        return " ".join(kept) or REPEATED_MARKER
+    
+    def _shorten_direction(self, match: re.Match) -> str:
+        """
+        Replacement for one stage direction
+        
+        Args:
+            match: STAGE_DIRECTION_PATTERN match
+        
+        Returns:
+            str: Shortened direction, empty if directions are dropped
+        """
+        words = match.group(1).split()[:self.stage_direction_words]
+        return f"*{' '.join(words)}*" if words else ""
+    
+    def _keys(self, content: str) -> Set[str]:
+        """
+        Return the keys of a message's sentences long enough to count as repeats
+        
+        Args:
+            content: Message content
+        
+        Returns:
+            Set[str]: Sentence keys
+        """
+        keys = (self._key(sentence) for sentence in SENTENCE_PATTERN.split(content.strip()))
+        return {key for key in keys if len(key) >= config.HISTORY_DEDUPE_MIN_CHARS}
+    
+    @staticmethod
+    def _key(sentence: str) -> str:
+        """
+        Normalize a sentence for duplicate detection
+        
+        Args:
+            sentence: Sentence
+        
+        Returns:
+            str: Lowercased words without stage directions or punctuation
+        """
+        words = re.sub(r"[^\w\s]", "", STAGE_DIRECTION_PATTERN.sub("", sentence).lower())
+        return " ".join(words.split())
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return compaction statistics
+        
+        Returns:
+            Dict[str, Any]: Prompts compacted, prompt tokens before and after, and mean saving per prompt
+        """
+        with self.lock:
+            stats = dict(self.stats)
+        saved = stats["tokens_before"] - stats["tokens_after"]
+        stats["mean_saved"] = saved / stats["prompts"] if stats["prompts"] else 0.0
+        stats["saved_ratio"] = saved / stats["tokens_before"] if stats["tokens_before"] else 0.0
+        return stats
\ No newline at end of file
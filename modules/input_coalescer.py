@@ -0,0 +1,132 @@
+"""
+Input coalescer
+Merges rapid-fire user messages into a single turn
+"""
+
+import threading
+import time
+from queue import Empty
+from typing import Any, Callable, Dict
+import config
+
+GAP_SMOOTHING = 0.3  # Weight of a new gap in the moving average
+IDLE_DECAY = 0.9  # Window shrink factor after a message without follow-up
+
+class PendingInput:
+    """
+    Event-like flag that is set while newer input waits in a queue
+    
+    Passed as the cancel event of a generation, so a reply is abandoned
+    as soon as the user adds to what they said.
+    """
+    
+    def __init__(self, channel):
+        """
+        Initialize flag
+        
+        Args:
+            channel: Input queue to watch
+        """
+        self.channel = channel
+    
+    def is_set(self) -> bool:
+        """True if input is waiting"""
+        return not self.channel.empty()
+
+class InputCoalescer:
+    """
+    Collects messages that arrive in a burst
+    
+    After a message, the coalescer waits for a follow-up for a window
+    derived from the gaps seen between this user's burst messages
+    (config.COALESCE_GAP_FACTOR times their moving average, within the
+    configured bounds). Each follow-up restarts the window, up to
+    config.COALESCE_MAX_WAIT in total. A message without follow-up shrinks
+    the window, so users who send one line at a time aren't kept waiting.
+    """
+    
+    def __init__(self, channel, merge: Callable[[Any, Any], Any]):
+        """
+        Initialize input coalescer
+        
+        Args:
+            channel: Input queue to read follow-ups from
+            merge: Function combining (collected, new) messages
+        """
+        self.channel = channel
+        self.merge = merge
+        self.pending = PendingInput(channel)
+        self.gap_estimate = config.COALESCE_INITIAL_WINDOW / config.COALESCE_GAP_FACTOR
+        self.lock = threading.Lock()
+        self.stats = {
+            "messages": 0,
+            "turns": 0,
+            "merged": 0,
+            "superseded": 0,
+            "wait_ms": 0.0
+        }
+    
+    @property
+    def window(self) -> float:
+        """Seconds to wait for a follow-up message"""
+        return min(config.COALESCE_MAX_WINDOW,
+                   max(config.COALESCE_MIN_WINDOW, self.gap_estimate * config.COALESCE_GAP_FACTOR))
+    
+    def collect(self, first: Any) -> Any:
+        """
+        Wait for follow-ups to a message and merge them
+        
+        Args:
+            first: Message that opened the burst
+        
+        Returns:
+            Any: Merged message
+        """
+        message = first
+        count = 1
+        start = time.monotonic()
+        last = start
+        
+        while True:
+            wait = min(self.window, start + config.COALESCE_MAX_WAIT - time.monotonic())
+            if wait <= 0:
+                break
+            try:
+                follow_up = self.channel.get(timeout=wait)
+            except Empty:
+                if count == 1:
+                    self.gap_estimate *= IDLE_DECAY
+                break
+            
+            now = time.monotonic()
+            self.gap_estimate += (now - last - self.gap_estimate) * GAP_SMOOTHING
+            last = now
+            message = self.merge(message, follow_up)
+            count += 1
+        
+        with self.lock:
+            self.stats["messages"] += count
+            self.stats["turns"] += 1
+            self.stats["merged"] += count - 1
+            self.stats["wait_ms"] += (time.monotonic() - start) * 1000
+        return message
+    
+    def record_superseded(self) -> None:
+        """
+        Count a generation abandoned for newer input
+        """
+        with self.lock:
+            self.stats["superseded"] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return coalescing statistics
+        
+        Returns:
+            Dict[str, Any]: Messages, turns, merges, superseded generations, mean wait and current window
+        """
+        with self.lock:
+            stats = dict(self.stats)
+        stats["mean_wait_ms"] = stats["wait_ms"] / stats["turns"] if stats["turns"] else 0.0
+        stats["window_ms"] = self.window * 1000
+        return stats
\ No newline at end of file
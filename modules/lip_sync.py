@@ -0,0 +1,145 @@
+"""
+Lip-sync analysis
+Derives a mouth-open track from the PCM stream as it is played
+"""
+
+import time
+from queue import Queue
+import numpy as np
+import config
+
+class LipSyncAnalyzer:
+    """
+    Streaming RMS analyzer publishing (presentation_time, mouth_open) points
+    
+    Points are timestamped on the perf_counter clock at the moment the
+    analyzed audio reaches the speakers, so the animation agent can align
+    them with its own frame clock.
+    """
+    
+    def __init__(self, output_queue: Queue, sample_rate: int, frame_rate: int = None):
+        """
+        Initialize lip-sync analyzer
+        
+        Args:
+            output_queue: Queue receiving (presentation_time, mouth_open) tuples
+            sample_rate: PCM sample rate in Hz (16-bit mono)
+            frame_rate: Analysis frames per second (default: config.ANIMATION_FPS)
+        """
+        self.output_queue = output_queue
+        self.sample_rate = sample_rate
+        self.frame_rate = frame_rate or config.ANIMATION_FPS
+        self.frame_samples = max(1, sample_rate // self.frame_rate)
+        self.playback_start = 0.0
+        self.output_latency = 0.0
+        self.samples_analyzed = 0
+        self.pending = np.zeros(0, dtype=np.int16)  # Samples not yet forming a full frame
+        self.level = 0.0  # Smoothed mouth opening
+    
+    def begin(self, output_latency: float = 0.0) -> None:
+        """
+        Start a new utterance, called right before the first write
+        
+        Args:
+            output_latency: Delay between a write and the sound being heard, in seconds
+        """
+        self.playback_start = time.perf_counter()
+        self.output_latency = output_latency
+        self.samples_analyzed = 0
+        self.pending = np.zeros(0, dtype=np.int16)
+        self.level = 0.0
+    
+    def feed(self, chunk: bytes) -> None:
+        """
+        Analyze a PCM chunk that has just been written to the output
+        
+        Args:
+            chunk: 16-bit little-endian mono PCM
+        """
+        # Ignore a trailing odd byte rather than failing on it
+        usable = len(chunk) - (len(chunk) % 2)
+        samples = np.frombuffer(chunk[:usable], dtype="<i2")
+        if self.pending.size:
+            samples = np.concatenate((self.pending, samples))
+        
+        frame_count = samples.size // self.frame_samples
+        used = frame_count * self.frame_samples
+        self.pending = samples[used:].copy()
+        if frame_count == 0:
+            return
+        
+        # Vectorized RMS over every complete frame of the chunk
+        frames = samples[:used].reshape(frame_count, self.frame_samples).astype(np.float32) / 32768.0
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        targets = np.clip((rms - config.LIP_SYNC_NOISE_FLOOR) * config.LIP_SYNC_GAIN, 0.0, 1.0)
+        
+        frame_duration = self.frame_samples / self.sample_rate
+        first_time = (self.playback_start + self.output_latency
+                      + self.samples_analyzed / self.sample_rate)
+        
+        for i, target in enumerate(targets):
+            self.level += (float(target) - self.level) * config.LIP_SYNC_SMOOTHING
+            self.output_queue.put((first_time + i * frame_duration, self.level))
+        
+        self.samples_analyzed += used
+    
+    def end(self, interrupted: bool = False) -> None:
+        """
+        Close the mouth at the end of an utterance
+        
+        Args:
+            interrupted: True if playback was cut, which also discards points not yet due
+        """
+        self.level = 0.0
+        if interrupted:
+            self.output_queue.put((time.perf_counter(), None))
+            return
+        
+        end_time = (self.playback_start + self.output_latency
+                    + self.samples_analyzed / self.sample_rate)
+        self.output_queue.put((end_time, 0.0))
+
+class MouthTrack:
+    """Consumer side of the lip-sync track, sampled on the animation clock"""
+    
+    def __init__(self, input_queue: Queue):
+        """
+        Initialize mouth track
+        
+        Args:
+            input_queue: Queue of (presentation_time, mouth_open) tuples, None cuts the track
+        """
+        self.input_queue = input_queue
+        self.pending = []  # Points not yet due, in time order
+        self.value = 0.0
+    
+    def sample(self, now: float) -> float:
+        """
+        Return the mouth opening due at a given time
+        
+        Args:
+            now: perf_counter time of the frame
+        
+        Returns:
+            float: Mouth opening between 0 and 1
+        """
+        while not self.input_queue.empty():
+            point_time, value = self.input_queue.get_nowait()
+            if value is None:
+                # Playback was interrupted, drop what will never be heard
+                self.pending.clear()
+                self.value = 0.0
+            else:
+                self.pending.append((point_time, value))
+        
+        # Apply every point whose presentation time has passed
+        due = 0
+        for point_time, value in self.pending:
+            if point_time > now:
+                break
+            self.value = value
+            due += 1
+        if due:
+            del self.pending[:due]
+        
+        return self.value
\ No newline at end of file
@@ -0,0 +1,312 @@
+"""
+LLM backends
+Ollama over HTTP, or llama.cpp in-process with a persisted prompt prefix
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+from typing import Dict, Any, Iterator, List, Optional
+import ollama
+import config
+from utils.log import get_logger
+
+logger = get_logger("llm_backends")
+
+class LLMBackend:
+    """Base class for chat backends streaming Ollama-style chunks"""
+    
+    name = "base"
+    concurrent = False  # Can stream from two models at once (needed for hedged generation)
+    
+    def stream_chat(self, model: str, messages: List[Dict[str, str]], options: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a chat completion
+        
+        Args:
+            model: Model name
+            messages: List of messages in format [{role, content}, ...]
+            options: Ollama-style options (temperature, num_ctx, num_predict, stop)
+        
+        Returns:
+            Iterator[Dict[str, Any]]: Generator of {"message": {"content"}, "done", ...} chunks;
+                closing it stops generation
+        """
+        raise NotImplementedError("The stream_chat method must be implemented in subclasses")
+    
+    def normalize_model_name(self, model: str) -> str:
+        """
+        Return a model name as the backend reports it
+        
+        Args:
+            model: Model name
+        
+        Returns:
+            str: Normalized model name
+        """
+        return model
+    
+    def resident_models(self) -> Optional[Dict[str, int]]:
+        """
+        Return the models currently loaded by the backend
+        
+        Returns:
+            Optional[Dict[str, int]]: Model name -> VRAM bytes, None if unknown
+        """
+        return None
+    
+    def model_size(self, model: str) -> Optional[int]:
+        """
+        Return the size of a model's weights
+        
+        Args:
+            model: Model name
+        
+        Returns:
+            Optional[int]: Size in bytes, None if unknown or not available locally
+        """
+        return None
+
+class OllamaBackend(LLMBackend):
+    """Ollama server over HTTP"""
+    
+    name = "ollama"
+    concurrent = True
+    
+    def __init__(self):
+        """Initialize Ollama backend"""
+        self.last_request_time = None  # time.monotonic() of the last chat request
+        self.on_load = None  # Callback (model, load_seconds) called when a request reports a load
+    
+    def stream_chat(self, model: str, messages: List[Dict[str, str]], options: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a chat completion from Ollama
+        
+        Args:
+            model: Model name
+            messages: List of messages in format [{role, content}, ...]
+            options: Ollama options
+        
+        Returns:
+            Iterator[Dict[str, Any]]: Ollama chat chunks
+        """
+        started = self.last_request_time = time.monotonic()
+        # The final chunk reports the load time, but a reply cut off at its tag never reads it:
+        # a model missing from ollama ps is timed to the first chunk instead
+        resident = self.resident_models() if self.on_load else None
+        cold = resident is not None and self.normalize_model_name(model) not in resident
+        load_reported = False
+        
+        stream = ollama.chat(model=model, messages=messages, options=options, stream=True,
+                             keep_alive=config.OLLAMA_KEEP_ALIVE)
+        try:
+            for chunk in stream:
+                if self.on_load and not load_reported:
+                    if chunk.get("done") and chunk.get("load_duration"):
+                        load_reported = True
+                        self.on_load(model, chunk["load_duration"] / 1e9)
+                    elif cold:
+                        load_reported = True
+                        self.on_load(model, time.monotonic() - started)
+                yield chunk
+        finally:
+            stream.close()
+    
+    def normalize_model_name(self, model: str) -> str:
+        """
+        Add the implicit ":latest" tag Ollama reports for untagged names
+        
+        Args:
+            model: Model name
+        
+        Returns:
+            str: Tagged model name
+        """
+        return model if ":" in model else f"{model}:latest"
+    
+    def resident_models(self) -> Optional[Dict[str, int]]:
+        """
+        Return the models Ollama has loaded (ollama ps)
+        
+        Returns:
+            Optional[Dict[str, int]]: Model name -> VRAM bytes, None if Ollama can't be reached
+        """
+        try:
+            return {model.model: model.size_vram or 0 for model in ollama.ps().models}
+        except Exception as e:
+            logger.warning("Could not list loaded models: %s", e)
+            return None
+    
+    def model_size(self, model: str) -> Optional[int]:
+        """
+        Return the size of a pulled model (ollama list)
+        
+        Args:
+            model: Model name
+        
+        Returns:
+            Optional[int]: Size in bytes, None if the model isn't pulled
+        """
+        model = self.normalize_model_name(model)
+        try:
+            for available in ollama.list().models:
+                if available.model == model:
+                    return available.size
+        except Exception as e:
+            logger.warning("Could not list available models: %s", e)
+        return None
+
+class LlamaCppBackend(LLMBackend):
+    """
+    llama.cpp running in this process
+    
+    Messages are passed as Python objects (no JSON/HTTP per turn), and the
+    KV cache is reused for the longest common token prefix between turns.
+    The evaluated system prompt is saved to disk, so a fresh process
+    restores it instead of evaluating the fixed prefix again.
+    """
+    
+    name = "llama_cpp"
+    
+    def __init__(self, model_path: str = None, system_prompt: str = None):
+        """
+        Initialize llama.cpp backend
+        
+        Args:
+            model_path: Path to the GGUF model (default: config.LLAMA_CPP_MODEL_PATH)
+            system_prompt: Fixed prefix to persist (default: config.SYSTEM_PROMPT)
+        """
+        # Optional dependency, only needed for in-process inference
+        from llama_cpp import Llama
+        
+        self.model_path = model_path or config.LLAMA_CPP_MODEL_PATH
+        self.system_prompt = system_prompt or config.SYSTEM_PROMPT
+        self.llm = Llama(
+            model_path=self.model_path,
+            n_ctx=config.MAX_CONTEXT_TOKENS,
+            n_gpu_layers=config.LLAMA_CPP_N_GPU_LAYERS,
+            n_batch=config.LLAMA_CPP_N_BATCH,
+            verbose=False
+        )
+        self.lock = threading.Lock()  # A llama.cpp context serves one generation at a time
+        self.prefix_restored = self._load_or_build_prefix()
+    
+    def _state_path(self) -> str:
+        """
+        Return the state file for this model, context size and system prompt
+        
+        Returns:
+            str: Path of the saved prefix state
+        """
+        stat = os.stat(self.model_path)
+        key = f"{os.path.abspath(self.model_path)}:{stat.st_size}:{stat.st_mtime_ns}:{config.MAX_CONTEXT_TOKENS}:{self.system_prompt}"
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()
+        return os.path.join(config.LLAMA_CPP_STATE_DIR, f"{digest}.state")
+    
+    def _load_or_build_prefix(self) -> bool:
+        """
+        Restore the evaluated system prompt from disk, or evaluate and save it
+        
+        Returns:
+            bool: True if the prefix was restored from disk
+        """
+        path = self._state_path()
+        
+        if os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    self.llm.load_state(pickle.load(f))
+                logger.debug("Restored prompt state (%s tokens) from %s", self.llm.n_tokens, path)
+                return True
+            except Exception as e:
+                logger.warning("Could not restore prompt state: %s", e)
+                self.llm.reset()
+        
+        # Evaluate the system turn once; later prompts share its tokens as prefix
+        self.llm.create_chat_completion(
+            messages=[{"role": "system", "content": self.system_prompt}, {"role": "user", "content": "."}],
+            max_tokens=1
+        )
+        state = self.llm.save_state()
+        
+        # Restored state is re-evaluated from its last prefix token, so stored logits
+        # are never read: keep one row (it broadcasts on load) instead of n_tokens x n_vocab
+        state.scores = state.scores[:1].copy()
+        
+        os.makedirs(config.LLAMA_CPP_STATE_DIR, exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        logger.debug("Saved prompt state (%s tokens) to %s", state.n_tokens, path)
+        return False
+    
+    def stream_chat(self, model: str, messages: List[Dict[str, str]], options: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a chat completion from llama.cpp
+        
+        Args:
+            model: Ignored, the GGUF file defines the model
+            messages: List of messages in format [{role, content}, ...]
+            options: Ollama-style options (num_ctx is fixed at load time)
+        
+        Returns:
+            Iterator[Dict[str, Any]]: Ollama-style chat chunks
+        """
+        with self.lock:
+            stream = self.llm.create_chat_completion(
+                messages=messages,
+                temperature=options.get("temperature", config.DEFAULT_TEMPERATURE),
+                max_tokens=options.get("num_predict"),
+                stop=options.get("stop"),
+                stream=True
+            )
+            
+            eval_count = 0
+            done_reason = ""
+            try:
+                for chunk in stream:
+                    choice = chunk["choices"][0]
+                    content = choice["delta"].get("content")
+                    if content:
+                        eval_count += 1
+                        yield {"message": {"role": "assistant", "content": content}, "done": False}
+                    if choice.get("finish_reason"):
+                        done_reason = choice["finish_reason"]
+            finally:
+                stream.close()
+            
+            yield {
+                "message": {"role": "assistant", "content": ""},
+                "done": True,
+                "done_reason": done_reason,
+                "eval_count": eval_count
+            }
+
+LLM_BACKENDS = {
+    OllamaBackend.name: OllamaBackend,
+    LlamaCppBackend.name: LlamaCppBackend
+}
+
+# One instance per backend, a process should load a model only once
+_backends: Dict[str, LLMBackend] = {}
+_backends_lock = threading.Lock()
+
+def get_llm_backend(name: str = None) -> LLMBackend:
+    """
+    Return the shared backend instance for a name
+    
+    Args:
+        name: Backend name (default: config.LLM_BACKEND)
+    
+    Returns:
+        LLMBackend: Backend instance
+    """
+    name = name or config.LLM_BACKEND
+    if name not in LLM_BACKENDS:
+        raise ValueError(f"Unknown LLM backend: {name} (available: {', '.join(LLM_BACKENDS)})")
+    
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = LLM_BACKENDS[name]()
+        return _backends[name]
\ No newline at end of file
@@ -3,77 +3,252 @@ Interface with language models (LLM)
 Abstracts calls to Ollama and other backends
 """
 
+import threading
 import time
-import ollama
 from typing import List, Dict, Any, Optional
 import config
+from modules.generation_policy import GenerationPolicy
+from modules.hedged_generation import StreamPump, HedgeRecorder
+from modules.llm_backends import LLMBackend, get_llm_backend
+from modules.model_router import ModelRouter
 from utils.token_counter import estimate_message_tokens
+from utils.log import get_logger
+
+logger = get_logger("llm_interface")
 
 class LLMInterface:
     """Interface for language model interactions"""
     
-    def __init__(self, model_name: str = None):
+    def __init__(self, model_name: str = None, backend: Optional[LLMBackend] = None):
         """
         Initialize LLM interface
         
         Args:
-            model_name: Model name to use (default: config.LLM_MODEL)
+            model_name: Chat model to use (default: model of the "chat" task in config.LLM_TASKS)
+            backend: Inference backend (default: shared backend named by config.LLM_BACKEND)
         """
-        self.model_name = model_name or config.LLM_MODEL
+        self.model_name = model_name or config.LLM_TASKS["chat"]["model"]
+        self.backend = backend or get_llm_backend()
+        
+        tasks = dict(config.LLM_TASKS)
+        tasks["chat"] = dict(tasks["chat"], model=self.model_name)
+        self.router = ModelRouter(self.backend, tasks)
+        
         self.last_response_time = 0
+        self.policy = GenerationPolicy() if config.GENERATION_BUDGET_ENABLED else None
+        
+        # Hedging needs a backend able to serve both models at once
+        if config.HEDGE_ENABLED and self.backend.concurrent:
+            self.fallback_model = config.HEDGE_FALLBACK_MODEL
+            self.hedge = HedgeRecorder()
+        else:
+            self.fallback_model = None
+            self.hedge = None
     
     def generate_response(self, 
                          messages: List[Dict[str, str]], 
                          temperature: float = None,
-                         max_context: int = None) -> Dict[str, Any]:
+                         max_context: int = None,
+                         budget: bool = True,
+                         task: str = "chat",
+                         cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
         """
         Generate a response from a list of messages
         
         Args:
             messages: List of messages in format [{role, content}, ...]
-            temperature: Temperature for generation (default: config.DEFAULT_TEMPERATURE)
-            max_context: Maximum context size (default: config.MAX_CONTEXT_TOKENS)
+            temperature: Temperature for generation (default: the task's temperature)
+            max_context: Maximum context size (default: the task's num_ctx)
+            budget: Apply the chat generation policy (length cap, stop sequences, tag cut-off)
+                and hedge against a slow first token
+            task: Task type from config.LLM_TASKS, selects the model and default options
+            cancel: Event that stops generation when set (done_reason is then "cancelled")
             
         Returns:
             Dict: Complete model response
         """
-        temperature = temperature or config.DEFAULT_TEMPERATURE
-        max_context = max_context or config.MAX_CONTEXT_TOKENS
+        model, options = self.router.route(task)
+        if temperature is not None:
+            options["temperature"] = temperature
+        if max_context:
+            options["num_ctx"] = max_context
         
         # Estimate token count
         token_count = estimate_message_tokens(messages)
-        print(f"DEBUG - Sending approx. {token_count} tokens to LLM")
+        logger.debug("Sending approx. %s tokens to LLM", token_count)
         
         # Measure response time
         start_time = time.time()
         
+        policy = self.policy if budget else None
+        if policy:
+            options = policy.apply(options)
+        
         try:
-            # Call Ollama with configured options
-            response = ollama.chat(
-                model=self.model_name,
-                messages=messages,
-                options={
-                    "temperature": temperature,
-                    "num_ctx": max_context
-                }
-            )
+            if budget and self.hedge and model == self.model_name:
+                response = self._generate_hedged(messages, options, policy, cancel)
+            else:
+                # Stream so generation can be cut as soon as the reply is complete
+                stream = self.backend.stream_chat(model, messages, options)
+                response = self._consume_stream(stream, policy, cancel)
             
             # Measure and store response time
             self.last_response_time = time.time() - start_time
-            print(f"DEBUG - Response time: {self.last_response_time:.2f} seconds")
+            logger.debug("Response time (%s, %s): %.2f seconds", task, model, self.last_response_time)
             
             return response
             
         except Exception as e:
-            print(f"ERROR - LLM call failed: {str(e)}")
+            logger.error("LLM call failed: %s", e)
             # Return error response
             return {
                 "message": {
                     "role": "assistant",
-                    "content": f"I'm having trouble thinking right now. [confused]"
-                }
+                    "content": config.LLM_ERROR_RESPONSE
+                },
+                "done_reason": "error"
             }
     
+    def _generate_hedged(self, messages: List[Dict[str, str]], options: Dict[str, Any],
+                         policy: Optional[GenerationPolicy],
+                         cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Generate with the chat model, racing the fallback model if the first token is late
+        
+        The fallback request is issued once config.HEDGE_FIRST_TOKEN_DEADLINE_MS
+        passes without a token (or as soon as the chat model fails), unless
+        loading the fallback model would unload the chat model. The first
+        model to produce a token answers and the other stream is cancelled.
+        
+        Args:
+            messages: List of messages in format [{role, content}, ...]
+            options: Model options
+            policy: Generation policy (None disables the cut-off)
+            cancel: Event that stops generation once streaming when set
+        
+        Returns:
+            Dict: Complete model response, with the answering model under "model"
+        """
+        deadline_ms = config.HEDGE_FIRST_TOKEN_DEADLINE_MS
+        start_time = time.perf_counter()
+        first_chunk = threading.Event()
+        
+        primary = StreamPump(self.backend, self.model_name, messages, options, first_chunk)
+        fallback = None
+        winner = self._first_to_answer([primary], first_chunk, start_time + deadline_ms / 1000)
+        
+        if winner is None and primary.error is None and not self.router.can_use(self.fallback_model):
+            # Keep waiting: hedging would unload the chat model and slow every later turn
+            winner = self._first_to_answer([primary], first_chunk, start_time + config.HEDGE_GIVE_UP_MS / 1000)
+        elif winner is None:
+            if primary.error is None:
+                logger.debug("No token from %s after %s ms, hedging with %s", self.model_name, deadline_ms, self.fallback_model)
+            else:
+                logger.warning("%s failed (%s), falling back to %s", self.model_name, primary.error, self.fallback_model)
+            fallback = StreamPump(self.backend, self.fallback_model, messages, options, first_chunk)
+            winner = self._first_to_answer([primary, fallback], first_chunk, start_time + config.HEDGE_GIVE_UP_MS / 1000)
+        
+        for pump in (primary, fallback):
+            if pump is not None and pump is not winner:
+                pump.close()
+        
+        if winner is None:
+            self.hedge.record(primary, fallback, None, deadline_ms, (time.perf_counter() - start_time) * 1000)
+            raise primary.error or TimeoutError(f"No model produced a token within {config.HEDGE_GIVE_UP_MS} ms")
+        
+        response = self._consume_stream(winner, policy, cancel)
+        response["model"] = winner.model
+        
+        outcome = self.hedge.record(primary, fallback, winner, deadline_ms, (time.perf_counter() - start_time) * 1000)
+        if outcome["hedged"]:
+            logger.debug("Hedged turn answered by %s model (%.0f ms to first token)", outcome['winner'], winner.first_token_ms)
+        
+        return response
+    
+    @staticmethod
+    def _first_to_answer(pumps: List[StreamPump], first_chunk: threading.Event, give_up_at: float) -> Optional[StreamPump]:
+        """
+        Wait until one of the streams produces a chunk
+        
+        Args:
+            pumps: Streams in order of preference
+            first_chunk: Event set by the pumps on their first chunk or failure
+            give_up_at: perf_counter time to stop waiting
+        
+        Returns:
+            Optional[StreamPump]: First stream with a chunk, None if all failed or time ran out
+        """
+        while True:
+            # Clear before checking, so a chunk arriving after the check wakes the wait
+            first_chunk.clear()
+            for pump in pumps:
+                if pump.first_chunk_at is not None:
+                    return pump
+            
+            remaining = give_up_at - time.perf_counter()
+            if remaining <= 0 or all(pump.ready for pump in pumps):
+                return None
+            first_chunk.wait(remaining)
+    
+    def _consume_stream(self, stream, policy: Optional[GenerationPolicy],
+                        cancel: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Accumulate a streamed reply, closing the stream once a final emotion tag or a stop string arrives
+        
+        Args:
+            stream: Generator of Ollama-style chat chunks
+            policy: Generation policy (None disables the cut-off)
+            cancel: Event that stops generation when set
+            
+        Returns:
+            Dict: Response in Ollama's non-streaming format
+        """
+        parts = []
+        chunk_count = 0
+        final = {}
+        cut_by = None
+        cancelled = False
+        
+        try:
+            for chunk in stream:
+                if cancel is not None and cancel.is_set():
+                    cancelled = True
+                    break
+                
+                parts.append(chunk["message"]["content"])
+                chunk_count += 1
+                
+                if chunk.get("done"):
+                    final = chunk
+                    break
+                
+                # Anything after the closing tag or a stop string would be spoken and wasted
+                if policy:
+                    cut_by = policy.check("".join(parts))
+                    if cut_by:
+                        break
+        finally:
+            # Closing the stream makes the backend stop generating
+            stream.close()
+        
+        content = "".join(parts)
+        if cut_by == "stop_sequence":
+            content = content[:policy.stop_index(content)]
+        response = {
+            "message": {"role": "assistant", "content": content},
+            "done_reason": "cancelled" if cancelled else final.get("done_reason") or "",
+            "eval_count": final.get("eval_count") or chunk_count,
+            "prompt_eval_count": final.get("prompt_eval_count") or 0
+        }
+        
+        # A reply abandoned for a newer input was ended by none of the guards
+        if policy and not cancelled:
+            response["guard"] = policy.record(response["eval_count"], response["done_reason"], cut_by)
+            if response["guard"] != "unguarded":
+                logger.debug("Generation ended by %s after %s tokens", response['guard'], response['eval_count'])
+        
+        return response
+    
     def extract_content(self, response: Dict[str, Any]) -> str:
         """
         Extract text content from a response
@@ -95,15 +270,17 @@ class LLMInterface:
         # Fallback if structure is unknown
         return str(response)
     
-    def generate_summary(self, conversation_messages: List[Dict[str, str]]) -> str:
+    def generate_summary(self, conversation_messages: List[Dict[str, str]],
+                         cancel: Optional[threading.Event] = None) -> Optional[str]:
         """
         Generate a summary of the conversation
         
         Args:
             conversation_messages: Conversation messages
+            cancel: Event that abandons the summary when set
             
         Returns:
-            str: Generated summary
+            Optional[str]: Generated summary, None if cancelled or failed
         """
         # Add summary request to messages
         summary_request = {
@@ -111,11 +288,16 @@ class LLMInterface:
             "content": config.SUMMARY_PROMPT
         }
         
-        # Call LLM with low temperature for factual summary
+        # Summary task: low temperature, auxiliary model when it doesn't displace the chat model
         summary_response = self.generate_response(
             messages=conversation_messages + [summary_request],
-            temperature=config.SUMMARY_TEMPERATURE
+            budget=False,
+            task="summary",
+            cancel=cancel
         )
+        # The error reply is meant for the user, not to replace the history
+        if summary_response.get("done_reason") in ("cancelled", "error"):
+            return None
         
         # Extract summary content
         summary_text = self.extract_content(summary_response)
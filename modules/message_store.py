@@ -0,0 +1,196 @@
+"""
+Compact conversation message store
+Column-oriented storage of roles, emotions, token counts and contents
+"""
+
+import sys
+from array import array
+from typing import List, Dict, Any, Optional, Tuple
+import config
+
+ROLE_SYSTEM = 0
+ROLE_USER = 1
+ROLE_ASSISTANT = 2
+ROLE_NAMES = ("system", "user", "assistant")
+
+NO_EMOTION = 255  # Emotion column value for messages without emotion
+EMOTION_IDS = {emotion: index for index, emotion in enumerate(config.VALID_EMOTIONS)}
+
+class MessageStore:
+    """
+    Conversation history stored as parallel columns
+    
+    Each message costs one byte of role, one byte of emotion ID, four bytes
+    of token count and a reference to its content string. Assistant
+    contents are stored without emotion tags, which live in the emotion
+    column instead. LangChain messages are built on demand.
+    """
+    
+    __slots__ = ("roles", "emotions", "tokens", "contents")
+    
+    def __init__(self):
+        """Initialize an empty store"""
+        self.roles = array("B")
+        self.emotions = array("B")
+        self.tokens = array("I")
+        self.contents: List[str] = []
+    
+    def __len__(self) -> int:
+        """Number of messages"""
+        return len(self.contents)
+    
+    def append(self, role: int, content: str, tokens: int, emotion: Optional[str] = None) -> None:
+        """
+        Append a message
+        
+        Args:
+            role: ROLE_SYSTEM, ROLE_USER or ROLE_ASSISTANT
+            content: Message content (assistant content without emotion tags)
+            tokens: Token count charged for the message
+            emotion: Emotion of an assistant message (optional)
+        """
+        self.roles.append(role)
+        self.emotions.append(EMOTION_IDS.get(emotion, NO_EMOTION))
+        self.tokens.append(tokens)
+        self.contents.append(content)
+    
+    def get(self, index: int) -> Tuple[str, str, Optional[str]]:
+        """
+        Return one message
+        
+        Args:
+            index: Message index (negative values count from the end)
+        
+        Returns:
+            Tuple[str, str, Optional[str]]: (role name, content, emotion)
+        """
+        emotion_id = self.emotions[index]
+        emotion = config.VALID_EMOTIONS[emotion_id] if emotion_id != NO_EMOTION else None
+        return ROLE_NAMES[self.roles[index]], self.contents[index], emotion
+    
+    def pop(self) -> None:
+        """
+        Remove the latest message
+        """
+        self.roles.pop()
+        self.emotions.pop()
+        self.tokens.pop()
+        self.contents.pop()
+    
+    def last_index(self, role: int) -> Optional[int]:
+        """
+        Return the index of the latest message with a role
+        
+        Args:
+            role: Role code
+        
+        Returns:
+            Optional[int]: Index, None if there is no such message
+        """
+        for index in range(len(self.roles) - 1, -1, -1):
+            if self.roles[index] == role:
+                return index
+        return None
+    
+    def keep_last(self, count: int) -> None:
+        """
+        Drop all but the latest messages
+        
+        Args:
+            count: Number of messages to keep
+        """
+        drop = max(0, len(self.contents) - count)
+        if drop:
+            del self.roles[:drop]
+            del self.emotions[:drop]
+            del self.tokens[:drop]
+            del self.contents[:drop]
+    
+    def total_tokens(self) -> int:
+        """
+        Return the token count of all messages
+        
+        Returns:
+            int: Sum of the token column
+        """
+        return sum(self.tokens)
+    
+    def nbytes(self) -> int:
+        """
+        Return the approximate memory held by the store
+        
+        Returns:
+            int: Bytes of the columns and content strings
+        """
+        columns = sum(column.buffer_info()[1] * column.itemsize for column in (self.roles, self.emotions, self.tokens))
+        return columns + sys.getsizeof(self.contents) + sum(sys.getsizeof(content) for content in self.contents)
+    
+    def to_dicts(self, roles: Tuple[int, ...] = (ROLE_USER, ROLE_ASSISTANT)) -> List[Dict[str, str]]:
+        """
+        Return messages in Ollama format
+        
+        Args:
+            roles: Roles to include (system messages are excluded by default)
+        
+        Returns:
+            List[Dict[str, str]]: Messages as [{role, content}, ...]
+        """
+        return [
+            {"role": ROLE_NAMES[role], "content": content}
+            for role, content in zip(self.roles, self.contents)
+            if role in roles
+        ]
+    
+    def to_state(self) -> Dict[str, Any]:
+        """
+        Return the columns in a picklable form
+        
+        Returns:
+            Dict[str, Any]: Column bytes and contents
+        """
+        return {
+            "roles": self.roles.tobytes(),
+            "emotions": self.emotions.tobytes(),
+            "tokens": self.tokens.tobytes(),
+            "contents": list(self.contents)
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "MessageStore":
+        """
+        Rebuild a store from to_state output
+        
+        Args:
+            state: Column bytes and contents
+        
+        Returns:
+            MessageStore: Store holding the same messages
+        """
+        store = cls()
+        store.roles.frombytes(state["roles"])
+        store.emotions.frombytes(state["emotions"])
+        store.tokens.frombytes(state["tokens"])
+        store.contents = list(state["contents"])
+        return store
+    
+    def to_langchain(self) -> List[Any]:
+        """
+        Build LangChain messages, with emotion tags restored on assistant messages
+        
+        Returns:
+            List[Any]: SystemMessage, HumanMessage and AIMessage objects
+        """
+        # Only needed by callers working with LangChain
+        from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+        
+        messages = []
+        for index in range(len(self.contents)):
+            role, content, emotion = self.get(index)
+            if role == "system":
+                messages.append(SystemMessage(content=content))
+            elif role == "user":
+                messages.append(HumanMessage(content=content))
+            else:
+                emotion = emotion or config.DEFAULT_EMOTION
+                messages.append(AIMessage(content=f"{content} [{emotion}]", metadata={"emotion": emotion}))
+        return messages
\ No newline at end of file
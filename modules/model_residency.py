@@ -0,0 +1,170 @@
+"""
+Model residency keeper for Ollama
+Preloads models, keeps them loaded while the session is active and releases them after inactivity
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List
+import ollama
+import config
+from modules.llm_backends import OllamaBackend
+from utils.log import get_logger
+
+logger = get_logger("model_residency")
+
+class ResidencyManager:
+    """
+    Keeps configured models loaded in Ollama
+    
+    Models are preloaded at start and refreshed with empty generate requests
+    (they load the model without evaluating anything) every
+    config.RESIDENCY_KEEPALIVE_INTERVAL seconds while the session is active.
+    Once no chat request has been made for config.RESIDENCY_RELEASE_AFTER
+    seconds, the models are unloaded. Loads reported by chat requests are
+    counted as cold starts, since a user waited for them.
+    """
+    
+    def __init__(self, backend: OllamaBackend, models: List[str] = None):
+        """
+        Initialize residency manager
+        
+        Args:
+            backend: Ollama backend, reports chat activity and loads
+            models: Models to keep loaded (default: config.RESIDENCY_MODELS)
+        """
+        self.backend = backend
+        self.models = models or config.RESIDENCY_MODELS
+        self.running = False
+        self.thread = None
+        self.wake = threading.Event()
+        self.lock = threading.Lock()
+        
+        self.started_at = time.monotonic()
+        self.released = False
+        self.load_events = deque(maxlen=config.RESIDENCY_EVENT_HISTORY)
+        self.stats = {
+            "preloads": 0,
+            "keepalives": 0,
+            "releases": 0,
+            "loads": 0,
+            "cold_starts": 0,
+            "load_seconds": 0.0,
+            "errors": 0
+        }
+        
+        backend.on_load = self._on_request_load
+    
+    def start(self) -> None:
+        """
+        Start the residency thread, which preloads the models first
+        """
+        if self.running:
+            return
+        
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="Residency", daemon=True)
+        self.thread.start()
+    
+    def stop(self) -> None:
+        """
+        Stop the residency thread (models stay loaded for Ollama's own keep-alive)
+        """
+        self.running = False
+        self.wake.set()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+    
+    def _run(self) -> None:
+        """
+        Residency loop
+        """
+        for model in self.models:
+            self._touch(model, config.RESIDENCY_KEEP_ALIVE, "preload")
+        
+        while self.running:
+            self.wake.wait(config.RESIDENCY_KEEPALIVE_INTERVAL)
+            if not self.running:
+                break
+            
+            last_activity = self.backend.last_request_time or self.started_at
+            idle = time.monotonic() - last_activity
+            
+            if idle < config.RESIDENCY_RELEASE_AFTER:
+                self.released = False
+                for model in self.models:
+                    self._touch(model, config.RESIDENCY_KEEP_ALIVE, "keepalive")
+            elif not self.released:
+                logger.debug("No activity for %.0f s, releasing %s", idle, ', '.join(self.models))
+                for model in self.models:
+                    self._touch(model, 0, "release")
+                self.released = True
+    
+    def _touch(self, model: str, keep_alive: Any, cause: str) -> None:
+        """
+        Send an empty generate request, which loads the model and sets its keep-alive
+        
+        Args:
+            model: Model name
+            keep_alive: Ollama keep-alive (duration string, seconds, or 0 to unload)
+            cause: "preload", "keepalive" or "release"
+        """
+        try:
+            response = ollama.generate(model=model, prompt="", keep_alive=keep_alive)
+        except Exception as e:
+            with self.lock:
+                self.stats["errors"] += 1
+            logger.warning("Residency %s of %s failed: %s", cause, model, e)
+            return
+        
+        with self.lock:
+            self.stats[f"{cause}s"] += 1
+        
+        # A keep-alive that had to load means the model was evicted in between
+        load_seconds = (response.get("load_duration") or 0) / 1e9
+        if cause != "release" and load_seconds >= config.RESIDENCY_LOAD_THRESHOLD:
+            self._record_load(model, load_seconds, cause)
+    
+    def _on_request_load(self, model: str, load_seconds: float) -> None:
+        """
+        Backend callback for chat requests
+        
+        Args:
+            model: Model of the request
+            load_seconds: Load time reported by Ollama
+        """
+        if load_seconds >= config.RESIDENCY_LOAD_THRESHOLD:
+            self._record_load(model, load_seconds, "request")
+    
+    def _record_load(self, model: str, load_seconds: float, cause: str) -> None:
+        """
+        Record a model load
+        
+        Args:
+            model: Model name
+            load_seconds: Load time
+            cause: What triggered the load ("request" loads are cold starts)
+        """
+        with self.lock:
+            self.stats["loads"] += 1
+            self.stats["load_seconds"] += load_seconds
+            if cause == "request":
+                self.stats["cold_starts"] += 1
+            self.load_events.append({"time": time.time(), "model": model, "seconds": load_seconds, "cause": cause})
+        
+        label = "Cold start" if cause == "request" else "Model load"
+        logger.debug("%s: %s took %.1f s to load (%s)", label, model, load_seconds, cause)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return residency statistics
+        
+        Returns:
+            Dict[str, Any]: Request counters, loads, cold starts and recent load events
+        """
+        with self.lock:
+            stats = dict(self.stats)
+            stats["load_events"] = list(self.load_events)
+        stats["released"] = self.released
+        return stats
\ No newline at end of file
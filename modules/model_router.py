@@ -0,0 +1,140 @@
+"""
+Task-based model routing
+Maps task types (chat, summary, classify) to models and options, keeping the chat model resident
+"""
+
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+import config
+from modules.llm_backends import LLMBackend
+from utils.log import get_logger
+
+logger = get_logger("model_router")
+
+class ModelRouter:
+    """
+    Chooses the model and options for a task
+    
+    Each task in config.LLM_TASKS has its own model, num_ctx and temperature.
+    Auxiliary tasks only use their model if it is already loaded, or if it
+    fits next to the loaded models; otherwise they run on the chat model so
+    the backend never has to unload it.
+    """
+    
+    CHAT_TASK = "chat"
+    
+    def __init__(self, backend: LLMBackend, tasks: Dict[str, Dict[str, Any]] = None):
+        """
+        Initialize model router
+        
+        Args:
+            backend: Inference backend, queried for loaded models
+            tasks: Task name -> {model, num_ctx, temperature} (default: config.LLM_TASKS)
+        """
+        self.backend = backend
+        self.tasks = tasks or config.LLM_TASKS
+        if self.CHAT_TASK not in self.tasks:
+            raise ValueError(f"Task table must define a '{self.CHAT_TASK}' task")
+        
+        self.lock = threading.Lock()
+        self.resident = None  # Model name -> VRAM bytes, from the last refresh
+        self.resident_time = 0.0
+        self.stats = {task: {"routed": 0, "rerouted": 0} for task in self.tasks}
+    
+    @property
+    def chat_model(self) -> str:
+        """Model serving conversation turns"""
+        return self.tasks[self.CHAT_TASK]["model"]
+    
+    def route(self, task: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Return the model and options to use for a task
+        
+        Args:
+            task: Task name from the task table
+        
+        Returns:
+            Tuple[str, Dict[str, Any]]: (model name, {temperature, num_ctx})
+        """
+        if task not in self.tasks:
+            raise ValueError(f"Unknown LLM task: {task} (available: {', '.join(self.tasks)})")
+        
+        profile = self.tasks[task]
+        model = profile["model"]
+        options = {"temperature": profile["temperature"], "num_ctx": profile["num_ctx"]}
+        
+        rerouted = model != self.chat_model and not self.can_use(model)
+        if rerouted:
+            logger.debug("Running %s on %s to keep it loaded instead of %s", task, self.chat_model, model)
+            model = self.chat_model
+            # The chat model is already loaded with its own context size, keep it
+            options["num_ctx"] = self.tasks[self.CHAT_TASK]["num_ctx"]
+        
+        with self.lock:
+            self.stats[task]["routed"] += 1
+            self.stats[task]["rerouted"] += int(rerouted)
+        
+        return model, options
+    
+    def can_use(self, model: str) -> bool:
+        """
+        Check if an auxiliary model can run without unloading the chat model
+        
+        Args:
+            model: Auxiliary model name
+        
+        Returns:
+            bool: True if the model is loaded or fits next to the loaded models
+        """
+        # A single-model backend (llama.cpp) only has the chat model
+        if not self.backend.concurrent:
+            return False
+        
+        resident = self._resident_models()
+        if resident is None:
+            # Unknown state, don't risk an eviction
+            return False
+        
+        model = self.backend.normalize_model_name(model)
+        if model in resident:
+            return True
+        if self.backend.normalize_model_name(self.chat_model) not in resident:
+            # Nothing to protect, the chat model will be loaded on its next turn anyway
+            return True
+        if len(resident) >= config.LLM_MAX_LOADED_MODELS:
+            return False
+        
+        size = self.backend.model_size(model)
+        if size is None:
+            return False
+        needed = size * config.LLM_MODEL_MEMORY_OVERHEAD
+        return sum(resident.values()) + needed <= config.LLM_VRAM_BUDGET
+    
+    def _resident_models(self) -> Optional[Dict[str, int]]:
+        """
+        Return loaded models, refreshed at most every config.LLM_RESIDENCY_REFRESH seconds
+        
+        Returns:
+            Optional[Dict[str, int]]: Model name -> VRAM bytes, None if unknown
+        """
+        with self.lock:
+            if self.resident is not None and time.monotonic() - self.resident_time < config.LLM_RESIDENCY_REFRESH:
+                return self.resident
+        
+        resident = self.backend.resident_models()
+        
+        with self.lock:
+            self.resident = resident
+            self.resident_time = time.monotonic()
+        return resident
+    
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Return per-task routing statistics
+        
+        Returns:
+            Dict[str, Dict[str, int]]: Requests and requests moved to the chat model, per task
+        """
+        with self.lock:
+            return {task: dict(values) for task, values in self.stats.items()}
\ No newline at end of file
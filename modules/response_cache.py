@@ -0,0 +1,239 @@
+"""
+Response cache for short, repeated user utterances
+Serves cached (clean_text, emotion) pairs and pre-rendered audio
+"""
+
+import hashlib
+import re
+import sys
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, Optional, Tuple
+import config
+
+class CacheEntry:
+    """Single cached response"""
+    
+    __slots__ = ("clean_text", "emotion", "audio", "created_at", "hits")
+    
+    def __init__(self, clean_text: str, emotion: str):
+        """
+        Initialize a cache entry
+        
+        Args:
+            clean_text: Response text without emotion tags
+            emotion: Response emotion
+        """
+        self.clean_text = clean_text
+        self.emotion = emotion
+        self.audio = None  # Pre-rendered PCM, attached once played in full
+        self.created_at = time.monotonic()
+        self.hits = 0
+
+class ResponseCache:
+    """Bounded LRU cache of responses with per-entry TTL and reuse limit"""
+    
+    def __init__(self,
+                 max_entries: int = None,
+                 ttl: float = None,
+                 max_reuse: int = None,
+                 max_input_chars: int = None):
+        """
+        Initialize response cache
+        
+        Args:
+            max_entries: Maximum number of entries before LRU eviction (default: config.RESPONSE_CACHE_MAX_ENTRIES)
+            ttl: Entry time-to-live in seconds (default: config.RESPONSE_CACHE_TTL)
+            max_reuse: Maximum times an entry is served before refresh (default: config.RESPONSE_CACHE_MAX_REUSE)
+            max_input_chars: Longest user input eligible for caching (default: config.RESPONSE_CACHE_MAX_INPUT_CHARS)
+        """
+        self.max_entries = max_entries or config.RESPONSE_CACHE_MAX_ENTRIES
+        self.ttl = ttl or config.RESPONSE_CACHE_TTL
+        self.max_reuse = max_reuse or config.RESPONSE_CACHE_MAX_REUSE
+        self.max_input_chars = max_input_chars or config.RESPONSE_CACHE_MAX_INPUT_CHARS
+        self.entries = OrderedDict()  # key -> CacheEntry, oldest first
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+    
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normalize a user utterance so near-identical messages share a key
+        
+        Args:
+            text: Raw user input
+        
+        Returns:
+            str: Normalized text
+        """
+        text = unicodedata.normalize("NFKC", text).lower()
+        # Drop punctuation and emoji, keep letters, digits and spaces
+        text = re.sub(r"[^\w\s]", " ", text)
+        # Collapse stretched letters ("hiiii" -> "hi")
+        text = re.sub(r"(\w)\1{2,}", r"\1", text)
+        return " ".join(text.split())
+    
+    def is_cacheable(self, user_input: str) -> bool:
+        """
+        Check if an input is short enough to be served from cache
+        
+        Args:
+            user_input: Raw user input
+        
+        Returns:
+            bool: True if input is eligible
+        """
+        normalized = self.normalize(user_input)
+        return 0 < len(normalized) <= self.max_input_chars
+    
+    def make_key(self, user_input: str, context_fingerprint: str) -> str:
+        """
+        Build cache key from user input and context state
+        
+        Args:
+            user_input: Raw user input
+            context_fingerprint: Fingerprint of the context state
+        
+        Returns:
+            str: Cache key
+        """
+        return f"{context_fingerprint}:{self.normalize(user_input)}"
+    
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        """
+        Look up a cached response
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Optional[Tuple[str, str]]: (clean_text, emotion) or None on miss
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            
+            # Drop expired or worn-out entries so the response gets refreshed
+            if time.monotonic() - entry.created_at > self.ttl or entry.hits >= self.max_reuse:
+                del self.entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            
+            entry.hits += 1
+            self.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry.clean_text, entry.emotion
+    
+    def put(self, key: str, clean_text: str, emotion: str) -> None:
+        """
+        Store a response
+        
+        Args:
+            key: Cache key
+            clean_text: Response text without emotion tags
+            emotion: Response emotion
+        """
+        with self.lock:
+            self.entries[key] = CacheEntry(clean_text, emotion)
+            self.entries.move_to_end(key)
+            
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats["evictions"] += 1
+    
+    def wants_audio(self, text: str) -> bool:
+        """
+        Check if a cached entry is waiting for the audio of this text
+        
+        Args:
+            text: Spoken text
+        
+        Returns:
+            bool: True if audio should be captured
+        """
+        with self.lock:
+            return any(entry.clean_text == text and entry.audio is None
+                       for entry in self.entries.values())
+    
+    def attach_audio(self, text: str, audio: bytes) -> None:
+        """
+        Attach pre-rendered audio to all entries with this text
+        
+        Args:
+            text: Spoken text
+            audio: Rendered PCM audio
+        """
+        with self.lock:
+            for entry in self.entries.values():
+                if entry.clean_text == text:
+                    entry.audio = audio
+    
+    def get_audio(self, text: str) -> Optional[bytes]:
+        """
+        Return pre-rendered audio for a text, if available
+        
+        Args:
+            text: Text to speak
+        
+        Returns:
+            Optional[bytes]: Rendered PCM audio or None
+        """
+        with self.lock:
+            for entry in self.entries.values():
+                if entry.clean_text == text and entry.audio is not None:
+                    return entry.audio
+        return None
+    
+    def nbytes(self) -> int:
+        """
+        Return the approximate memory held by cached texts and audio
+        
+        Returns:
+            int: Bytes of keys, texts and pre-rendered audio
+        """
+        with self.lock:
+            entries = list(self.entries.items())
+        return sum(sys.getsizeof(key) + sys.getsizeof(entry.clean_text) + (len(entry.audio) if entry.audio else 0)
+                   for key, entry in entries)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return cache statistics
+        
+        Returns:
+            Dict[str, Any]: Hit, miss and eviction counters
+        """
+        with self.lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self.entries)
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / total if total else 0.0
+        return stats
+
+def context_fingerprint(model_name: str, system_prompt: str, summary: str,
+                        recent: Iterable[Tuple[str, str]] = ()) -> str:
+    """
+    Fingerprint the parts of the context that shape the reply
+    
+    Args:
+        model_name: Model producing the responses
+        system_prompt: Personality prompt
+        summary: Current conversation summary
+        recent: (role, content) of the latest messages before the input
+    
+    Returns:
+        str: Short hexadecimal fingerprint
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    parts = [model_name, system_prompt, summary]
+    for role, content in recent:
+        parts.extend((role, content))
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+Session traffic recorder
+Logs user inputs, think times and LLM/TTS timings of each session for replay
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Any, List
+import config
+
+class SessionRecorder:
+    """
+    Appends one compact JSON line per session event
+    
+    Events share the keys "e" (event type), "s" (session ID) and "at"
+    (seconds since the session started):
+        start: "t" wall-clock start time, "model" chat model
+        turn:  "in" user input, "gap" seconds since the previous reply,
+               "ms" turn time, "llm" LLM time, "tok" generated tokens,
+               "ctx" context tokens after the turn, "saved" prompt tokens saved by compaction
+        tts:   "first" ms to first audio, "ms" synthesis time, "chars" text length,
+               "int" 1 if interrupted
+        end:   no extra keys
+    """
+    
+    def __init__(self, path: str = None, model: str = None):
+        """
+        Initialize session recorder and start a session
+        
+        Args:
+            path: Log file, appended to (default: config.SESSION_RECORD_PATH)
+            model: Chat model noted in the start event (default: config.LLM_MODEL)
+        """
+        self.path = path or config.SESSION_RECORD_PATH
+        self.session_id = uuid.uuid4().hex[:8]
+        self.lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self.last_reply_at = self.started_at
+        
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.file = open(self.path, "a", encoding="utf-8")
+        self._write({"e": "start", "t": round(time.time(), 3), "model": model or config.LLM_MODEL})
+    
+    def _write(self, event: Dict[str, Any]) -> None:
+        """
+        Write one event line
+        
+        Args:
+            event: Event fields (session and offset are added)
+        """
+        event["s"] = self.session_id
+        event.setdefault("at", round(time.monotonic() - self.started_at, 3))
+        line = json.dumps(event, separators=(",", ":"), ensure_ascii=False)
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.write(line + "\n")
+            self.file.flush()
+    
+    def record_turn(self, user_input: str, started_at: float, response: Dict[str, Any]) -> None:
+        """
+        Record a completed turn
+        
+        Args:
+            user_input: User's message
+            started_at: time.monotonic() when the input was submitted
+            response: Response returned by ConversationAgent.process
+        """
+        now = time.monotonic()
+        self._write({
+            "e": "turn",
+            "at": round(started_at - self.started_at, 3),
+            "in": user_input,
+            "gap": round(started_at - self.last_reply_at, 3),
+            "ms": round((now - started_at) * 1000, 1),
+            "llm": round(response.get("llm_ms", 0.0), 1),
+            "tok": response.get("eval_count", 0),
+            "ctx": response.get("token_count", 0),
+            "saved": response.get("tokens_saved", 0)
+        })
+        self.last_reply_at = now
+    
+    def record_tts(self, text: str, first_audio_ms: float, total_ms: float, interrupted: bool) -> None:
+        """
+        Record a speech synthesis (SpeechAgent.on_timing callback)
+        
+        Args:
+            text: Spoken text
+            first_audio_ms: Time to the first audio chunk
+            total_ms: Time until synthesis and playback ended
+            interrupted: True if speech was cut short
+        """
+        self._write({
+            "e": "tts",
+            "first": round(first_audio_ms, 1),
+            "ms": round(total_ms, 1),
+            "chars": len(text),
+            "int": int(interrupted)
+        })
+    
+    def close(self) -> None:
+        """
+        End the session and close the log
+        """
+        self._write({"e": "end"})
+        with self.lock:
+            self.file.close()
+
+def load_sessions(path: str, min_turns: int = 1) -> List[Dict[str, Any]]:
+    """
+    Read recorded sessions
+    
+    Args:
+        path: Log file written by SessionRecorder
+        min_turns: Sessions with fewer turns are skipped
+    
+    Returns:
+        List[Dict[str, Any]]: Sessions as {"id", "model", "turns", "tts"} in start order
+    """
+    sessions: Dict[str, Dict[str, Any]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            session = sessions.setdefault(event["s"], {"id": event["s"], "model": None, "turns": [], "tts": []})
+            if event["e"] == "start":
+                session["model"] = event.get("model")
+            elif event["e"] == "turn":
+                session["turns"].append(event)
+            elif event["e"] == "tts":
+                session["tts"].append(event)
+    
+    return [session for session in sessions.values() if len(session["turns"]) >= min_turns]
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+Text-to-speech backends
+Abstracts remote (OpenAI-compatible HTTP) and in-process TTS engines
+"""
+
+from typing import Iterator
+import httpx
+from openai import OpenAI
+import config
+
+class TTSBackend:
+    """Base class for TTS backends producing 16-bit mono PCM"""
+    
+    name = "base"
+    
+    def __init__(self, sample_rate: int, chunk_size: int = None):
+        """
+        Initialize a TTS backend
+        
+        Args:
+            sample_rate: Sample rate of the produced PCM in Hz
+            chunk_size: Bytes per yielded chunk (default: config.TTS_CHUNK_SIZE)
+        """
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size or config.TTS_CHUNK_SIZE
+    
+    def stream(self, text: str) -> Iterator[bytes]:
+        """
+        Synthesize text as a stream of PCM chunks
+        
+        Args:
+            text: Text to synthesize
+        
+        Returns:
+            Iterator[bytes]: 16-bit mono PCM chunks of chunk_size bytes (last one may be shorter)
+        """
+        raise NotImplementedError("The stream method must be implemented in subclasses")
+    
+    def close(self) -> None:
+        """
+        Release backend resources
+        """
+        pass
+
+class KokoroTTSBackend(TTSBackend):
+    """Remote TTS through an OpenAI-compatible server (e.g. Kokoro-FastAPI) with pooled keep-alive connections"""
+    
+    name = "kokoro"
+    
+    def __init__(self,
+                 base_url: str = None,
+                 model: str = None,
+                 voice: str = None,
+                 sample_rate: int = None,
+                 chunk_size: int = None):
+        """
+        Initialize remote TTS backend
+        
+        Args:
+            base_url: Server URL (default: config.TTS_BASE_URL)
+            model: TTS model name (default: config.TTS_MODEL)
+            voice: Voice name (default: config.TTS_VOICE)
+            sample_rate: Sample rate of the server's PCM (default: config.TTS_SAMPLE_RATE)
+            chunk_size: Bytes per yielded chunk (default: config.TTS_CHUNK_SIZE)
+        """
+        super().__init__(sample_rate or config.TTS_SAMPLE_RATE, chunk_size)
+        self.model = model or config.TTS_MODEL
+        self.voice = voice or config.TTS_VOICE
+        
+        # Keep connections open between utterances to skip TCP setup on every sentence
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=config.TTS_MAX_CONNECTIONS,
+                max_keepalive_connections=config.TTS_MAX_CONNECTIONS,
+                keepalive_expiry=config.TTS_KEEPALIVE_EXPIRY
+            ),
+            timeout=config.TTS_TIMEOUT
+        )
+        self.client = OpenAI(
+            base_url=base_url or config.TTS_BASE_URL,
+            api_key="not-needed",
+            http_client=self.http_client
+        )
+    
+    def stream(self, text: str) -> Iterator[bytes]:
+        """
+        Synthesize text as a stream of PCM chunks
+        
+        Args:
+            text: Text to synthesize
+        
+        Returns:
+            Iterator[bytes]: 16-bit mono PCM chunks
+        """
+        with self.client.audio.speech.with_streaming_response.create(
+            model=self.model,
+            voice=self.voice,
+            response_format="pcm",
+            input=text
+        ) as response:
+            yield from response.iter_bytes(chunk_size=self.chunk_size)
+    
+    def close(self) -> None:
+        """
+        Close pooled connections
+        """
+        self.http_client.close()
+
+class PiperTTSBackend(TTSBackend):
+    """In-process TTS with piper-tts (ONNX), no network hop"""
+    
+    name = "piper"
+    
+    def __init__(self, model_path: str = None, chunk_size: int = None, use_cuda: bool = None):
+        """
+        Initialize in-process TTS backend
+        
+        Args:
+            model_path: Path to the .onnx voice, config read from <model>.json (default: config.PIPER_MODEL_PATH)
+            chunk_size: Bytes per yielded chunk (default: config.TTS_CHUNK_SIZE)
+            use_cuda: Run the voice on GPU (default: config.PIPER_USE_CUDA)
+        """
+        # Optional dependency, only needed for in-process synthesis
+        from piper import PiperVoice
+        
+        if use_cuda is None:
+            use_cuda = config.PIPER_USE_CUDA
+        self.voice = PiperVoice.load(model_path or config.PIPER_MODEL_PATH, use_cuda=use_cuda)
+        super().__init__(self.voice.config.sample_rate, chunk_size)
+    
+    def stream(self, text: str) -> Iterator[bytes]:
+        """
+        Synthesize text sentence by sentence as a stream of PCM chunks
+        
+        Args:
+            text: Text to synthesize
+        
+        Returns:
+            Iterator[bytes]: 16-bit mono PCM chunks
+        """
+        for sentence_audio in self.voice.synthesize_stream_raw(text, length_scale=config.PIPER_LENGTH_SCALE):
+            # Re-chunk each sentence so playback writes stay small
+            for start in range(0, len(sentence_audio), self.chunk_size):
+                yield sentence_audio[start:start + self.chunk_size]
+
+TTS_BACKENDS = {
+    KokoroTTSBackend.name: KokoroTTSBackend,
+    PiperTTSBackend.name: PiperTTSBackend
+}
+
+def create_tts_backend(name: str = None, **kwargs) -> TTSBackend:
+    """
+    Create a TTS backend by name
+    
+    Args:
+        name: Backend name (default: config.TTS_BACKEND)
+        **kwargs: Backend-specific options
+    
+    Returns:
+        TTSBackend: Backend instance
+    """
+    name = name or config.TTS_BACKEND
+    if name not in TTS_BACKENDS:
+        raise ValueError(f"Unknown TTS backend: {name} (available: {', '.join(TTS_BACKENDS)})")
+    return TTS_BACKENDS[name](**kwargs)
\ No newline at end of file
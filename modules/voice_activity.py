@@ -0,0 +1,73 @@
+"""
+Voice activity detection
+Frame-level speech/silence decisions with an adaptive noise floor
+"""
+
+from typing import Optional
+import numpy as np
+import config
+
+class VoiceActivityDetector:
+    """
+    Energy-based VAD with onset confirmation and end-of-speech hangover
+    
+    Speech starts after config.VAD_MIN_SPEECH_MS of frames above the noise
+    floor times config.VAD_START_RATIO, and ends after
+    config.VAD_END_SILENCE_MS of frames below it.
+    """
+    
+    def __init__(self, frame_ms: int = None):
+        """
+        Initialize voice activity detector
+        
+        Args:
+            frame_ms: Duration of each analyzed frame (default: config.ASR_FRAME_MS)
+        """
+        self.frame_ms = frame_ms or config.ASR_FRAME_MS
+        self.start_frames = max(1, config.VAD_MIN_SPEECH_MS // self.frame_ms)
+        self.end_frames = max(1, config.VAD_END_SILENCE_MS // self.frame_ms)
+        self.noise_floor = config.VAD_MIN_LEVEL
+        self.in_speech = False
+        self.voiced_run = 0
+        self.silent_run = 0
+    
+    def reset(self) -> None:
+        """
+        Forget the current utterance state (noise floor is kept)
+        """
+        self.in_speech = False
+        self.voiced_run = 0
+        self.silent_run = 0
+    
+    def process_frame(self, frame: np.ndarray) -> Optional[str]:
+        """
+        Classify one frame and report speech boundaries
+        
+        Args:
+            frame: Float32 samples in [-1, 1]
+        
+        Returns:
+            Optional[str]: "start" when speech begins, "end" when it ends, None otherwise
+        """
+        level = float(np.sqrt(np.mean(frame * frame))) if frame.size else 0.0
+        threshold = max(self.noise_floor * config.VAD_START_RATIO, config.VAD_MIN_LEVEL)
+        voiced = level > threshold
+        
+        if not self.in_speech:
+            # Track background noise only while nobody is talking
+            if not voiced:
+                self.noise_floor += (level - self.noise_floor) * 0.05
+                self.noise_floor = max(self.noise_floor, config.VAD_MIN_LEVEL / config.VAD_START_RATIO)
+            self.voiced_run = self.voiced_run + 1 if voiced else 0
+            if self.voiced_run >= self.start_frames:
+                self.in_speech = True
+                self.silent_run = 0
+                return "start"
+            return None
+        
+        self.silent_run = 0 if voiced else self.silent_run + 1
+        if self.silent_run >= self.end_frames:
+            self.in_speech = False
+            self.voiced_run = 0
+            return "end"
+        return None
\ No newline at end of file
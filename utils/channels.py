@@ -0,0 +1,560 @@
+"""
+Queue-compatible channels for inter-agent communication
+Latest-value channels for state streams, priority channels for command streams,
+bounded channels for backpressure
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from queue import Queue, PriorityQueue, Empty, Full
+from typing import Any, Callable, Dict, Optional
+
+# Priorities for command-like streams (lower value is served first)
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+# Command asking an agent to abandon its current work
+INTERRUPT_COMMAND = "__interrupt__"
+
+# Tag of a filler utterance, sent as (FILLER_COMMAND, text) so it's never mistaken for a reply
+FILLER_COMMAND = "__filler__"
+
+# What a full channel does with a new item
+OVERFLOW_BLOCK = "block"  # Wait for space
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # Discard the oldest pending item
+OVERFLOW_DROP_NEWEST = "drop_newest"  # Discard the new item
+OVERFLOW_REJECT = "reject"  # Discard the new item and let the sender know (put returns False)
+OVERFLOW_MERGE = "merge"  # Combine the new item with the newest pending one
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST, OVERFLOW_REJECT, OVERFLOW_MERGE)
+
+class ShedStats:
+    """
+    Load shedding counters shared by bounded channels
+    
+    The on_shed callback, if set, is called with (event, item) for every
+    item dropped, rejected or merged, outside the channel lock.
+    """
+    
+    def __init__(self):
+        """Initialize counters"""
+        self.on_shed: Optional[Callable[[str, Any], None]] = None
+        self.counts = {"accepted": 0, "dropped_oldest": 0, "dropped_newest": 0, "rejected": 0,
+                       "merged": 0, "blocked": 0}
+        self.max_depth = 0
+    
+    def shed(self, event: str, item: Any) -> None:
+        """
+        Report a shedding event
+        
+        Args:
+            event: "dropped_oldest", "dropped_newest", "rejected" or "merged"
+            item: Item affected
+        """
+        if self.on_shed:
+            self.on_shed(event, item)
+    
+    def snapshot(self, depth: int, capacity: int, overflow: str) -> Dict[str, Any]:
+        """
+        Return counters with the channel's current state
+        
+        Args:
+            depth: Pending items
+            capacity: Channel capacity (0 = unbounded)
+            overflow: Overflow policy
+        
+        Returns:
+            Dict[str, Any]: Counters, depth, max depth, capacity and policy
+        """
+        return dict(self.counts, depth=depth, max_depth=self.max_depth, capacity=capacity, overflow=overflow)
+
+class LatestValueChannel:
+    """
+    Channel keeping only the newest pending value
+    Suited to state-like streams (e.g. emotion) where stale updates are useless
+    """
+    
+    def __init__(self):
+        """Initialize latest-value channel"""
+        self.condition = threading.Condition()
+        self.value = None
+        self.has_value = False
+        self.dropped = 0  # Stale values overwritten before being read
+    
+    def put(self, item: Any, block: bool = True, timeout: Optional[float] = None) -> None:
+        """
+        Publish a value, replacing any value not yet consumed
+        
+        Args:
+            item: Value to publish
+            block: Unused, kept for Queue compatibility
+            timeout: Unused, kept for Queue compatibility
+        """
+        with self.condition:
+            if self.has_value:
+                self.dropped += 1
+            self.value = item
+            self.has_value = True
+            self.condition.notify()
+    
+    def put_nowait(self, item: Any) -> None:
+        """
+        Publish a value without blocking
+        
+        Args:
+            item: Value to publish
+        """
+        self.put(item, block=False)
+    
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        """
+        Take the newest pending value
+        
+        Args:
+            block: Wait for a value if none is pending
+            timeout: Maximum wait in seconds (None waits forever)
+        
+        Returns:
+            Any: Newest value
+        
+        Raises:
+            Empty: If no value is available
+        """
+        with self.condition:
+            if not block:
+                if not self.has_value:
+                    raise Empty
+            elif timeout is None:
+                while not self.has_value:
+                    self.condition.wait()
+            else:
+                deadline = time.monotonic() + timeout
+                while not self.has_value:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise Empty
+                    self.condition.wait(remaining)
+            
+            item = self.value
+            self.value = None
+            self.has_value = False
+            return item
+    
+    def get_nowait(self) -> Any:
+        """
+        Take the newest pending value without blocking
+        
+        Returns:
+            Any: Newest value
+        """
+        return self.get(block=False)
+    
+    def qsize(self) -> int:
+        """
+        Return number of pending values (0 or 1)
+        
+        Returns:
+            int: Pending value count
+        """
+        with self.condition:
+            return 1 if self.has_value else 0
+    
+    def empty(self) -> bool:
+        """
+        Check if no value is pending
+        
+        Returns:
+            bool: True if empty
+        """
+        return self.qsize() == 0
+    
+    def clear(self) -> int:
+        """
+        Drop any pending value
+        
+        Returns:
+            int: Number of dropped values
+        """
+        with self.condition:
+            dropped = 1 if self.has_value else 0
+            self.value = None
+            self.has_value = False
+            return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return shedding statistics (stale values count as dropped_oldest)
+        
+        Returns:
+            Dict[str, Any]: Counters, depth and capacity
+        """
+        with self.condition:
+            return {"dropped_oldest": self.dropped, "depth": 1 if self.has_value else 0, "capacity": 1,
+                    "overflow": OVERFLOW_DROP_OLDEST}
+
+class BoundedChannel:
+    """
+    FIFO channel holding at most `capacity` items
+    
+    When full, a new item is handled by the overflow policy: the sender
+    waits (block), the oldest pending item or the new one is discarded
+    (drop_oldest, drop_newest), the new one is refused with put() returning
+    False (reject), or it is combined with the newest pending item by the
+    merge function (merge). A capacity of 0 makes the channel unbounded.
+    """
+    
+    def __init__(self, capacity: int = 0, overflow: str = OVERFLOW_BLOCK,
+                 merge: Optional[Callable[[Any, Any], Any]] = None):
+        """
+        Initialize bounded channel
+        
+        Args:
+            capacity: Maximum pending items (0 = unbounded)
+            overflow: Overflow policy, one of OVERFLOW_POLICIES
+            merge: Function combining (pending, new) items, required for OVERFLOW_MERGE
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        if overflow == OVERFLOW_MERGE and merge is None:
+            raise ValueError("The merge policy needs a merge function")
+        
+        self.capacity = capacity
+        self.overflow = overflow
+        self.merge = merge
+        self.items = deque()
+        self.condition = threading.Condition()
+        self.shedding = ShedStats()
+    
+    def put(self, item: Any, block: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        Add an item, applying the overflow policy when full
+        
+        Args:
+            item: Item to add
+            block: Wait for space under the block policy (False raises Full instead)
+            timeout: Maximum wait in seconds under the block policy (None waits forever)
+        
+        Returns:
+            bool: False if the new item was rejected or dropped
+        
+        Raises:
+            Full: If the block policy runs out of time or block is False
+        """
+        event = None
+        shed_item = None
+        with self.condition:
+            if self.capacity and len(self.items) >= self.capacity:
+                if self.overflow == OVERFLOW_BLOCK:
+                    self.shedding.counts["blocked"] += 1
+                    if not block or not self.condition.wait_for(lambda: len(self.items) < self.capacity, timeout):
+                        raise Full
+                elif self.overflow == OVERFLOW_DROP_OLDEST:
+                    event, shed_item = "dropped_oldest", self.items.popleft()
+                elif self.overflow == OVERFLOW_MERGE:
+                    event, shed_item = "merged", item
+                    self.items[-1] = self.merge(self.items[-1], item)
+                else:
+                    event, shed_item = ("rejected" if self.overflow == OVERFLOW_REJECT else "dropped_newest"), item
+            
+            if event is not None:
+                self.shedding.counts[event] += 1
+            if event in (None, "dropped_oldest"):
+                self.items.append(item)
+                self.shedding.counts["accepted"] += 1
+                self.shedding.max_depth = max(self.shedding.max_depth, len(self.items))
+                self.condition.notify_all()
+        
+        if event is not None:
+            self.shedding.shed(event, shed_item)
+        return event not in ("rejected", "dropped_newest")
+    
+    def put_nowait(self, item: Any) -> bool:
+        """
+        Add an item without blocking
+        
+        Args:
+            item: Item to add
+        
+        Returns:
+            bool: False if the new item was rejected or dropped
+        """
+        return self.put(item, block=False)
+    
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        """
+        Take the oldest item
+        
+        Args:
+            block: Wait for an item if none is pending
+            timeout: Maximum wait in seconds (None waits forever)
+        
+        Returns:
+            Any: Oldest item
+        
+        Raises:
+            Empty: If no item is available
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.items, timeout if block else 0):
+                raise Empty
+            item = self.items.popleft()
+            self.condition.notify_all()
+            return item
+    
+    def get_nowait(self) -> Any:
+        """
+        Take the oldest item without blocking
+        
+        Returns:
+            Any: Oldest item
+        """
+        return self.get(block=False)
+    
+    def qsize(self) -> int:
+        """
+        Return number of pending items
+        
+        Returns:
+            int: Pending item count
+        """
+        with self.condition:
+            return len(self.items)
+    
+    def empty(self) -> bool:
+        """
+        Check if no item is pending
+        
+        Returns:
+            bool: True if empty
+        """
+        return self.qsize() == 0
+    
+    def full(self) -> bool:
+        """
+        Check if the channel is at capacity
+        
+        Returns:
+            bool: True if full
+        """
+        return bool(self.capacity) and self.qsize() >= self.capacity
+    
+    def clear(self) -> int:
+        """
+        Drop all pending items
+        
+        Returns:
+            int: Number of dropped items
+        """
+        with self.condition:
+            dropped = len(self.items)
+            self.items.clear()
+            self.condition.notify_all()
+            return dropped
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return shedding statistics
+        
+        Returns:
+            Dict[str, Any]: Counters, depth, max depth, capacity and policy
+        """
+        with self.condition:
+            return self.shedding.snapshot(len(self.items), self.capacity, self.overflow)
+
+class PriorityChannel:
+    """
+    Channel serving items by priority, FIFO within the same priority
+    Suited to command-like streams (e.g. interrupts ahead of speech)
+    
+    With a capacity, items more urgent than PRIORITY_NORMAL are always
+    accepted; the overflow policy applies to the others, and drop_oldest
+    discards the oldest of the least urgent pending items.
+    """
+    
+    def __init__(self, default_priority: int = PRIORITY_NORMAL, capacity: int = 0,
+                 overflow: str = OVERFLOW_BLOCK):
+        """
+        Initialize priority channel
+        
+        Args:
+            default_priority: Priority used when put() gets none
+            capacity: Maximum pending items (0 = unbounded)
+            overflow: Overflow policy, one of OVERFLOW_POLICIES except merge
+        """
+        if overflow not in OVERFLOW_POLICIES or overflow == OVERFLOW_MERGE:
+            raise ValueError(f"Unsupported overflow policy for a priority channel: {overflow}")
+        
+        self.queue = PriorityQueue()
+        self.default_priority = default_priority
+        self.counter = itertools.count()  # Keeps FIFO order within a priority
+        self.capacity = capacity
+        self.overflow = overflow
+        self.shedding = ShedStats()
+    
+    def put(self, item: Any, block: bool = True, timeout: Optional[float] = None,
+            priority: Optional[int] = None) -> bool:
+        """
+        Add an item, applying the overflow policy when full
+        
+        Args:
+            item: Item to add
+            block: Wait for space under the block policy (False raises Full instead)
+            timeout: Maximum wait in seconds under the block policy (None waits forever)
+            priority: Item priority, lower is served first (default: default_priority)
+        
+        Returns:
+            bool: False if the new item was rejected or dropped
+        
+        Raises:
+            Full: If the block policy runs out of time or block is False
+        """
+        if priority is None:
+            priority = self.default_priority
+        entry = (priority, next(self.counter), item)
+    
+        event = None
+        shed_item = None
+        # Works on PriorityQueue's heap under its own lock, so shedding and insertion are atomic
+        with self.queue.not_full:
+            heap = self.queue.queue
+            if self.capacity and priority >= PRIORITY_NORMAL and len(heap) >= self.capacity:
+                sheddable = [pending for pending in heap if pending[0] >= PRIORITY_NORMAL]
+                if self.overflow == OVERFLOW_BLOCK:
+                    self.shedding.counts["blocked"] += 1
+                    if not block or not self.queue.not_full.wait_for(lambda: len(heap) < self.capacity, timeout):
+                        raise Full
+                elif self.overflow == OVERFLOW_DROP_OLDEST and sheddable:
+                    victim = max(sheddable, key=lambda pending: (pending[0], -pending[1]))
+                    heap.remove(victim)
+                    heapq.heapify(heap)
+                    event, shed_item = "dropped_oldest", victim[2]
+                else:
+                    event, shed_item = ("rejected" if self.overflow == OVERFLOW_REJECT else "dropped_newest"), item
+            
+            if event is not None:
+                self.shedding.counts[event] += 1
+            if event in (None, "dropped_oldest"):
+                heapq.heappush(heap, entry)
+                self.queue.unfinished_tasks += 1
+                self.queue.not_empty.notify()
+                self.shedding.counts["accepted"] += 1
+                self.shedding.max_depth = max(self.shedding.max_depth, len(heap))
+        
+        if event is not None:
+            self.shedding.shed(event, shed_item)
+        return event not in ("rejected", "dropped_newest")
+    
+    def put_nowait(self, item: Any, priority: Optional[int] = None) -> bool:
+        """
+        Add an item without blocking
+        
+        Args:
+            item: Item to add
+            priority: Item priority (default: default_priority)
+        
+        Returns:
+            bool: False if the new item was rejected or dropped
+        """
+        return self.put(item, block=False, priority=priority)
+    
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        """
+        Take the most urgent item
+        
+        Args:
+            block: Wait for an item if none is pending
+            timeout: Maximum wait in seconds (None waits forever)
+        
+        Returns:
+            Any: Most urgent item
+        
+        Raises:
+            Empty: If no item is available
+        """
+        _, _, item = self.queue.get(block, timeout)
+        return item
+    
+    def get_nowait(self) -> Any:
+        """
+        Take the most urgent item without blocking
+        
+        Returns:
+            Any: Most urgent item
+        """
+        return self.get(block=False)
+    
+    def qsize(self) -> int:
+        """
+        Return number of pending items
+        
+        Returns:
+            int: Pending item count
+        """
+        return self.queue.qsize()
+    
+    def empty(self) -> bool:
+        """
+        Check if no item is pending
+        
+        Returns:
+            bool: True if empty
+        """
+        return self.queue.empty()
+    
+    def clear(self, min_priority: int = PRIORITY_HIGH) -> int:
+        """
+        Drop pending items whose priority is min_priority or less urgent
+        
+        Args:
+            min_priority: Most urgent priority to drop
+        
+        Returns:
+            int: Number of dropped items
+        """
+        # Filters the heap under PriorityQueue's lock, like put, so concurrent puts and gets see it at once
+        with self.queue.mutex:
+            heap = self.queue.queue
+            kept = [entry for entry in heap if entry[0] < min_priority]
+            dropped = len(heap) - len(kept)
+            if dropped:
+                heap[:] = kept
+                heapq.heapify(heap)
+                self.queue.unfinished_tasks -= dropped
+                if not self.queue.unfinished_tasks:
+                    self.queue.all_tasks_done.notify_all()
+                self.queue.not_full.notify_all()
+        return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return shedding statistics
+        
+        Returns:
+            Dict[str, Any]: Counters, depth, max depth, capacity and policy
+        """
+        return self.shedding.snapshot(self.qsize(), self.capacity, self.overflow)
+
+def create_channel(kind: str = "fifo", capacity: int = 0, overflow: str = OVERFLOW_BLOCK,
+                   merge: Optional[Callable[[Any, Any], Any]] = None):
+    """
+    Create an input channel of the given kind
+    
+    Args:
+        kind: "fifo", "latest" or "priority"
+        capacity: Maximum pending items for fifo and priority channels (0 = unbounded)
+        overflow: Overflow policy when full, one of OVERFLOW_POLICIES
+        merge: Function combining (pending, new) items for the merge policy
+    
+    Returns:
+        Queue-compatible channel
+    """
+    if kind == "fifo":
+        return BoundedChannel(capacity, overflow, merge) if capacity else Queue()
+    if kind == "latest":
+        return LatestValueChannel()
+    if kind == "priority":
+        return PriorityChannel(capacity=capacity, overflow=overflow)
+    raise ValueError(f"Unknown channel kind: {kind}")
\ No newline at end of file
@@ -0,0 +1,98 @@
+"""
+Fixed-rate frame scheduler
+Runs a callback on absolute deadlines, independently of queue timeouts
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Any
+from utils.log import get_logger
+
+logger = get_logger("frame_scheduler")
+
+class FrameScheduler:
+    """Calls a frame callback at a fixed rate in its own thread"""
+    
+    def __init__(self, fps: int, on_frame: Callable[[int, float], None], name: str = "Frames"):
+        """
+        Initialize frame scheduler
+        
+        Args:
+            fps: Frames per second
+            on_frame: Callback receiving (frame_index, frame_time) for each frame
+            name: Thread name
+        """
+        self.fps = fps
+        self.period = 1.0 / fps
+        self.on_frame = on_frame
+        self.name = name
+        self.running = False
+        self.thread = None
+        self.frames = 0
+        self.dropped_frames = 0
+        self.max_lateness = 0.0
+    
+    def start(self) -> None:
+        """
+        Start the scheduler thread
+        """
+        if self.running:
+            return
+        
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+    
+    def stop(self) -> None:
+        """
+        Stop the scheduler thread
+        """
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1.0)
+    
+    def _run(self) -> None:
+        """
+        Scheduler loop
+        Deadlines are computed from the start time, so timing errors don't accumulate
+        """
+        start = time.perf_counter()
+        frame_index = 0
+        
+        while self.running:
+            deadline = start + frame_index * self.period
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            
+            now = time.perf_counter()
+            lateness = now - deadline
+            self.max_lateness = max(self.max_lateness, lateness)
+            
+            # Skip frames we're too late for instead of playing them in a burst
+            if lateness > self.period:
+                skipped = int(lateness / self.period)
+                self.dropped_frames += skipped
+                frame_index += skipped
+            
+            try:
+                self.on_frame(frame_index, now)
+            except Exception as e:
+                logger.error("Frame callback failed: %s", e)
+            
+            self.frames += 1
+            frame_index += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return scheduler statistics
+        
+        Returns:
+            Dict[str, Any]: Frame, drop and lateness counters
+        """
+        return {
+            "fps": self.fps,
+            "frames": self.frames,
+            "dropped_frames": self.dropped_frames,
+            "max_lateness_ms": self.max_lateness * 1000
+        }
\ No newline at end of file
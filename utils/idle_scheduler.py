@@ -0,0 +1,224 @@
+"""
+Idle-time job scheduler
+Runs low-priority housekeeping only while the session is idle
+"""
+
+import inspect
+import threading
+import time
+from typing import Callable, Dict, Any, Iterator, List, Optional
+import config
+from utils.log import get_logger
+
+logger = get_logger("idle_scheduler")
+
+class IdleJob:
+    """
+    Housekeeping job run by the IdleScheduler
+    
+    The job function either does its work and returns, or returns a
+    generator whose yields mark points where the job can be suspended.
+    A suspended job resumes at the same point in the next idle window.
+    """
+    
+    def __init__(self, name: str, func: Callable[[], Any], interval: Optional[float] = None,
+                 budget_ms: float = 1000.0):
+        """
+        Initialize an idle job
+        
+        Args:
+            name: Job name used in logs and stats
+            func: Job function (may return a generator of steps)
+            interval: Seconds between completed runs (None runs the job once)
+            budget_ms: Time slice per idle window; the job is suspended at its next yield once spent
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.budget_ms = budget_ms
+        self.next_run = 0.0  # Due immediately
+        self.current = None  # Suspended run (generator), if any
+        self.stats = {
+            "runs": 0,
+            "steps": 0,
+            "preemptions": 0,
+            "budget_exhausted": 0,
+            "errors": 0,
+            "busy_ms": 0.0
+        }
+    
+    @property
+    def due(self) -> bool:
+        """True if the job has a suspended run or its next run time has passed"""
+        return self.current is not None or (self.next_run is not None and time.monotonic() >= self.next_run)
+    
+    def steps(self) -> Iterator[Any]:
+        """
+        Return the steps of a new run
+        
+        Returns:
+            Iterator[Any]: Generator advancing the job by one step per next()
+        """
+        result = self.func()
+        if inspect.isgenerator(result):
+            yield from result
+
+class IdleScheduler:
+    """
+    Runs IdleJobs in a background thread while all busy checks are false
+    
+    Jobs start only after the session has been idle for a grace period, and
+    they are suspended at their next step as soon as a busy check turns
+    true (a new turn arrives, speech starts). A step that is running can't be
+    interrupted, so long jobs should yield often.
+    """
+    
+    def __init__(self, busy_checks: List[Callable[[], bool]], grace_period: float = None,
+                 poll_interval: float = None, name: str = "Idle"):
+        """
+        Initialize idle scheduler
+        
+        Args:
+            busy_checks: Callables returning True while the session is busy
+            grace_period: Seconds of continuous idleness before jobs run (default: config.IDLE_GRACE_SECONDS)
+            poll_interval: Seconds between idleness checks (default: config.IDLE_POLL_INTERVAL)
+            name: Thread name
+        """
+        self.busy_checks = busy_checks
+        self.grace_period = grace_period if grace_period is not None else config.IDLE_GRACE_SECONDS
+        self.poll_interval = poll_interval or config.IDLE_POLL_INTERVAL
+        self.name = name
+        self.jobs: List[IdleJob] = []
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+        self.idle_since = None
+    
+    def add_job(self, job: IdleJob) -> None:
+        """
+        Register a job; due jobs run in registration order
+        
+        Args:
+            job: Job to register
+        """
+        with self.lock:
+            self.jobs.append(job)
+    
+    def start(self) -> None:
+        """
+        Start the scheduler thread
+        """
+        if self.running:
+            return
+        
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+    
+    def stop(self) -> None:
+        """
+        Stop the scheduler thread
+        """
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1.0)
+    
+    def is_idle(self) -> bool:
+        """
+        Check if every busy check is false
+        
+        Returns:
+            bool: True if the session is idle
+        """
+        for check in self.busy_checks:
+            try:
+                if check():
+                    return False
+            except Exception as e:
+                logger.warning("Idle check failed: %s", e)
+                return False
+        return True
+    
+    def _run(self) -> None:
+        """
+        Scheduler loop
+        """
+        while self.running:
+            if not self.is_idle():
+                self.idle_since = None
+                time.sleep(self.poll_interval)
+                continue
+            
+            now = time.monotonic()
+            if self.idle_since is None:
+                self.idle_since = now
+            if now - self.idle_since < self.grace_period:
+                time.sleep(self.poll_interval)
+                continue
+            
+            with self.lock:
+                job = next((job for job in self.jobs if job.due), None)
+            if job is None:
+                time.sleep(self.poll_interval)
+                continue
+            
+            self._run_slice(job)
+    
+    def _run_slice(self, job: IdleJob) -> None:
+        """
+        Advance a job until it finishes, spends its budget or the session becomes busy
+        
+        Args:
+            job: Job to run
+        """
+        start = time.perf_counter()
+        try:
+            if job.current is None:
+                job.current = job.steps()
+            
+            while True:
+                next(job.current)
+                job.stats["steps"] += 1
+                
+                if not self.is_idle():
+                    job.stats["preemptions"] += 1
+                    logger.debug("Idle job %s preempted, will resume later", job.name)
+                    self.idle_since = None
+                    return
+                if (time.perf_counter() - start) * 1000 >= job.budget_ms:
+                    # Defer the rest and move the job last so other jobs get a turn
+                    job.stats["budget_exhausted"] += 1
+                    with self.lock:
+                        self.jobs.remove(job)
+                        self.jobs.append(job)
+                    return
+        except StopIteration:
+            job.stats["runs"] += 1
+            self._finish(job)
+        except Exception as e:
+            job.stats["errors"] += 1
+            logger.error("Idle job %s failed: %s", job.name, e)
+            self._finish(job)
+        finally:
+            job.stats["busy_ms"] += (time.perf_counter() - start) * 1000
+    
+    @staticmethod
+    def _finish(job: IdleJob) -> None:
+        """
+        Schedule the next run of a job that ended
+        
+        Args:
+            job: Job whose run ended
+        """
+        job.current = None
+        job.next_run = time.monotonic() + job.interval if job.interval is not None else None
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return per-job statistics
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: Runs, steps, preemptions, budget exhaustions, errors and busy time per job
+        """
+        with self.lock:
+            return {job.name: dict(job.stats, suspended=job.current is not None) for job in self.jobs}
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""
+Logging setup
+Level-gated loggers whose records are written by a background thread
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from typing import Optional
+import config
+
+ROOT_LOGGER = "companion"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that leaves formatting to the listener thread
+    
+    The stock QueueHandler formats every record in the calling thread so it
+    can be pickled. Records here never leave the process, so the agent
+    thread only pays for creating the record and putting it on the queue.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Pass the record through unformatted"""
+        return record
+
+def _parse_level(level) -> int:
+    """
+    Convert a level name or number to a logging level
+    
+    Args:
+        level: Level name ("DEBUG", "INFO", ...) or number
+    
+    Returns:
+        int: Logging level
+    """
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    if not isinstance(value, int):
+        raise ValueError(f"Unknown log level: {level}")
+    return value
+
+def setup_logging(level=None, console_level=None, log_file: Optional[str] = None) -> None:
+    """
+    Route all companion loggers through a queue to the console and a log file
+    
+    Calls after the first are ignored. Records below both levels are
+    dropped by the logger before a message is built.
+    
+    Args:
+        level: Level written to the log file (default: config.LOG_LEVEL)
+        console_level: Level written to stderr (default: config.LOG_CONSOLE_LEVEL)
+        log_file: Log file path, None for no file (default: config.LOG_FILE)
+    """
+    global _listener
+    if _listener is not None:
+        return
+    
+    level = _parse_level(level or config.LOG_LEVEL)
+    console_level = _parse_level(console_level or config.LOG_CONSOLE_LEVEL)
+    log_file = log_file if log_file is not None else config.LOG_FILE
+    
+    # Keep the console terse so log lines don't break up the prompt
+    console = logging.StreamHandler(sys.stderr)
+    console.setLevel(console_level)
+    console.setFormatter(logging.Formatter("%(levelname)s - %(name)s - %(message)s"))
+    handlers = [console]
+    
+    if log_file:
+        os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler.setLevel(level)
+        file_handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s [%(threadName)s] %(name)s - %(message)s"))
+        handlers.append(file_handler)
+    
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(min(handler.level for handler in handlers))
+    root.handlers[:] = [_DeferredQueueHandler(log_queue)]
+    root.propagate = False
+    
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging() -> None:
+    """
+    Write out queued records and stop the listener thread
+    """
+    global _listener
+    if _listener is None:
+        return
+    
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Return a logger below the companion root logger
+    
+    Args:
+        name: Logger name (agent or module name)
+    
+    Returns:
+        logging.Logger: Logger named "companion.<name>"
+    """
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""
+Memory monitor
+Per-session memory accounting and tracemalloc growth reports for long-running deployments
+"""
+
+import threading
+import tracemalloc
+from typing import Any, Callable, Dict, List
+from utils.log import get_logger
+import config
+
+logger = get_logger("memory_monitor")
+
+# Allocations of the monitor itself and of imports aren't growth worth reporting
+SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>")
+]
+
+class MemoryMonitor:
+    """
+    Periodically sizes every tracked session and reports memory growth
+    
+    Sessions register a function returning their approximate bytes by
+    component (e.g. ConversationAgent.memory_usage). Every
+    config.MEMORY_MONITOR_INTERVAL seconds each one is sized, and a warning
+    is logged when a session crosses config.MEMORY_SESSION_WARN_BYTES (once,
+    until it drops back below).
+    
+    With config.MEMORY_TRACEMALLOC, tracemalloc runs while the monitor does;
+    each check compares a snapshot with the previous one and logs the
+    config.MEMORY_TOP_GROWTH source lines that grew most. Traced memory and
+    thread count are kept against the first check, so a flat deployment
+    shows near-zero growth in get_stats.
+    """
+    
+    def __init__(self, interval: float = None, warn_bytes: int = None, trace: bool = None):
+        """
+        Initialize memory monitor
+        
+        Args:
+            interval: Seconds between checks (default: config.MEMORY_MONITOR_INTERVAL)
+            warn_bytes: Session size that triggers a warning (default: config.MEMORY_SESSION_WARN_BYTES)
+            trace: Take tracemalloc snapshots (default: config.MEMORY_TRACEMALLOC)
+        """
+        self.interval = interval or config.MEMORY_MONITOR_INTERVAL
+        self.warn_bytes = warn_bytes or config.MEMORY_SESSION_WARN_BYTES
+        self.trace = config.MEMORY_TRACEMALLOC if trace is None else trace
+        
+        self.lock = threading.Lock()
+        self.sizers: Dict[str, Callable[[], Dict[str, int]]] = {}
+        self.sizes: Dict[str, Dict[str, int]] = {}
+        self.over_threshold = set()
+        self.running = False
+        self.stop_event = threading.Event()
+        self.thread = None
+        
+        self.started_tracing = False
+        self.previous_snapshot = None
+        self.baseline = None  # (traced bytes, thread count) at the first check
+        self.checks = 0
+        self.warnings = 0
+        self.last_growth: List[str] = []
+    
+    def track(self, name: str, sizer: Callable[[], Dict[str, int]]) -> None:
+        """
+        Start accounting a session
+        
+        Args:
+            name: Session name or ID
+            sizer: Function returning the session's bytes by component
+        """
+        with self.lock:
+            self.sizers[name] = sizer
+    
+    def untrack(self, name: str) -> None:
+        """
+        Stop accounting a session (closed or moved away)
+        
+        Args:
+            name: Session name or ID
+        """
+        with self.lock:
+            self.sizers.pop(name, None)
+            self.sizes.pop(name, None)
+            self.over_threshold.discard(name)
+    
+    def start(self) -> None:
+        """
+        Start periodic checks (and tracemalloc if enabled)
+        """
+        if self.running:
+            return
+        
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start(config.MEMORY_TRACEMALLOC_FRAMES)
+            self.started_tracing = True
+        
+        self.running = True
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="MemoryMonitor", daemon=True)
+        self.thread.start()
+    
+    def stop(self) -> None:
+        """
+        Stop checks, and tracemalloc if this monitor started it
+        """
+        self.running = False
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=2.0)
+            self.thread = None
+        
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+            self.previous_snapshot = None
+    
+    def _run(self) -> None:
+        """
+        Check loop
+        """
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error("Memory check failed: %s", e)
+    
+    def check(self) -> None:
+        """
+        Size all sessions and, when tracing, report the top growth since the previous check
+        """
+        with self.lock:
+            sizers = list(self.sizers.items())
+        
+        sizes = {}
+        for name, sizer in sizers:
+            sizes[name] = sizer()
+            total = sum(sizes[name].values())
+            if total > self.warn_bytes and name not in self.over_threshold:
+                self.over_threshold.add(name)
+                self.warnings += 1
+                logger.warning("Session %s holds %.1f MB (%s)", name, total / 1e6,
+                               ", ".join(f"{part} {size / 1e6:.1f} MB" for part, size in sizes[name].items()))
+            elif total <= self.warn_bytes:
+                self.over_threshold.discard(name)
+        
+        traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        with self.lock:
+            # Sessions untracked while being sized are left out
+            self.sizes = {name: size for name, size in sizes.items() if name in self.sizers}
+            self.checks += 1
+            if self.baseline is None:
+                self.baseline = (traced, threading.active_count())
+        
+        if tracemalloc.is_tracing():
+            self._report_growth()
+    
+    def _report_growth(self) -> None:
+        """
+        Compare a new tracemalloc snapshot with the previous one and log the largest increases
+        """
+        snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        previous, self.previous_snapshot = self.previous_snapshot, snapshot
+        if previous is None:
+            return
+        
+        growth = [stat for stat in snapshot.compare_to(previous, "lineno") if stat.size_diff > 0]
+        self.last_growth = [str(stat) for stat in growth[:config.MEMORY_TOP_GROWTH]]
+        if growth:
+            logger.info("Memory growth since last check: %+.1f KB, top: %s",
+                        sum(stat.size_diff for stat in growth) / 1024, "; ".join(self.last_growth))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return memory statistics
+        
+        Returns:
+            Dict[str, Any]: Bytes per session, largest session, warnings, and traced memory and
+                thread count growth since the first check
+        """
+        with self.lock:
+            sizes = {name: sum(parts.values()) for name, parts in self.sizes.items()}
+            baseline = self.baseline
+            stats = {"checks": self.checks, "warnings": self.warnings}
+        
+        stats["sessions"] = len(sizes)
+        stats["session_bytes"] = sum(sizes.values())
+        stats["largest_session_bytes"] = max(sizes.values(), default=0)
+        stats["threads"] = threading.active_count()
+        if baseline is not None:
+            stats["thread_growth"] = stats["threads"] - baseline[1]
+            if tracemalloc.is_tracing():
+                traced, peak = tracemalloc.get_traced_memory()
+                stats["traced_bytes"] = traced
+                stats["traced_peak_bytes"] = peak
+                stats["traced_growth_bytes"] = traced - baseline[0]
+        stats["top_growth"] = list(self.last_growth)
+        return stats
\ No newline at end of file
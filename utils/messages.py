@@ -0,0 +1,20 @@
+"""
+Picklable message types
+Used by agents whose process() may run in a worker process
+"""
+
+from dataclasses import dataclass
+import numpy as np
+
+@dataclass(frozen=True)
+class TranscriptionRequest:
+    """Audio to transcribe"""
+    audio: np.ndarray  # Float32 mono samples in [-1, 1]
+    sample_rate: int
+
+@dataclass(frozen=True)
+class TranscriptionResult:
+    """Transcript of a TranscriptionRequest"""
+    text: str
+    audio_seconds: float
+    decode_ms: float
\ No newline at end of file
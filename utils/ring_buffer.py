@@ -0,0 +1,92 @@
+"""
+Audio ring buffer
+Fixed-size circular sample buffer addressed by absolute sample position
+"""
+
+import threading
+import numpy as np
+
+class AudioRingBuffer:
+    """
+    Circular buffer of mono samples
+    
+    Positions are absolute sample counts since the buffer was created, so a
+    reader can keep stable references (e.g. utterance start) while the
+    writer keeps overwriting the oldest audio.
+    """
+    
+    def __init__(self, capacity: int, dtype=np.float32):
+        """
+        Initialize ring buffer
+        
+        Args:
+            capacity: Number of samples retained
+            dtype: Sample type
+        """
+        self.capacity = capacity
+        self.buffer = np.zeros(capacity, dtype=dtype)
+        self.write_pos = 0  # Absolute position of the next sample to write
+        self.lock = threading.Lock()
+        self.data_ready = threading.Condition(self.lock)
+    
+    @property
+    def oldest_pos(self) -> int:
+        """Absolute position of the oldest retained sample"""
+        return max(0, self.write_pos - self.capacity)
+    
+    def write(self, samples: np.ndarray) -> None:
+        """
+        Append samples, overwriting the oldest ones when full
+        
+        Args:
+            samples: 1-D array of samples
+        """
+        samples = samples[-self.capacity:]
+        count = samples.shape[0]
+        
+        with self.lock:
+            start = self.write_pos % self.capacity
+            first = min(count, self.capacity - start)
+            self.buffer[start:start + first] = samples[:first]
+            if first < count:
+                self.buffer[:count - first] = samples[first:]
+            self.write_pos += count
+            self.data_ready.notify_all()
+    
+    def read(self, start: int, end: int) -> np.ndarray:
+        """
+        Copy samples between two absolute positions
+        
+        Args:
+            start: First position (clamped to the oldest retained sample)
+            end: Position after the last sample (clamped to the write position)
+        
+        Returns:
+            np.ndarray: Copied samples
+        """
+        with self.lock:
+            start = max(start, self.oldest_pos)
+            end = min(end, self.write_pos)
+            if end <= start:
+                return self.buffer[:0].copy()
+            
+            first_index = start % self.capacity
+            count = end - start
+            first = min(count, self.capacity - first_index)
+            if first == count:
+                return self.buffer[first_index:first_index + count].copy()
+            return np.concatenate((self.buffer[first_index:], self.buffer[:count - first]))
+    
+    def wait_for(self, position: int, timeout: float) -> bool:
+        """
+        Wait until the write position reaches a given position
+        
+        Args:
+            position: Absolute position to wait for
+            timeout: Maximum wait in seconds
+        
+        Returns:
+            bool: True if the position was reached
+        """
+        with self.data_ready:
+            return self.data_ready.wait_for(lambda: self.write_pos >= position, timeout)
\ No newline at end of file
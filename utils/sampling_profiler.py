@@ -0,0 +1,236 @@
+"""
+Sampling profiler
+Periodically samples the stacks of all threads and writes collapsed stacks for flamegraphs
+"""
+
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Any, Dict, List, Optional, Tuple
+from utils.log import get_logger
+import config
+
+logger = get_logger("sampling_profiler")
+
+class SamplingProfiler:
+    """
+    Low-overhead wall-clock sampler for the agent threads
+    
+    While running, a daemon thread reads every thread's current frame with
+    sys._current_frames() each config.PROFILER_INTERVAL seconds and counts
+    identical stacks. Nothing is traced or instrumented, so the cost is one
+    stack walk per thread and sample, and exactly nothing while stopped.
+    
+    Stacks are rooted at the thread's name split on "/": agent threads are
+    named after their agent ("Speech") and their helper threads
+    "<agent>/<role>" ("Speech/tts"), so the flamegraph groups by agent. On
+    stop, the samples are written in collapsed-stack format (one
+    "root;frame;...;leaf count" line per stack), read by flamegraph.pl,
+    speedscope and inferno.
+    """
+    
+    def __init__(self, interval: float = None, output_dir: str = None, max_depth: int = None):
+        """
+        Initialize sampling profiler
+        
+        Args:
+            interval: Seconds between samples (default: config.PROFILER_INTERVAL)
+            output_dir: Folder receiving profiles (default: config.PROFILER_OUTPUT_DIR)
+            max_depth: Innermost frames kept per stack (default: config.PROFILER_MAX_DEPTH)
+        """
+        self.interval = interval or config.PROFILER_INTERVAL
+        self.output_dir = output_dir or config.PROFILER_OUTPUT_DIR
+        self.max_depth = max_depth or config.PROFILER_MAX_DEPTH
+        
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.labels: Dict[CodeType, str] = {}
+        self.last_profile = None
+    
+    @property
+    def running(self) -> bool:
+        """True while sampling"""
+        return self.thread is not None and self.thread.is_alive() and not self.stop_event.is_set()
+    
+    def start(self, duration: Optional[float] = None) -> bool:
+        """
+        Start sampling
+        
+        Args:
+            duration: Seconds after which sampling stops by itself (default: until stop)
+        
+        Returns:
+            bool: False if a profile is already being taken
+        """
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return False
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, args=(duration,), name="Profiler", daemon=True)
+            self.thread.start()
+        logger.info("Profiler started (every %.1f ms)", self.interval * 1000)
+        return True
+    
+    def stop(self, wait: bool = False) -> Optional[str]:
+        """
+        Stop sampling; the profile is written by the sampling thread as it exits
+        
+        Args:
+            wait: Wait for the profile to be written (don't wait from a signal handler)
+        
+        Returns:
+            Optional[str]: Path of the profile when waiting, None otherwise
+        """
+        self.stop_event.set()
+        thread = self.thread
+        if wait and thread is not None:
+            thread.join()
+            return self.last_profile
+        return None
+    
+    def toggle(self, wait: bool = False) -> str:
+        """
+        Start sampling if stopped, stop it if running
+        
+        Args:
+            wait: When stopping, wait for the profile to be written
+        
+        Returns:
+            str: Status message
+        """
+        if self.running:
+            path = self.stop(wait)
+            return f"Profiler stopped, profile written to {path}" if path else "Profiler stopping"
+        self.start()
+        return "Profiler started"
+    
+    def install_signal(self, name: str = None) -> bool:
+        """
+        Toggle the profiler on a signal (e.g. kill -USR2 <pid>), must be called from the main thread
+        
+        Args:
+            name: Signal name (default: config.PROFILER_SIGNAL)
+        
+        Returns:
+            bool: False if the platform has no such signal
+        """
+        name = name or config.PROFILER_SIGNAL
+        signum = getattr(signal, name, None)
+        if signum is None:
+            logger.warning("Signal %s unavailable, profiler toggled from the console only", name)
+            return False
+        
+        # The handler interrupts the main thread, possibly inside a logging or threading lock,
+        # so it only wakes a watcher thread that does the toggling
+        requested = threading.Event()
+        
+        def watch() -> None:
+            while True:
+                requested.wait()
+                requested.clear()
+                logger.info(self.toggle())
+        
+        threading.Thread(target=watch, name="Profiler/signal", daemon=True).start()
+        signal.signal(signum, lambda received, frame: requested.set())
+        return True
+    
+    def _run(self, duration: Optional[float]) -> None:
+        """
+        Sampling loop, writes the profile when it ends
+        
+        Args:
+            duration: Seconds to sample (None: until stopped)
+        """
+        stacks: Counter = Counter()
+        own_id = threading.get_ident()
+        started = time.perf_counter()
+        deadline = None if duration is None else started + duration
+        sampling_time = 0.0
+        samples = 0
+        
+        while not self.stop_event.wait(self.interval):
+            sample_start = time.perf_counter()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    stacks[self._collapse(names.get(thread_id, f"thread-{thread_id}"), frame)] += 1
+            now = time.perf_counter()
+            sampling_time += now - sample_start
+            samples += 1
+            if deadline is not None and now >= deadline:
+                break
+        
+        elapsed = time.perf_counter() - started
+        try:
+            self.last_profile = self._write(stacks)
+            logger.info("Profile written to %s: %s samples over %.1f s, sampler overhead %.2f%%",
+                        self.last_profile, samples, elapsed, sampling_time / elapsed * 100 if elapsed else 0.0)
+        except OSError as e:
+            logger.error("Could not write profile: %s", e)
+    
+    def _collapse(self, thread_name: str, frame: FrameType) -> Tuple[str, ...]:
+        """
+        Turn a thread's current frame into a stack key
+        
+        Args:
+            thread_name: Thread name, split on "/" into the root frames
+            frame: Innermost frame
+        
+        Returns:
+            Tuple[str, ...]: Frames from the thread root to the innermost call
+        """
+        frames: List[str] = []
+        while frame is not None and len(frames) < self.max_depth:
+            frames.append(self._label(frame.f_code))
+            frame = frame.f_back
+        frames.extend(reversed(thread_name.split("/")))
+        return tuple(reversed(frames))
+    
+    def _label(self, code: CodeType) -> str:
+        """
+        Return the frame label of a code object, cached
+        
+        Args:
+            code: Code object
+        
+        Returns:
+            str: "function (file.py:line)"
+        """
+        label = self.labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            # Semicolons separate frames in collapsed stacks
+            label = label.replace(";", ":")
+            self.labels[code] = label
+        return label
+    
+    def _write(self, stacks: Counter) -> str:
+        """
+        Write collapsed stacks
+        
+        Args:
+            stacks: Sample count per stack
+        
+        Returns:
+            str: Profile path
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, time.strftime("profile-%Y%m%d-%H%M%S.folded"))
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+        return path
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return profiler state
+        
+        Returns:
+            Dict[str, Any]: Whether sampling and the latest profile path
+        """
+        return {"running": self.running, "last_profile": self.last_profile}
\ No newline at end of file
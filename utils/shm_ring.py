@@ -0,0 +1,217 @@
+"""
+Shared-memory frame ring
+Single-producer/single-consumer transport for audio and animation frames between processes
+"""
+
+import math
+import struct
+import time
+from multiprocessing import shared_memory
+from queue import Empty
+from typing import Optional, Tuple
+import numpy as np
+import config
+
+HEADER_BYTES = 128  # Write and read indices, each on its own cache line
+WRITE_INDEX = 0  # uint64 slot of the write index in the header
+READ_INDEX = 8  # uint64 slot of the read index (byte offset 64)
+LENGTH_BYTES = 8  # Frame length prefix of every slot
+LIP_SYNC_POINT = struct.Struct("<dd")  # (presentation_time, mouth_open), NaN mouth_open cuts the track
+
+class SharedFrameRing:
+    """
+    Ring of fixed-size frame slots in shared memory
+    
+    Frames are copied once into a slot and once out of it, with no pickling
+    and no lock. Only the producer writes the write index and only the
+    consumer writes the read index; a frame is written before the write
+    index that publishes it, and copied out before the read index that
+    frees its slot. Indices are aligned 64-bit counters that never wrap in
+    practice, so each update is a single store.
+    
+    Exactly one process (or thread) may put and one may get.
+    """
+    
+    def __init__(self, slots: int = None, frame_bytes: int = None, name: Optional[str] = None,
+                 create: bool = True):
+        """
+        Create or attach to a ring
+        
+        Args:
+            slots: Number of frames the ring holds (default: config.SHM_RING_SLOTS)
+            frame_bytes: Largest frame in bytes (default: config.SHM_RING_FRAME_BYTES)
+            name: Segment name (required when attaching, generated when creating)
+            create: True to create the segment, False to attach to an existing one
+        """
+        self.slots = slots or config.SHM_RING_SLOTS
+        self.frame_bytes = frame_bytes or config.SHM_RING_FRAME_BYTES
+        # Keep every slot 8-byte aligned so the length prefix is a single store
+        self.slot_bytes = LENGTH_BYTES + int(math.ceil(self.frame_bytes / 8.0)) * 8
+        size = HEADER_BYTES + self.slots * self.slot_bytes
+        
+        # Processes started by the creator share its resource tracker, so
+        # attaching doesn't register a second owner that could unlink the segment
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.owner = create
+        self.name = self.shm.name
+        
+        self.header = np.ndarray((HEADER_BYTES // 8,), dtype=np.uint64, buffer=self.shm.buf)
+        self.lengths = np.ndarray((self.slots,), dtype=np.uint64, buffer=self.shm.buf, offset=HEADER_BYTES,
+                                  strides=(self.slot_bytes,))
+        self.data = np.ndarray((self.slots, self.slot_bytes), dtype=np.uint8, buffer=self.shm.buf,
+                               offset=HEADER_BYTES)
+        if create:
+            self.header[:] = 0
+        self.dropped = 0  # Frames refused because the ring was full (producer side)
+    
+    def __reduce__(self):
+        """Pickle as a reference to the segment, so the ring can be passed to a worker process"""
+        return (self.__class__, (self.slots, self.frame_bytes, self.name, False))
+    
+    def qsize(self) -> int:
+        """Number of frames waiting to be read"""
+        return int(self.header[WRITE_INDEX] - self.header[READ_INDEX])
+    
+    def empty(self) -> bool:
+        """True if no frame is waiting"""
+        return self.qsize() == 0
+    
+    def full(self) -> bool:
+        """True if every slot holds an unread frame"""
+        return self.qsize() >= self.slots
+    
+    def put_frame(self, data, timeout: Optional[float] = 0.0) -> bool:
+        """
+        Copy a frame into the ring
+        
+        Args:
+            data: Bytes-like frame of at most frame_bytes
+            timeout: Seconds to wait for a free slot (0 returns at once, None waits indefinitely)
+        
+        Returns:
+            bool: False if the ring stayed full (the frame is dropped and counted)
+        """
+        frame = np.frombuffer(data, dtype=np.uint8)
+        if frame.size > self.frame_bytes:
+            raise ValueError(f"Frame of {frame.size} bytes exceeds the ring's {self.frame_bytes} bytes")
+        
+        write_index = int(self.header[WRITE_INDEX])
+        if not self._wait(lambda: write_index - int(self.header[READ_INDEX]) < self.slots, timeout):
+            self.dropped += 1
+            return False
+        
+        slot = write_index % self.slots
+        self.data[slot, LENGTH_BYTES:LENGTH_BYTES + frame.size] = frame
+        self.lengths[slot] = frame.size
+        # Publish only once the frame is in place
+        self.header[WRITE_INDEX] = write_index + 1
+        return True
+    
+    def get_frame(self, timeout: Optional[float] = 0.0) -> Optional[bytes]:
+        """
+        Copy the oldest frame out of the ring
+        
+        Args:
+            timeout: Seconds to wait for a frame (0 returns at once, None waits indefinitely)
+        
+        Returns:
+            Optional[bytes]: Frame, None if none arrived in time
+        """
+        read_index = int(self.header[READ_INDEX])
+        if not self._wait(lambda: int(self.header[WRITE_INDEX]) > read_index, timeout):
+            return None
+        
+        slot = read_index % self.slots
+        length = int(self.lengths[slot])
+        frame = self.data[slot, LENGTH_BYTES:LENGTH_BYTES + length].tobytes()
+        # Free the slot only after the copy
+        self.header[READ_INDEX] = read_index + 1
+        return frame
+    
+    @staticmethod
+    def _wait(ready, timeout: Optional[float]) -> bool:
+        """
+        Poll a condition until it holds or the timeout passes
+        
+        Args:
+            ready: Callable returning True once the caller can proceed
+            timeout: Seconds to wait (0 checks once, None waits indefinitely)
+        
+        Returns:
+            bool: True if the condition holds
+        """
+        if ready():
+            return True
+        if timeout == 0:
+            return False
+        
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not ready():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(config.SHM_POLL_INTERVAL)
+        return True
+    
+    def close(self) -> None:
+        """
+        Detach from the segment, and destroy it if this side created it
+        """
+        # Views must go before the buffer can be released
+        self.header = self.lengths = self.data = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+class LipSyncRing(SharedFrameRing):
+    """
+    Queue-compatible ring of lip-sync points
+    
+    Stands in for the queue.Queue between LipSyncAnalyzer (put) and
+    MouthTrack (empty, get_nowait), so the speech and animation agents can
+    live in different processes. Points that don't fit are dropped rather
+    than stalling the audio thread.
+    """
+    
+    def __init__(self, slots: int = None, name: Optional[str] = None, create: bool = True):
+        """
+        Create or attach to a lip-sync ring
+        
+        Args:
+            slots: Points the ring holds (default: config.SHM_RING_SLOTS)
+            name: Segment name (required when attaching)
+            create: True to create the segment, False to attach
+        """
+        super().__init__(slots, LIP_SYNC_POINT.size, name, create)
+    
+    def __reduce__(self):
+        """Pickle as a reference to the segment"""
+        return (self.__class__, (self.slots, self.name, False))
+    
+    def put(self, point: Tuple[float, Optional[float]], block: bool = False, timeout: Optional[float] = None) -> None:
+        """
+        Publish a (presentation_time, mouth_open) point, None mouth_open cutting the track
+        
+        Args:
+            point: Lip-sync point
+            block: Wait for a free slot
+            timeout: Seconds to wait when blocking
+        """
+        point_time, value = point
+        self.put_frame(LIP_SYNC_POINT.pack(point_time, math.nan if value is None else value),
+                       timeout if block else 0.0)
+    
+    def get_nowait(self) -> Tuple[float, Optional[float]]:
+        """
+        Return the oldest point
+        
+        Returns:
+            Tuple[float, Optional[float]]: (presentation_time, mouth_open)
+        
+        Raises:
+            Empty: If no point is waiting
+        """
+        frame = self.get_frame()
+        if frame is None:
+            raise Empty
+        point_time, value = LIP_SYNC_POINT.unpack(frame)
+        return point_time, None if math.isnan(value) else value
\ No newline at end of file